@@ -71,6 +71,15 @@ agent.tool.file_read(
     context_lines=3
 )
 
+# Regex search across a tree, stopping after 20 matches
+agent.tool.file_read(
+    path="/path/to/project",
+    mode="search",
+    search_pattern="def [a-z_]+_handler",
+    regex=True,
+    max_matches=20
+)
+
 # Compare files
 agent.tool.file_read(
     path="/path/to/file1.txt",
@@ -96,13 +105,17 @@ agent.tool.file_read(
 See the file_read function docstring for more details on modes and parameters.
 """
 
-import glob
 import json
 import os
+import re
+import threading
 import time as time_module
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from os.path import expanduser
-from typing import Any, Dict, List, Optional, Union, cast
+from typing import Any, Dict, Iterator, List, Optional, Union, cast
 
 from rich import box
 from rich.console import Console
@@ -121,6 +134,13 @@ from strands.types.tools import (
 
 from custom_tools.utils import console_util
 from custom_tools.utils.detect_language import detect_language
+from custom_tools.utils.file_index import find_indexed, find_unindexed
+from custom_tools.utils.ignore_rules import walk
+from custom_tools.utils.line_index import get_line_index
+from custom_tools.utils.trigram_index import narrow_search
+
+# Read size for streaming search
+SEARCH_BLOCK_BYTES = int(os.getenv("FILE_READ_SEARCH_BLOCK_BYTES", str(256 * 1024)))
 
 # Document format mapping
 FORMAT_EXTENSIONS = {
@@ -347,6 +367,24 @@ TOOL_SPEC = {
                     "type": "integer",
                     "description": "Number of context lines around search results",
                 },
+                "regex": {
+                    "type": "boolean",
+                    "description": "Treat search_pattern as a regular expression (default: false)",
+                    "default": False,
+                },
+                "whole_word": {
+                    "type": "boolean",
+                    "description": "Only match search_pattern as a whole word (default: false)",
+                    "default": False,
+                },
+                "max_matches": {
+                    "type": "integer",
+                    "description": "Stop searching after this many matches in total (default: 200)",
+                },
+                "max_files": {
+                    "type": "integer",
+                    "description": "Stop searching after matches in this many files (default: 50)",
+                },
                 "recursive": {
                     "type": "boolean",
                     "description": "Search recursively in subdirectories (default: true)",
@@ -364,7 +402,9 @@ def find_files(console: Console, pattern: str, recursive: bool = True) -> List[s
     Find files matching the pattern with better error handling.
 
     Supports glob patterns, direct file paths, and directory traversal
-    with configurable recursion for finding matching files.
+    with configurable recursion for finding matching files. Paths inside
+    cloned repositories are resolved from their persistent file index, and
+    directories excluded by .gitignore or the default ignore list are pruned.
 
     Args:
         pattern: File pattern to match (can include wildcards)
@@ -382,11 +422,16 @@ def find_files(console: Console, pattern: str, recursive: bool = True) -> List[s
             if os.path.isfile(pattern):
                 return [pattern]
             elif os.path.isdir(pattern):
+                # Cloned repositories answer from their persistent file index
+                indexed = find_indexed(pattern, recursive)
+                if indexed is not None:
+                    return indexed
+
                 matching_files = []
 
-                for root, _dirs, files in os.walk(pattern):
-                    if not recursive and root != pattern:
-                        continue
+                for root, dirs, files in walk(pattern):
+                    if not recursive:
+                        dirs.clear()
 
                     for file in sorted(files):
                         if not file.startswith("."):  # Skip hidden files
@@ -402,8 +447,10 @@ def find_files(console: Console, pattern: str, recursive: bool = True) -> List[s
             pattern = os.path.join(base_dir if base_dir else ".", "**", file_pattern)
 
         try:
-            matching_files = glob.glob(pattern, recursive=recursive)
-            return sorted(matching_files)
+            indexed = find_indexed(pattern, recursive)
+            if indexed is not None:
+                return indexed
+            return find_unindexed(pattern, recursive)
         except Exception as e:
             console.print(
                 Panel(
@@ -499,7 +546,8 @@ def read_file_lines(console: Console, file_path: str, start_line: int = 0, end_l
     Read specific lines from file.
 
     Extracts and returns a specific range of lines from a file,
-    with validation of line range parameters.
+    with validation of line range parameters. Only the requested lines
+    are read, located through the file's cached line-offset index.
 
     Args:
         file_path: Path to the file
@@ -522,21 +570,30 @@ def read_file_lines(console: Console, file_path: str, start_line: int = 0, end_l
         raise ValueError(f"Path is not a file: {file_path}")
 
     try:
-        with open(file_path, "r") as f:
-            all_lines = f.readlines()
+        # Seek straight to the range through the file's cached line-offset index
+        line_index = get_line_index(file_path)
+        if line_index is not None:
+            total_lines = line_index.line_count
+        else:
+            with open(file_path, "r") as f:
+                all_lines = f.readlines()
+            total_lines = len(all_lines)
 
         # Validate line numbers
         start_line = max(start_line, 0)
 
         if end_line is not None:
-            end_line = min(end_line, len(all_lines))
+            end_line = min(end_line, total_lines)
             if end_line < start_line:
                 raise ValueError(f"end_line ({end_line}) cannot be less than start_line ({start_line})")
 
-        lines = all_lines[start_line:end_line]
+        if line_index is not None:
+            lines = line_index.read_lines(start_line, end_line)
+        else:
+            lines = all_lines[start_line:end_line]
 
         # Create a preview panel
-        line_range = f"{start_line + 1}-{end_line if end_line else len(all_lines)}"
+        line_range = f"{start_line + 1}-{end_line if end_line else total_lines}"
         panel = Panel(
             escape("".join(lines)),
             title=f"[bold green]Lines {line_range} from {os.path.basename(file_path)}",
@@ -630,24 +687,217 @@ def read_file_chunk(console: Console, file_path: str, chunk_size: int, chunk_off
         raise
 
 
-def search_file(console: Console, file_path: str, pattern: str, context_lines: int = 2) -> List[Dict[str, Any]]:
+def compile_search_pattern(pattern: str, regex: bool = False, whole_word: bool = False) -> "re.Pattern":
+    """
+    Compile a search pattern into a case-insensitive regular expression.
+
+    Args:
+        pattern: Text (or regular expression, with `regex`) to search for
+        regex: Whether the pattern is a regular expression
+        whole_word: Whether matches must not be part of a longer word
+
+    Returns:
+        re.Pattern: Compiled pattern
+
+    Raises:
+        ValueError: If the pattern is empty or not a valid regular expression
+    """
+    if not pattern:
+        raise ValueError("Search pattern cannot be empty")
+
+    body = pattern if regex else re.escape(pattern)
+    if whole_word:
+        body = rf"(?<!\w)(?:{body})(?!\w)"
+    try:
+        return re.compile(body, re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Invalid regular expression {pattern!r}: {e}") from e
+
+
+def _highlight(line_text: str, matcher: "re.Pattern") -> str:
+    """Wrap the first match in a line in highlight markup."""
+    match = matcher.search(line_text)
+    if not match or match.end() == match.start():
+        return line_text
+    return line_text[: match.start()] + f"[bold yellow]{match.group()}[/bold yellow]" + line_text[match.end() :]
+
+
+def _block_matcher(matcher: "re.Pattern") -> Optional["re.Pattern"]:
+    """
+    Multi-line variant of `matcher` for ruling out whole blocks, or None if a block can't be
+    checked as one string: anchors to the start or end of the input, lookarounds that would
+    see the neighbouring lines, and atomic groups or possessive quantifiers that could swallow
+    a newline without backtracking. Whole-word boundaries are safe: a newline is not a word
+    character.
+    """
+    pattern = matcher.pattern.replace(r"(?<!\w)", "").replace(r"(?!\w)", "")
+    unsafe = (r"\A", r"\Z", r"\z", "(?<", "(?=", "(?!", "(?>", "*+", "++", "?+", "}+")
+    if any(token in pattern for token in unsafe):
+        return None
+    return re.compile(matcher.pattern, matcher.flags | re.MULTILINE)
+
+
+def _decode_lines(data: bytes) -> str:
+    """Decode whole lines, translating \\r\\n and lone \\r to \\n as text mode does."""
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _read_blocks(f) -> Iterator[str]:
+    """
+    Decoded blocks of SEARCH_BLOCK_BYTES from a binary file, each ending at a line boundary,
+    with newlines translated as in text mode. A block is never cut between \\r and \\n.
+    """
+    carry = bytearray()
+    while True:
+        block = f.read(SEARCH_BLOCK_BYTES)
+        if not block:
+            if carry:
+                yield _decode_lines(bytes(carry))
+            return
+        # A trailing \r may be the first half of \r\n: leave it for the next block
+        end = len(block) - 1 if block.endswith(b"\r") else len(block)
+        cut = max(block.rfind(b"\n", 0, end), block.rfind(b"\r", 0, end)) + 1
+        if not cut:
+            # A line longer than a block: keep reading until it ends
+            carry += block
+            continue
+        yield _decode_lines(bytes(carry) + block[:cut])
+        carry = bytearray(block[cut:])
+
+
+def _split_lines(text: str) -> List[str]:
+    """Split on newlines only, keeping them (unlike str.splitlines, which also splits on \\r, \\f, ...)."""
+    lines = [line + "\n" for line in text.split("\n")]
+    lines[-1] = lines[-1][:-1]
+    return lines if lines[-1] else lines[:-1]
+
+
+def iter_matches(
+    file_path: str,
+    matcher: "re.Pattern",
+    context_lines: int = 2,
+    stop: Optional[threading.Event] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the lines of a file matching `matcher`, with context, in constant memory.
+
+    The file is read in binary blocks of SEARCH_BLOCK_BYTES. A block without any match is
+    skipped as a whole, keeping only its line count and last lines; other blocks are
+    scanned line by line. Only the last `context_lines` lines are kept (a ring buffer for
+    before-context), plus the matches still waiting for their after-context, so memory
+    does not grow with the file (beyond its longest line). Each match is yielded as soon
+    as its context is complete.
+
+    Yields:
+        Dict[str, Any]: Match with line number and highlighted context
+    """
+    block_matcher = _block_matcher(matcher)
+    before: deque = deque(maxlen=max(context_lines, 0))
+    # [line number, context lines, after-context lines still needed], oldest first
+    waiting: deque = deque()
+    line_number = 0
+
+    with open(file_path, "rb", buffering=0) as f:
+        for text in _read_blocks(f):
+            if stop is not None and stop.is_set():
+                return
+
+            if block_matcher is not None and not waiting and not block_matcher.search(text):
+                body = text[:-1] if text.endswith("\n") else text
+                count = body.count("\n") + 1
+                if context_lines > 0:
+                    tail = body.rsplit("\n", context_lines)[-context_lines:]
+                    first = line_number + count - len(tail) + 1
+                    before.extend((first + offset, line.rstrip()) for offset, line in enumerate(tail))
+                line_number += count
+                continue
+
+            for line in _split_lines(text):
+                line_number += 1
+                line_text = line.rstrip()
+
+                for entry in waiting:
+                    entry[1].append(f"  {line_number}: {line_text}")
+                    entry[2] -= 1
+
+                if matcher.search(line):
+                    context = [f"  {number}: {previous}" for number, previous in before]
+                    context.append(f"→ {line_number}: {_highlight(line_text, matcher)}")  # Highlight the matching line
+                    waiting.append([line_number, context, context_lines])
+
+                while waiting and waiting[0][2] <= 0:
+                    number, context, _ = waiting.popleft()
+                    yield {"line_number": number, "context": "\n".join(context)}
+
+                before.append((line_number, line_text))
+
+    # Matches near the end of the file get whatever after-context there is
+    for number, context, _ in waiting:
+        yield {"line_number": number, "context": "\n".join(context)}
+
+
+def find_matches(
+    file_path: str,
+    matcher: "re.Pattern",
+    context_lines: int = 2,
+    max_matches: Optional[int] = None,
+    stop: Optional[threading.Event] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Collect up to `max_matches` matches of a file without printing anything.
+
+    Safe to call from worker threads. Scanning ends after `max_matches` matches or as soon
+    as `stop` is set.
+
+    Returns:
+        List[Dict[str, Any]]: Matches with line number and highlighted context
+    """
+    return list(islice(iter_matches(file_path, matcher, context_lines, stop), max_matches))
+
+
+def print_matches(console: Console, results: List[Dict[str, Any]]) -> None:
+    """Print a panel for each match."""
+    for result in results:
+        console.print(
+            Panel(
+                escape(result["context"]),
+                title=f"[bold green]Match at line {result['line_number']}",
+                border_style="blue",
+                expand=False,
+            )
+        )
+
+
+def search_file(
+    console: Console,
+    file_path: str,
+    pattern: str,
+    context_lines: int = 2,
+    regex: bool = False,
+    whole_word: bool = False,
+    max_matches: Optional[int] = None,
+) -> List[Dict[str, Any]]:
     """
     Search file for pattern and return matches with context.
 
-    Searches for a text pattern within a file and returns matching lines
-    with the specified number of context lines before and after each match.
+    Searches for a text pattern (case-insensitive, optionally a regular expression or a
+    whole word) within a file and returns matching lines with the specified number of
+    context lines before and after each match.
 
     Args:
         file_path: Path to the file
         pattern: Text pattern to search for
         context_lines: Number of lines of context around matches
+        regex: Whether the pattern is a regular expression
+        whole_word: Whether to match whole words only
+        max_matches: Stop after this many matches
 
     Returns:
         List[Dict[str, Any]]: List of matches with line number and context
 
     Raises:
         FileNotFoundError: If the file doesn't exist
-        ValueError: If the path is not a file or pattern is empty
+        ValueError: If the path is not a file or pattern is empty or invalid
     """
     file_path = expanduser(file_path)
 
@@ -657,53 +907,15 @@ def search_file(console: Console, file_path: str, pattern: str, context_lines: i
     if not os.path.isfile(file_path):
         raise ValueError(f"Path is not a file: {file_path}")
 
-    if not pattern:
-        raise ValueError("Search pattern cannot be empty")
+    matcher = compile_search_pattern(pattern, regex, whole_word)
 
-    results = []
     try:
-        with open(file_path, "r") as f:
-            lines = f.readlines()
-
-        total_matches = 0
-        for i, line in enumerate(lines):
-            if pattern.lower() in line.lower():
-                total_matches += 1
-                start = max(0, i - context_lines)
-                end = min(len(lines), i + context_lines + 1)
-
-                context_text = []
-                for ctx_idx in range(start, end):
-                    prefix = "  "
-                    if ctx_idx == i:
-                        prefix = "→ "  # Highlight the matching line
-                    line_text = lines[ctx_idx].rstrip()
-                    # Highlight the matching pattern in the line
-                    if ctx_idx == i:
-                        pattern_idx = line_text.lower().find(pattern.lower())
-                        if pattern_idx != -1:
-                            line_text = (
-                                line_text[:pattern_idx]
-                                + f"[bold yellow]{line_text[pattern_idx : pattern_idx + len(pattern)]}[/bold yellow]"
-                                + line_text[pattern_idx + len(pattern) :]
-                            )
-                    context_text.append(f"{prefix}{ctx_idx + 1}: {line_text}")
-
-                match_text = "\n".join(context_text)
-                # Create a panel for each match
-                panel = Panel(
-                    escape(match_text),
-                    title=f"[bold green]Match at line {i + 1}",
-                    border_style="blue",
-                    expand=False,
-                )
-                console.print(panel)
-
-                results.append({"line_number": i + 1, "context": match_text})
+        results = find_matches(file_path, matcher, context_lines, max_matches)
+        print_matches(console, results)
 
         # Print summary
         summary = Panel(
-            escape(f"Found {total_matches} matches for pattern '{pattern}' in {os.path.basename(file_path)}"),
+            escape(f"Found {len(results)} matches for pattern '{pattern}' in {os.path.basename(file_path)}"),
             title="[bold yellow]Search Summary",
             border_style="yellow",
             expand=False,
@@ -722,6 +934,98 @@ def search_file(console: Console, file_path: str, pattern: str, context_lines: i
         raise
 
 
+def search_files(
+    console: Console,
+    file_paths: List[str],
+    matcher: "re.Pattern",
+    context_lines: int = 2,
+    max_matches: Optional[int] = None,
+    max_files: Optional[int] = None,
+) -> List[ToolResultContent]:
+    """
+    Search many files on a worker pool and return the matches in file order, then line order.
+
+    Files are scanned concurrently but their results are consumed in order, so the output is
+    the same as a sequential search truncated at `max_matches` matches or `max_files` files
+    with matches (FILE_READ_MAX_MATCHES_DEFAULT and FILE_READ_MAX_FILES_DEFAULT when None).
+    Once a limit is reached, the remaining files are only checked for a first match, to tell
+    whether anything was actually left out; the search stops at that match.
+
+    Returns:
+        List[ToolResultContent]: One entry per match or per unreadable file, plus a note when
+        a limit cut the search short
+    """
+    workers = max(1, int(os.getenv("FILE_READ_SEARCH_WORKERS", "8")))
+    if max_matches is None:
+        max_matches = int(os.getenv("FILE_READ_MAX_MATCHES_DEFAULT", "200"))
+    if max_files is None:
+        max_files = int(os.getenv("FILE_READ_MAX_FILES_DEFAULT", "50"))
+    max_matches, max_files = max(1, max_matches), max(1, max_files)
+    stop = threading.Event()
+    content: List[ToolResultContent] = []
+    total_matches = files_with_matches = 0
+    # Set once a limit is hit; limit_reached only once something beyond it is known to match.
+    limited = limit_reached = False
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="file-search") as pool:
+        pending: deque = deque()
+        next_file = 0
+
+        def submit_next() -> None:
+            nonlocal next_file
+            if next_file < len(file_paths):
+                file_path = file_paths[next_file]
+                # One extra match tells whether this file alone exceeds the limit.
+                wanted = 1 if limited else max_matches + 1
+                pending.append((file_path, pool.submit(find_matches, file_path, matcher, context_lines, wanted, stop)))
+                next_file += 1
+
+        for _ in range(workers * 4):
+            submit_next()
+
+        while pending:
+            file_path, future = pending.popleft()
+            try:
+                results = future.result()
+            except Exception as e:
+                if not limited:
+                    error_msg = f"Error processing file {file_path}: {str(e)}"
+                    console.print(Panel(escape(error_msg), title="[bold red]Error", border_style="red"))
+                    content.append({"text": error_msg})
+                submit_next()
+                continue
+
+            if results and limited:
+                limit_reached = True
+                break
+            if results:
+                kept = results[: max_matches - total_matches]
+                print_matches(console, kept)
+                content.extend({"text": r["context"]} for r in kept)
+                total_matches += len(kept)
+                files_with_matches += 1
+                if total_matches >= max_matches or files_with_matches >= max_files:
+                    limited = True
+                    if len(results) > len(kept):
+                        limit_reached = True
+                        break
+            submit_next()
+
+        stop.set()
+        for _, queued in pending:
+            queued.cancel()
+
+    summary = f"Found {total_matches} matches in {files_with_matches} files"
+    if limit_reached:
+        summary += (
+            f" (stopped at max_matches={max_matches}, max_files={max_files}; "
+            "narrow the path or pattern to see the rest)"
+        )
+        content.append({"text": summary})
+    console.print(Panel(escape(summary), title="[bold yellow]Search Summary", border_style="yellow", expand=False))
+    return content
+
+
 def create_diff(file_path: str, comparison_path: str, diff_type: str = "unified") -> str:
     """
     Create a diff between two files or directories.
@@ -742,7 +1046,6 @@ def create_diff(file_path: str, comparison_path: str, diff_type: str = "unified"
     """
     try:
         import difflib
-        from pathlib import Path
 
         file_path = expanduser(file_path)
         comparison_path = expanduser(comparison_path)
@@ -756,9 +1059,14 @@ def create_diff(file_path: str, comparison_path: str, diff_type: str = "unified"
         if os.path.isdir(file_path) and os.path.isdir(comparison_path):
             diff_results = []
 
-            # Get all files in both directories
+            # Get all files in both directories (from the file index inside cloned repositories)
             def get_files(path: str) -> set:
-                return set(str(p.relative_to(path)) for p in Path(path).rglob("*") if p.is_file())
+                indexed = find_indexed(path, include_hidden=True)
+                if indexed is not None:
+                    return set(os.path.relpath(file, path) for file in indexed)
+                return set(
+                    os.path.relpath(os.path.join(root, name), path) for root, _dirs, files in walk(path) for name in files
+                )
 
             files1 = get_files(file_path)
             files2 = get_files(comparison_path)
@@ -956,7 +1264,8 @@ def file_read(tool: ToolUse, **kwargs: Any) -> ToolResult:
     - view: Shows full file contents with syntax highlighting
     - lines: Shows specific line ranges from files
     - chunk: Reads binary chunks from files at specific offsets
-    - search: Searches for patterns with context highlighting
+    - search: Searches for patterns (plain, regex or whole word) with context highlighting,
+      across files in parallel and bounded by max_matches/max_files
     - stats: Displays file statistics like size and line count
     - preview: Shows a quick preview of file content
     - diff: Compares two files or directories and shows differences
@@ -1004,6 +1313,8 @@ def file_read(tool: ToolUse, **kwargs: Any) -> ToolResult:
     # Get environment variables at runtime
     file_read_recursive_default = os.getenv("FILE_READ_RECURSIVE_DEFAULT", "true").lower() == "true"
     file_read_context_lines_default = int(os.getenv("FILE_READ_CONTEXT_LINES_DEFAULT", "2"))
+    file_read_max_matches_default = int(os.getenv("FILE_READ_MAX_MATCHES_DEFAULT", "200"))
+    file_read_max_files_default = int(os.getenv("FILE_READ_MAX_FILES_DEFAULT", "50"))
     file_read_start_line_default = int(os.getenv("FILE_READ_START_LINE_DEFAULT", "0"))
     file_read_chunk_offset_default = int(os.getenv("FILE_READ_CHUNK_OFFSET_DEFAULT", "0"))
     file_read_diff_type_default = os.getenv("FILE_READ_DIFF_TYPE_DEFAULT", "unified")
@@ -1118,6 +1429,29 @@ def file_read(tool: ToolUse, **kwargs: Any) -> ToolResult:
                 "content": [{"text": f"Found {len(matching_files)} files:\n" + "\n".join(matching_files)}],
             }
 
+        # Handle search mode
+        if mode == "search":
+            search_pattern = tool_input.get("search_pattern", "")
+            regex = tool_input.get("regex", False)
+            matcher = compile_search_pattern(search_pattern, regex, tool_input.get("whole_word", False))
+            if not regex:
+                # Indexed repositories rule out files that can't contain the search pattern
+                matching_files = narrow_search(matching_files, search_pattern)
+
+            response_content = search_files(
+                console,
+                matching_files,
+                matcher,
+                tool_input.get("context_lines", file_read_context_lines_default),
+                tool_input.get("max_matches", file_read_max_matches_default),
+                tool_input.get("max_files", file_read_max_files_default),
+            )
+            return {
+                "toolUseId": tool_use_id,
+                "status": "success",
+                "content": response_content,
+            }
+
         # Process each file for other modes
         for file_path in matching_files:
             try:
@@ -1184,15 +1518,6 @@ def file_read(tool: ToolUse, **kwargs: Any) -> ToolResult:
                     )
                     response_content.append({"text": content})
 
-                elif mode == "search":
-                    results = search_file(
-                        console,
-                        file_path,
-                        tool_input.get("search_pattern", ""),
-                        tool_input.get("context_lines", file_read_context_lines_default),
-                    )
-                    response_content.extend([{"text": r["context"]} for r in results])
-
                 elif mode == "diff":
                     comparison_path = tool_input.get("comparison_path")
                     if not comparison_path:
@@ -3,7 +3,7 @@ Daily journal management tool for Strands Agent.
 
 This module provides functionality to create and manage daily journal entries with
 rich text formatting, including task lists and notes. Journal entries are saved as
-Markdown files in the cwd()/journal/ directory, organized by date.
+Markdown files in the journal/ directory of the current session's workspace, organized by date.
 
 Journal entries support both regular text notes and task management with checkboxes.
 The tool provides a beautiful rich text interface with panels, tables, and formatting
@@ -57,6 +57,7 @@ from rich.text import Text
 from strands.types.tools import ToolResult, ToolUse
 
 from custom_tools.utils import console_util
+from integration.workspace import check_quota, workspace_dir
 
 TOOL_SPEC = {
     "name": "journal",
@@ -93,15 +94,13 @@ def ensure_journal_dir() -> Path:
     """
     Ensure journal directory exists.
 
-    Creates the journal directory if it doesn't exist and returns
-    the path to it.
+    Creates the journal directory in the current session's workspace if it
+    doesn't exist and returns the path to it.
 
     Returns:
         Path: The path to the journal directory
     """
-    journal_dir = Path.cwd() / "journal"
-    journal_dir.mkdir(parents=True, exist_ok=True)
-    return journal_dir
+    return workspace_dir("journal")
 
 
 def get_journal_path(date_str: Optional[str] = None) -> Path:
@@ -205,7 +204,7 @@ def journal(tool: ToolUse, **kwargs: Any) -> ToolResult:
 
     This tool allows you to write and read journal entries, add tasks, and list all
     available journal entries. Each journal is stored as a Markdown file in the
-    cwd()/journal/ directory, organized by date.
+    journal/ directory of the current session's workspace, organized by date.
 
     How It Works:
     ------------
@@ -272,6 +271,7 @@ def journal(tool: ToolUse, **kwargs: Any) -> ToolResult:
                     "content": [{"text": "Content is required for write action"}],
                 }
 
+            check_quota()
             journal_path = get_journal_path(date)
             timestamp = datetime.now().strftime("%H:%M:%S")
 
@@ -356,6 +356,7 @@ def journal(tool: ToolUse, **kwargs: Any) -> ToolResult:
                     "content": [{"text": "Task is required for add_task action"}],
                 }
 
+            check_quota()
             journal_path = get_journal_path(date)
             timestamp = datetime.now().strftime("%H:%M:%S")
 
@@ -0,0 +1,206 @@
+"""
+Compact tool schemas for Strands agents.
+
+Strands sends every tool spec to the model on each agent step. The `file_read` TOOL_SPEC and
+the `shell` / `journal` docstrings are written for humans and cost thousands of prompt tokens
+per step. This module derives minimal specs from the same sources: a one-sentence tool
+description, short property descriptions, and no descriptions that only repeat an enum.
+
+Set STRANDS_TOOL_SCHEMA_MODE=compact to hand the compact specs to the agent, and run
+`python -m custom_tools.utils.compact_schema` for a token report of full vs compact schemas.
+"""
+
+import copy
+import json
+import math
+import os
+import re
+from types import ModuleType
+from typing import Any, Dict, List, Union
+
+from rich import box
+from rich.console import Console
+from rich.table import Table
+from strands.tools.tools import PythonAgentTool
+from strands.types.tools import AgentTool, ToolSpec
+
+MAX_TOOL_DESCRIPTION_CHARS = 160
+MAX_PROPERTY_DESCRIPTION_CHARS = 60
+
+ToolLike = Union[ModuleType, AgentTool]
+
+
+def _first_sentence(text: str, limit: int) -> str:
+    """First sentence of the first paragraph, truncated to `limit` characters."""
+    paragraph = text.strip().split("\n\n", 1)[0]
+    paragraph = " ".join(paragraph.split())
+    sentence = re.split(r"(?<=[.!?])\s|:\s|\s\(", paragraph, maxsplit=1)[0].rstrip(".:")
+    if len(sentence) > limit:
+        sentence = sentence[: limit - 3].rstrip() + "..."
+    return sentence
+
+
+def compact_json_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively shorten property descriptions and drop those that only list enum values."""
+    schema = copy.deepcopy(schema)
+
+    description = schema.get("description")
+    if description:
+        if "enum" in schema:
+            del schema["description"]
+        else:
+            schema["description"] = _first_sentence(description, MAX_PROPERTY_DESCRIPTION_CHARS)
+    schema.pop("default", None)
+    schema.pop("examples", None)
+
+    if "properties" in schema:
+        schema["properties"] = {name: compact_json_schema(prop) for name, prop in schema["properties"].items()}
+    if isinstance(schema.get("items"), dict):
+        schema["items"] = compact_json_schema(schema["items"])
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            schema[key] = [compact_json_schema(sub) for sub in schema[key]]
+    return schema
+
+
+def compact_tool_spec(tool_spec: ToolSpec) -> ToolSpec:
+    """Build the compact counterpart of a full tool spec."""
+    return {
+        "name": tool_spec["name"],
+        "description": _first_sentence(tool_spec["description"], MAX_TOOL_DESCRIPTION_CHARS),
+        "inputSchema": {"json": compact_json_schema(tool_spec["inputSchema"]["json"])},
+    }
+
+
+class CompactSchemaTool(AgentTool):
+    """Delegates execution to the wrapped tool but advertises a different spec to the model."""
+
+    def __init__(self, tool: AgentTool, tool_spec: ToolSpec) -> None:
+        super().__init__()
+        self._tool = tool
+        self._tool_spec = tool_spec
+
+    @property
+    def tool_name(self) -> str:
+        return self._tool.tool_name
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        return self._tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self._tool.tool_type
+
+    def stream(self, tool_use, invocation_state, **kwargs):
+        return self._tool.stream(tool_use, invocation_state, **kwargs)
+
+
+def _resolve_module_tool(tool: ToolLike) -> ToolLike:
+    """Modules without a TOOL_SPEC (like `shell`) expose a decorated function named after the module."""
+    if isinstance(tool, ModuleType) and not hasattr(tool, "TOOL_SPEC"):
+        return getattr(tool, tool.__name__.rsplit(".", 1)[-1])
+    return tool
+
+
+def full_tool_spec(tool: ToolLike) -> ToolSpec:
+    """Full spec of a module-based tool (TOOL_SPEC) or a decorated/agent tool."""
+    tool = _resolve_module_tool(tool)
+    if isinstance(tool, ModuleType):
+        return tool.TOOL_SPEC
+    return tool.tool_spec
+
+
+def to_compact_tool(tool: ToolLike) -> AgentTool:
+    """Wrap a module-based or decorated tool so the agent sees its compact spec."""
+    tool = _resolve_module_tool(tool)
+    spec = compact_tool_spec(full_tool_spec(tool))
+    if isinstance(tool, ModuleType):
+        return PythonAgentTool(spec["name"], spec, getattr(tool, tool.TOOL_SPEC["name"]))
+    return CompactSchemaTool(tool, spec)
+
+
+def apply_schema_mode(tools: List[ToolLike], mode: str = None) -> List[Any]:
+    """
+    Return the tool list to register with the agent for the given schema mode.
+
+    Args:
+        tools: Module-based tools and decorated tools as normally passed to `Agent(tools=...)`
+        mode: "full" or "compact". Defaults to STRANDS_TOOL_SCHEMA_MODE (default: full)
+    """
+    mode = mode or os.getenv("STRANDS_TOOL_SCHEMA_MODE", "full")
+    if mode == "full":
+        return list(tools)
+    if mode != "compact":
+        raise ValueError(f"Unknown tool schema mode: {mode}. Expected 'full' or 'compact'")
+    return [to_compact_tool(tool) for tool in tools]
+
+
+def estimate_tokens(tool_spec: ToolSpec) -> int:
+    """Rough token count of a spec as serialized for the model (~4 characters per token)."""
+    return math.ceil(len(json.dumps(tool_spec, separators=(",", ":"))) / 4)
+
+
+def schema_token_report(tools: List[ToolLike]) -> List[Dict[str, Any]]:
+    """Estimated prompt tokens of the full and compact spec of every tool."""
+    report = []
+    for tool in tools:
+        spec = full_tool_spec(tool)
+        full_tokens = estimate_tokens(spec)
+        compact_tokens = estimate_tokens(compact_tool_spec(spec))
+        report.append(
+            {
+                "name": spec["name"],
+                "full_tokens": full_tokens,
+                "compact_tokens": compact_tokens,
+                "saved_tokens": full_tokens - compact_tokens,
+            }
+        )
+    return report
+
+
+def print_token_report(console: Console, tools: List[ToolLike]) -> None:
+    """Print the token report as a table, with a total row."""
+    report = schema_token_report(tools)
+
+    table = Table(title="Tool Schema Tokens (estimated)", box=box.ROUNDED)
+    table.add_column("Tool", style="cyan")
+    table.add_column("Full", justify="right")
+    table.add_column("Compact", justify="right", style="green")
+    table.add_column("Saved", justify="right", style="yellow")
+
+    for row in report:
+        table.add_row(row["name"], str(row["full_tokens"]), str(row["compact_tokens"]), str(row["saved_tokens"]))
+    table.add_row(
+        "[bold]Total",
+        str(sum(r["full_tokens"] for r in report)),
+        str(sum(r["compact_tokens"] for r in report)),
+        str(sum(r["saved_tokens"] for r in report)),
+    )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    from custom_tools import file_read, journal, shell
+    from integration.confluence import get_confluence_outline, get_confluence_page, get_confluence_section
+    from integration.github_utils import add_sparse_paths, clone_github_repo
+    from integration.jira import create_jira_stories, create_jira_story
+    from integration.jira_outbox import get_jira_story_status, queue_jira_story
+
+    print_token_report(
+        Console(),
+        [
+            file_read,
+            journal,
+            shell,
+            get_confluence_page,
+            get_confluence_outline,
+            get_confluence_section,
+            create_jira_story,
+            create_jira_stories,
+            queue_jira_story,
+            get_jira_story_status,
+            clone_github_repo,
+            add_sparse_paths,
+        ],
+    )
@@ -0,0 +1,366 @@
+"""
+Persistent per-repository file index for file_read.
+
+The index of a repository root in a session workspace (a directory containing `.git` or the
+`.nemo-snapshot` marker written by archive fetches) holds every file's relative path, size,
+mtime and detected language, plus the mtime of every directory. It is stored under FILE_INDEX_DIR and refreshed
+incrementally: only directories whose mtime changed are listed again, so a refresh costs one
+`stat` per directory instead of a full walk. That picks up added, removed and renamed files
+(including editors that save by renaming), but not a file rewritten in place, which leaves its
+directory untouched; `metadata` therefore re-checks the one file it is asked about.
+Directories and files excluded by the repository's ignore rules (see ignore_rules) are never
+indexed.
+
+file_read resolves paths through it in every mode: find and the other modes via find_files,
+and directory comparisons in diff mode via `find_indexed`.
+"""
+
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from custom_tools.utils.detect_language import detect_language
+from custom_tools.utils.ignore_rules import REPO_ROOT_MARKERS, filter_paths, get_ignore_rules, walk
+from integration.workspace import WORKSPACE_ROOT
+
+FILE_INDEX_DIR = os.getenv("FILE_INDEX_DIR", "./tmp/file_index")
+# A refresh within this many seconds of the last one is skipped.
+FILE_INDEX_REFRESH_SECS = float(os.getenv("FILE_INDEX_REFRESH_SECS", "2"))
+INDEX_VERSION = 3
+
+_registry_lock = threading.Lock()
+_registry: Dict[str, "FileIndex"] = {}
+
+
+def find_repo_root(path: str) -> Optional[str]:
+    """
+    Real path of the repository root containing `path`, or None outside a repository.
+    Only repositories inside session workspaces are indexed.
+    """
+    workspace_root = os.path.realpath(WORKSPACE_ROOT)
+    current = os.path.realpath(path)
+    if not current.startswith(workspace_root + os.sep):
+        return None
+    if not os.path.isdir(current):
+        current = os.path.dirname(current)
+    while True:
+        if any(os.path.exists(os.path.join(current, marker)) for marker in REPO_ROOT_MARKERS):
+            return current
+        parent = os.path.dirname(current)
+        if parent == workspace_root or parent == current:
+            return None
+        current = parent
+
+
+class FileIndex:
+    """File metadata of one repository root, persisted and refreshed by directory mtime."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        # relative dir -> {"mtime_ns": int, "ignore_mtime_ns": int, "files": {name: [size, mtime_ns, language]},
+        #                  "subdirs": [name]}
+        self.dirs: Dict[str, Dict] = {}
+        self.ignore = get_ignore_rules(root)
+        self._rules_signature = self.ignore.signature()
+        self._lock = threading.Lock()
+        self._refreshed_at = 0.0
+        self._sorted_files: Optional[List[str]] = None
+        # Bumped whenever recorded file metadata changes, so dependent indexes can skip unchanged trees.
+        self.generation = 0
+        digest = hashlib.sha1(root.encode()).hexdigest()[:16]
+        self._path = Path(FILE_INDEX_DIR) / f"{digest}.json"
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self._path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        current = (INDEX_VERSION, self.root, self._rules_signature)
+        if (data.get("version"), data.get("root"), data.get("rules")) == current:
+            self.dirs = data["dirs"]
+
+    def _save(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix(f".tmp-{threading.get_ident()}")
+        tmp_path.write_text(
+            json.dumps({"version": INDEX_VERSION, "root": self.root, "rules": self._rules_signature, "dirs": self.dirs})
+        )
+        os.replace(tmp_path, self._path)
+
+    def _scan_dir(self, rel_dir: str) -> None:
+        abs_dir = os.path.join(self.root, rel_dir)
+        ignore_mtime_ns = self.ignore.load_dir(rel_dir)
+        files, subdirs = {}, []
+        with os.scandir(abs_dir) as entries:
+            for entry in entries:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if self.ignore.is_ignored(_join(rel_dir, entry.name), is_dir):
+                    continue
+                if is_dir:
+                    subdirs.append(entry.name)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files[entry.name] = [stat.st_size, stat.st_mtime_ns, detect_language(entry.name)]
+        self.dirs[rel_dir] = {
+            "mtime_ns": os.stat(abs_dir).st_mtime_ns,
+            "ignore_mtime_ns": ignore_mtime_ns,
+            "files": files,
+            "subdirs": sorted(subdirs),
+        }
+
+    def _drop_dir(self, rel_dir: str) -> None:
+        entry = self.dirs.pop(rel_dir, None)
+        for name in entry["subdirs"] if entry else []:
+            self._drop_dir(_join(rel_dir, name))
+
+    def _changed(self, rel_dir: str) -> bool:
+        entry = self.dirs[rel_dir]
+        abs_dir = os.path.join(self.root, rel_dir)
+        try:
+            if os.stat(abs_dir).st_mtime_ns != entry["mtime_ns"]:
+                return True
+            # A .gitignore edited in place doesn't touch its directory's mtime.
+            return bool(entry["ignore_mtime_ns"]) and (
+                os.stat(os.path.join(abs_dir, ".gitignore")).st_mtime_ns != entry["ignore_mtime_ns"]
+            )
+        except FileNotFoundError:
+            return True
+
+    def refresh(self, force: bool = False) -> Dict[str, int]:
+        """Bring the index up to date. Returns how many directories were listed again."""
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed_at < FILE_INDEX_REFRESH_SECS:
+                return {"rescanned": 0}
+            signature = self.ignore.signature()
+            if signature != self._rules_signature:
+                self.dirs, self._rules_signature = {}, signature
+            pending = [rel_dir for rel_dir in list(self.dirs) if self._changed(rel_dir)] if self.dirs else [""]
+            rescanned = 0
+            while pending:
+                rel_dir = pending.pop()
+                old = self.dirs.get(rel_dir)
+                if not os.path.isdir(os.path.join(self.root, rel_dir)):
+                    self._drop_dir(rel_dir)
+                    continue
+                self._scan_dir(rel_dir)
+                rescanned += 1
+                subdirs = self.dirs[rel_dir]["subdirs"]
+                if old and old["ignore_mtime_ns"] != self.dirs[rel_dir]["ignore_mtime_ns"]:
+                    # Rules changed for the whole subtree: list it again.
+                    for name in old["subdirs"]:
+                        self._drop_dir(_join(rel_dir, name))
+                for removed in set(old["subdirs"] if old else []) - set(subdirs):
+                    self._drop_dir(_join(rel_dir, removed))
+                pending.extend(_join(rel_dir, name) for name in subdirs if _join(rel_dir, name) not in self.dirs)
+            if rescanned:
+                self._sorted_files = None
+                self.generation += 1
+                self._save()
+            self._refreshed_at = time.monotonic()
+            return {"rescanned": rescanned}
+
+    def _all_files(self) -> List[str]:
+        if self._sorted_files is None:
+            self._sorted_files = sorted(
+                _join(rel_dir, name) for rel_dir, entry in self.dirs.items() for name in entry["files"]
+            )
+        return self._sorted_files
+
+    def _restat(self, rel_path: str) -> Optional[list]:
+        entry = self.dirs.get(os.path.dirname(rel_path))
+        values = entry["files"].get(os.path.basename(rel_path)) if entry else None
+        if not values:
+            return None
+        try:
+            stat = os.stat(os.path.join(self.root, rel_path))
+        except FileNotFoundError:
+            return None
+        if [stat.st_size, stat.st_mtime_ns] != values[:2]:
+            with self._lock:
+                values[:2] = [stat.st_size, stat.st_mtime_ns]
+                self.generation += 1
+        return values
+
+    def restat(self, rel_path: str) -> Optional[Tuple[int, int]]:
+        """Current (size, mtime_ns) of an indexed file, recorded in the index if it was edited in place."""
+        values = self._restat(rel_path)
+        return (values[0], values[1]) if values else None
+
+    def metadata(self, rel_path: str) -> Optional[Dict]:
+        """Size, mtime and language of an indexed file, re-checked in case it was edited in place."""
+        values = self._restat(rel_path)
+        if not values:
+            return None
+        return {"size": values[0], "mtime": values[1] / 1e9, "language": values[2]}
+
+    def iter_stats(self) -> Iterator[Tuple[str, int, int]]:
+        """(relative path, size, mtime_ns) of every indexed file, as last recorded (no `stat` calls)."""
+        for rel_dir, entry in list(self.dirs.items()):
+            for name, (size, mtime_ns, _) in list(entry["files"].items()):
+                yield _join(rel_dir, name), size, mtime_ns
+
+    def iter_files(self, rel_dir: str = "", recursive: bool = True) -> Iterator[str]:
+        """Relative paths of the files under `rel_dir`, sorted."""
+        if not recursive:
+            entry = self.dirs.get(rel_dir)
+            return iter(sorted(_join(rel_dir, name) for name in entry["files"])) if entry else iter([])
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        return (path for path in self._all_files() if path.startswith(prefix))
+
+    def iter_dirs(self, rel_dir: str = "") -> Iterator[str]:
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        return iter(sorted(path for path in self.dirs if path and path.startswith(prefix)))
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+def get_file_index(root: str) -> FileIndex:
+    """Shared, refreshed index of a repository root. Indexes of removed roots are dropped."""
+    with _registry_lock:
+        for stale in [known for known in _registry if not os.path.isdir(known)]:
+            _registry.pop(stale)._path.unlink(missing_ok=True)
+        index = _registry.get(root)
+        if index is None:
+            index = _registry[root] = FileIndex(root)
+    index.refresh()
+    return index
+
+
+def _static_prefix(pattern: str) -> str:
+    """Leading path components of a glob pattern that contain no wildcards."""
+    parts = []
+    for part in pattern.split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts)
+
+
+class GlobMatcher:
+    """
+    Matches paths against a glob pattern with the semantics of `glob.glob(pattern, recursive=...)`:
+    each component is matched with `fnmatch`, wildcards don't match a leading dot, and a "**"
+    component (when recursive) matches zero or more non-hidden directories.
+    """
+
+    def __init__(self, pattern: str, recursive: bool) -> None:
+        self.segments = pattern.split("/")
+        self.recursive = recursive
+        # A pattern ending in "/" only matches directories, which glob returns with the slash.
+        self.dirs_only = self.segments[-1] == ""
+        if self.dirs_only:
+            self.segments.pop()
+        self._matchers = [re.compile(fnmatch.translate(segment)).match for segment in self.segments]
+
+    def _match_from(self, i: int, parts: List[str], j: int, end: Optional[int] = None) -> bool:
+        end = len(self.segments) if end is None else end
+        if i == end:
+            return j == len(parts)
+        segment = self.segments[i]
+        if self.recursive and segment == "**":
+            # Try every number of non-hidden components for "**", shortest first.
+            for k in range(j, len(parts) + 1):
+                if self._match_from(i + 1, parts, k, end):
+                    return True
+                if k < len(parts) and parts[k].startswith("."):
+                    return False
+            return False
+        if j == len(parts):
+            return False
+        part = parts[j]
+        if part.startswith(".") and not segment.startswith(".") and glob.has_magic(segment):
+            return False
+        return bool(self._matchers[i](part)) and self._match_from(i + 1, parts, j + 1, end)
+
+    def match(self, path: str, is_dir: bool) -> Optional[str]:
+        """`path` as glob would return it (directories matched by a trailing "/" keep it), or None."""
+        if self.dirs_only and not is_dir:
+            return None
+        parts = path.rstrip("/").split("/")
+        last = self.segments[-1]
+        # Cheap rejection on the name before matching the whole path
+        if not (self.recursive and last == "**") and not self._matchers[-1](parts[-1]):
+            return None
+        if not self._match_from(0, parts, 0):
+            return None
+        # Like glob, a directory matched with a final "**" standing for nothing ends in "/".
+        trailing_slash = self.dirs_only or (
+            is_dir and self.recursive and last == "**" and self._match_from(0, parts, 0, len(self.segments) - 1)
+        )
+        return path.rstrip("/") + "/" if trailing_slash else path
+
+
+def find_indexed(pattern: str, recursive: bool = True, include_hidden: bool = False) -> Optional[List[str]]:
+    """
+    Resolve a directory or glob pattern from the file index, returning paths in the same form
+    as `os.walk`/`glob.glob` would. Directory listings skip hidden files unless `include_hidden`.
+    Returns None when the pattern is outside a repository.
+    """
+    base = pattern if os.path.isdir(pattern) else _static_prefix(pattern)
+    root = find_repo_root(base or ".")
+    if root is None:
+        return None
+    index = get_file_index(root)
+    base_real = os.path.realpath(base or ".")
+    base_rel = os.path.relpath(base_real, root)
+    base_rel = "" if base_rel == "." else base_rel
+    if base_rel.startswith("..") or base_rel not in index.dirs:
+        # Outside the root, or inside an ignored directory the caller named explicitly.
+        return None
+
+    def as_given(rel_path: str) -> str:
+        return os.path.join(base, rel_path[len(base_rel) + 1 :] if base_rel else rel_path)
+
+    if os.path.isdir(pattern):
+        # Directory listing: hidden files are skipped, as in find_files' walk.
+        return [
+            as_given(path)
+            for path in index.iter_files(base_rel, recursive)
+            if include_hidden or not os.path.basename(path).startswith(".")
+        ]
+
+    matcher = GlobMatcher(pattern, recursive)
+    candidates = [(path, False) for path in index.iter_files(base_rel)]
+    candidates += [(path, True) for path in [base_rel, *index.iter_dirs(base_rel)]]
+    matches = (matcher.match(as_given(path), is_dir) for path, is_dir in candidates)
+    return sorted(path for path in matches if path)
+
+
+def find_unindexed(pattern: str, recursive: bool = True) -> List[str]:
+    """
+    Resolve a glob pattern without an index. Recursive patterns walk from their static prefix
+    with ignored directories pruned; other patterns use `glob.glob` and drop ignored results.
+    """
+    base = _static_prefix(pattern)
+    if not (recursive and "**" in pattern):
+        return sorted(filter_paths(glob.glob(pattern, recursive=recursive), base))
+
+    matcher = GlobMatcher(pattern, recursive)
+    # "**" never matches hidden directories, so they are only entered for patterns that name one.
+    skip_hidden = not any(part.startswith(".") for part in pattern[len(base) :].split(os.sep))
+    matches = [matcher.match(base, True)] if base else []
+    for dirpath, dirs, files in walk(base or "."):
+        if skip_hidden:
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+        for names, is_dir in ((dirs, True), (files, False)):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                matches.append(matcher.match(path if base else os.path.relpath(path), is_dir))
+    return sorted(path for path in matches if path)
+
+
+def warm_file_index(repo_path: str) -> None:
+    """Build or refresh the index of a freshly cloned repository."""
+    root = find_repo_root(repo_path)
+    if root is not None:
+        get_file_index(root).refresh(force=True)
@@ -0,0 +1,232 @@
+"""
+.gitignore-aware pruning for file_read's directory traversal.
+
+Rules come, lowest precedence first, from FILE_READ_DEFAULT_IGNORES (generated and vendored
+trees such as node_modules/ or .venv/), the repository's .git/info/exclude, and every
+.gitignore from the repository root down to the directory being listed; the last matching
+pattern wins and "!" re-includes, as in git. Ignored directories are pruned before descent,
+so find, search and diff never list them. A path the caller names explicitly is still
+traversed; only what lies below it is filtered.
+"""
+
+import os
+import re
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Comma-separated gitignore patterns applied in every tree; set to "" to disable. ".git" has no
+# trailing slash so that the .git file of a linked worktree is skipped too.
+FILE_READ_DEFAULT_IGNORES = os.getenv(
+    "FILE_READ_DEFAULT_IGNORES",
+    ".git,node_modules/,.venv/,venv/,__pycache__/,.tox/,.nox/,.mypy_cache/,.pytest_cache/,"
+    ".ruff_cache/,build/,dist/,target/,vendor/,.next/,.gradle/,.idea/",
+)
+FILE_READ_RESPECT_GITIGNORE = os.getenv("FILE_READ_RESPECT_GITIGNORE", "true").lower() == "true"
+REPO_ROOT_MARKERS = (".git", ".nemo-snapshot")
+
+# (regex, negated, directories only)
+Rule = Tuple["re.Pattern", bool, bool]
+
+_registry_lock = threading.Lock()
+_registry: Dict[str, "IgnoreRules"] = {}
+
+
+def _translate(pattern: str) -> str:
+    """Regex for a gitignore pattern body: "*" and "?" stay within a component, "**" spans them."""
+    segments = pattern.split("/")
+    out = []
+    for i, segment in enumerate(segments):
+        last = i == len(segments) - 1
+        if segment == "**":
+            out.append(".*" if last else "(?:.*/)?")
+            continue
+        j = 0
+        while j < len(segment):
+            char = segment[j]
+            if char == "*":
+                out.append("[^/]*")
+            elif char == "?":
+                out.append("[^/]")
+            elif char == "[" and "]" in segment[j + 2 :]:
+                end = segment.index("]", j + 2)
+                body = segment[j + 1 : end]
+                out.append("[" + ("^" + body[1:] if body.startswith("!") else body).replace("\\", "\\\\") + "]")
+                j = end
+            elif char == "\\" and j + 1 < len(segment):
+                j += 1
+                out.append(re.escape(segment[j]))
+            else:
+                out.append(re.escape(char))
+            j += 1
+        if not last:
+            out.append("/")
+    return "".join(out)
+
+
+def parse_pattern(line: str) -> Optional[Rule]:
+    """Compile one line of a .gitignore file, or None for blanks and comments."""
+    line = line.rstrip("\n").rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    if negated or line.startswith(("\\!", "\\#")):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # A slash anywhere but the end anchors the pattern to the .gitignore's directory.
+    anchored = "/" in line
+    body = _translate(line.lstrip("/"))
+    return re.compile(("" if anchored else "(?:.*/)?") + body + r"\Z"), negated, dir_only
+
+
+def parse_lines(lines) -> List[Rule]:
+    return [rule for rule in map(parse_pattern, lines) if rule]
+
+
+def find_rules_root(path: str) -> str:
+    """Nearest ancestor of `path` (inclusive) that is a repository root, else `path` itself."""
+    start = os.path.realpath(path if os.path.isdir(path) else os.path.dirname(path) or ".")
+    current = start
+    while True:
+        if any(os.path.exists(os.path.join(current, marker)) for marker in REPO_ROOT_MARKERS):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return start
+        current = parent
+
+
+def _exclude_file(root: str) -> str:
+    """Path of the repository's info/exclude, following worktree .git files to the common dir."""
+    git_path = os.path.join(root, ".git")
+    if os.path.isfile(git_path):
+        try:
+            with open(git_path) as f:
+                git_dir = f.read().strip().removeprefix("gitdir:").strip()
+            git_dir = os.path.join(root, git_dir)
+            with open(os.path.join(git_dir, "commondir")) as f:
+                git_path = os.path.join(git_dir, f.read().strip())
+        except OSError:
+            pass
+    return os.path.join(git_path, "info", "exclude")
+
+
+def _mtime_ns(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+class IgnoreRules:
+    """Ignore rules of one tree, with each directory's .gitignore parsed once per modification."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._lock = threading.Lock()
+        # relative dir -> (.gitignore mtime_ns, rules)
+        self._dir_rules: Dict[str, Tuple[int, List[Rule]]] = {}
+        self._base: Tuple[int, List[Rule]] = (-1, [])
+
+    def signature(self) -> str:
+        """Changes whenever the default list or info/exclude changes."""
+        return f"{FILE_READ_DEFAULT_IGNORES}|{FILE_READ_RESPECT_GITIGNORE}|{_mtime_ns(_exclude_file(self.root))}"
+
+    def _base_rules(self) -> List[Rule]:
+        exclude_path = _exclude_file(self.root)
+        mtime = _mtime_ns(exclude_path)
+        if self._base[0] != mtime:
+            rules = parse_lines(FILE_READ_DEFAULT_IGNORES.split(","))
+            if FILE_READ_RESPECT_GITIGNORE and mtime:
+                with open(exclude_path, errors="replace") as f:
+                    rules += parse_lines(f)
+            self._base = (mtime, rules)
+        return self._base[1]
+
+    def load_dir(self, rel_dir: str) -> int:
+        """(Re)load `rel_dir`'s .gitignore if it changed. Returns its mtime_ns, 0 if there is none."""
+        if not FILE_READ_RESPECT_GITIGNORE:
+            return 0
+        path = os.path.join(self.root, rel_dir, ".gitignore")
+        mtime = _mtime_ns(path)
+        with self._lock:
+            cached = self._dir_rules.get(rel_dir)
+            if cached is None or cached[0] != mtime:
+                rules: List[Rule] = []
+                if mtime:
+                    with open(path, errors="replace") as f:
+                        rules = parse_lines(f)
+                self._dir_rules[rel_dir] = (mtime, rules)
+        return mtime
+
+    def _rules_for(self, rel_dir: str) -> List[Rule]:
+        if rel_dir not in self._dir_rules:
+            self.load_dir(rel_dir)
+        return self._dir_rules.get(rel_dir, (0, []))[1]
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Whether `rel_path` (relative to the root) is ignored, assuming its parents are not."""
+        ignored = False
+        for regex, negated, dir_only in self._base_rules():
+            if (is_dir or not dir_only) and regex.match(rel_path):
+                ignored = not negated
+        parts = rel_path.split("/")
+        for depth in range(len(parts)):
+            rel_dir = "/".join(parts[:depth])
+            target = "/".join(parts[depth:])
+            for regex, negated, dir_only in self._rules_for(rel_dir):
+                if (is_dir or not dir_only) and regex.match(target):
+                    ignored = not negated
+        return ignored
+
+
+def get_ignore_rules(root: str) -> IgnoreRules:
+    """Shared rules of a tree root (see `find_rules_root`)."""
+    with _registry_lock:
+        rules = _registry.get(root)
+        if rules is None:
+            rules = _registry[root] = IgnoreRules(root)
+        return rules
+
+
+def _relative(root: str, path: str) -> str:
+    rel_path = os.path.relpath(os.path.realpath(path), root)
+    return "" if rel_path == "." else rel_path.replace(os.sep, "/")
+
+
+def walk(top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+    """`os.walk(top)` without ignored directories and files below `top`."""
+    rules = get_ignore_rules(find_rules_root(top))
+    top_rel = _relative(rules.root, top)
+    for dirpath, dirs, files in os.walk(top):
+        rel_dir = os.path.relpath(dirpath, top).replace(os.sep, "/")
+        rel_dir = top_rel if rel_dir == "." else f"{top_rel}/{rel_dir}" if top_rel else rel_dir
+        rules.load_dir(rel_dir)
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        dirs[:] = sorted(d for d in dirs if not rules.is_ignored(prefix + d, True))
+        files[:] = [f for f in files if not rules.is_ignored(prefix + f, False)]
+        yield dirpath, dirs, files
+
+
+def filter_paths(paths: List[str], base: str) -> List[str]:
+    """Drop paths that are ignored below `base` (e.g. glob results)."""
+    rules = get_ignore_rules(find_rules_root(base or "."))
+    base_rel = _relative(rules.root, base or ".")
+    kept = []
+    for path in paths:
+        rel_path = _relative(rules.root, path)
+        below = rel_path[len(base_rel) + 1 :] if base_rel else rel_path
+        if rel_path.startswith("..") or not below or not _excluded_below(rules, base_rel, below):
+            kept.append(path)
+    return kept
+
+
+def _excluded_below(rules: IgnoreRules, base_rel: str, below: str) -> bool:
+    parts = below.split("/")
+    prefix = f"{base_rel}/" if base_rel else ""
+    for depth in range(1, len(parts)):
+        if rules.is_ignored(prefix + "/".join(parts[:depth]), True):
+            return True
+    return rules.is_ignored(prefix + below, os.path.isdir(os.path.join(rules.root, prefix + below)))
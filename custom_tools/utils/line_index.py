@@ -0,0 +1,91 @@
+"""
+Line-offset index for random access to lines of large files in file_read's lines mode.
+
+The index of a file is an array of the byte offsets at which its lines start, built by
+scanning an mmap of the file for newlines. Reading lines N to M then costs one seek and
+one read of just those lines, whatever N is. Indexes are cached per file (up to
+LINE_INDEX_CACHE_SIZE files) and rebuilt when the file's size or mtime changes.
+
+Lines are decoded with universal newlines like text-mode reads. Files containing a lone
+carriage return (which text mode also treats as a line break) are not indexed; callers
+read them as before. That outcome is cached too, so such a file is scanned once per version.
+"""
+
+import io
+import mmap
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+LINE_INDEX_CACHE_SIZE = int(os.getenv("LINE_INDEX_CACHE_SIZE", "32"))
+
+LONE_CR_RE = re.compile(rb"\r(?!\n)")
+
+_lock = threading.Lock()
+# real path -> (size, mtime_ns, line start offsets or None when the file can't be indexed)
+_cache: "OrderedDict[str, Tuple[int, int, Optional[array]]]" = OrderedDict()
+
+
+class LineIndex:
+    """Byte offsets of the line starts of one file."""
+
+    def __init__(self, path: str, size: int, starts: array) -> None:
+        self.path = path
+        self.size = size
+        self.starts = starts
+
+    @property
+    def line_count(self) -> int:
+        # A trailing newline (or an empty file) doesn't start another line.
+        return len(self.starts) - (1 if self.starts[-1] == self.size else 0)
+
+    def read_lines(self, start_line: int, end_line: Optional[int] = None) -> List[str]:
+        """Lines [start_line, end_line) (0-based), with newlines translated as in text mode."""
+        count = self.line_count
+        end_line = count if end_line is None else min(end_line, count)
+        if start_line >= end_line:
+            return []
+        offset = self.starts[start_line]
+        end_offset = self.starts[end_line] if end_line < count else self.size
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(end_offset - offset)
+        return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8").readlines()
+
+
+def _scan(path: str, size: int) -> Optional[array]:
+    """Line start offsets of a file, or None if it has lone carriage returns."""
+    starts = array("Q", [0])
+    if size == 0:
+        return starts
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm.find(b"\r") != -1 and LONE_CR_RE.search(mm):
+            return None
+        find = mm.find
+        position = find(b"\n")
+        while position != -1:
+            starts.append(position + 1)
+            position = find(b"\n", position + 1)
+    return starts
+
+
+def get_line_index(path: str) -> Optional[LineIndex]:
+    """Cached line index of a file, rebuilt if its size or mtime changed. None if it can't be indexed."""
+    real_path = os.path.realpath(path)
+    stat = os.stat(real_path)
+    with _lock:
+        cached = _cache.get(real_path)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            _cache.move_to_end(real_path)
+            return None if cached[2] is None else LineIndex(real_path, stat.st_size, cached[2])
+
+    starts = _scan(real_path, stat.st_size)
+    with _lock:
+        _cache[real_path] = (stat.st_size, stat.st_mtime_ns, starts)
+        _cache.move_to_end(real_path)
+        while len(_cache) > LINE_INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return None if starts is None else LineIndex(real_path, stat.st_size, starts)
@@ -0,0 +1,242 @@
+"""
+Trigram inverted index for repository-wide search in file_read.
+
+For every text file of an indexed repository (see file_index) the index maps each lower-cased
+character trigram it contains to the files containing it. Each file also keeps a compact array
+of the ids of its trigrams, just enough to take it out of the postings again when it changes. A case-insensitive substring can only occur in files that contain all of
+its trigrams, so search mode intersects a few posting sets and verifies only those files
+instead of reading every file of the repository.
+
+The index lives in memory, is built in the background after a clone and is brought up to date
+before each query. A new worktree that is a clean, full checkout of the same commit as an
+already indexed worktree of the same repository (typically the pre-warmer's) starts from a copy
+of that worktree's postings instead of reading every file.
+
+Updates take the list of files and their sizes and mtimes from the file index, which notices
+added, removed and renamed files, and only files whose size or mtime changed since they were
+indexed are read again. Comparing against the file index costs no system calls, and is skipped
+entirely while its generation is unchanged. A file edited in place goes unnoticed by the file
+index until something re-checks it, so every TRIGRAM_STAT_SWEEP_SECS an update also stats every
+file; in between, a search may miss a match that an in-place edit added. Files the index cannot
+read (binary, undecodable or larger than TRIGRAM_MAX_FILE_BYTES) are always candidates.
+"""
+
+import os
+import subprocess
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from custom_tools.utils.file_index import FileIndex, find_repo_root, get_file_index, warm_file_index
+from integration.repo_cache import git_local, sparse_patterns
+
+TRIGRAM_MAX_FILE_BYTES = int(os.getenv("TRIGRAM_MAX_FILE_BYTES", str(2 * 1024 * 1024)))
+# Bytes inspected for a NUL byte when deciding whether a file is binary.
+BINARY_SNIFF_BYTES = 8192
+# Seconds between updates that stat every file to catch edits in place.
+TRIGRAM_STAT_SWEEP_SECS = float(os.getenv("TRIGRAM_STAT_SWEEP_SECS", "30"))
+
+_registry_lock = threading.Lock()
+_registry: Dict[str, "TrigramIndex"] = {}
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _file_trigrams(path: str) -> Optional[Set[str]]:
+    """Trigrams of a text file, or None if it can't be indexed."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read(TRIGRAM_MAX_FILE_BYTES + 1)
+    except OSError:
+        return None
+    if len(data) > TRIGRAM_MAX_FILE_BYTES or b"\0" in data[:BINARY_SNIFF_BYTES]:
+        return None
+    try:
+        return trigrams(data.decode("utf-8").lower())
+    except UnicodeDecodeError:
+        return None
+
+
+class TrigramIndex:
+    """Trigram postings of one repository root."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._lock = threading.Lock()
+        # relative path -> (size, mtime_ns, trigram ids or None when unindexable)
+        self.files: Dict[str, Tuple[int, int, Optional[array]]] = {}
+        self.gram_ids: Dict[str, int] = {}
+        # trigram id -> relative paths
+        self.postings: Dict[int, Set[str]] = {}
+        self.unindexed: Set[str] = set()
+        self._generation = -1
+        self._swept_at = float("-inf")
+
+    def _remove(self, rel_path: str) -> None:
+        _, _, ids = self.files.pop(rel_path)
+        if ids is None:
+            self.unindexed.discard(rel_path)
+            return
+        for gram_id in ids:
+            paths = self.postings[gram_id]
+            paths.discard(rel_path)
+            if not paths:
+                del self.postings[gram_id]
+
+    def _add(self, rel_path: str, size: int, mtime_ns: int) -> None:
+        grams = _file_trigrams(os.path.join(self.root, rel_path))
+        if grams is None:
+            self.files[rel_path] = (size, mtime_ns, None)
+            self.unindexed.add(rel_path)
+            return
+        gram_ids = self.gram_ids
+        ids = array("i", (gram_ids.setdefault(gram, len(gram_ids)) for gram in grams))
+        self.files[rel_path] = (size, mtime_ns, ids)
+        for gram_id in ids:
+            self.postings.setdefault(gram_id, set()).add(rel_path)
+
+    def seed(self, other: "TrigramIndex", file_index: FileIndex) -> int:
+        """
+        Start from the postings of `other`, a checkout of the same commit, keeping the files of
+        `file_index` with the same size (stamped with their own mtimes). Returns how many were kept.
+        """
+        stats = {rel_path: (size, mtime_ns) for rel_path, size, mtime_ns in file_index.iter_stats()}
+        with other._lock, self._lock:
+            # Id arrays are never modified in place, so they can be shared.
+            self.gram_ids = dict(other.gram_ids)
+            self.postings = {gram_id: set(paths) for gram_id, paths in other.postings.items()}
+            self.unindexed = set(other.unindexed)
+            self.files = {}
+            for rel_path, (size, mtime_ns, ids) in other.files.items():
+                self.files[rel_path] = (size, mtime_ns, ids)
+                current = stats.get(rel_path)
+                if current is None or current[0] != size:
+                    self._remove(rel_path)
+                else:
+                    self.files[rel_path] = (*current, ids)
+            return len(self.files)
+
+    def update(self, file_index: FileIndex, sweep: bool = False) -> Dict[str, int]:
+        """
+        Re-read the file index's files whose size or mtime changed and drop removed ones. With
+        `sweep`, or when the last sweep is TRIGRAM_STAT_SWEEP_SECS old, every file is stat'ed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            sweep = sweep or now - self._swept_at >= TRIGRAM_STAT_SWEEP_SECS
+            if not sweep and file_index.generation == self._generation:
+                return {"reindexed": 0, "removed": 0}
+            seen, reindexed = set(), 0
+            for rel_path, size, mtime_ns in file_index.iter_stats():
+                if sweep:
+                    # Records edits in place in the file index too, so both agree afterwards.
+                    current = file_index.restat(rel_path)
+                    if current is None:
+                        continue
+                    size, mtime_ns = current
+                seen.add(rel_path)
+                known = self.files.get(rel_path)
+                if known and known[:2] == (size, mtime_ns):
+                    continue
+                if known:
+                    self._remove(rel_path)
+                self._add(rel_path, size, mtime_ns)
+                reindexed += 1
+            removed = [rel_path for rel_path in self.files if rel_path not in seen]
+            for rel_path in removed:
+                self._remove(rel_path)
+            self._generation = file_index.generation
+            if sweep:
+                self._swept_at = now
+            return {"reindexed": reindexed, "removed": len(removed)}
+
+    def candidates(self, pattern: str) -> Optional[Set[str]]:
+        """Files that may contain `pattern` (case-insensitive), or None if it is too short to narrow."""
+        grams = trigrams(pattern.lower())
+        if not grams:
+            return None
+        with self._lock:
+            postings = sorted((self.postings.get(self.gram_ids.get(gram, -1), set()) for gram in grams), key=len)
+            matches = set(postings[0]).intersection(*postings[1:])
+            return matches | self.unindexed
+
+
+def get_trigram_index(root: str) -> TrigramIndex:
+    """Shared trigram index of a repository root. Indexes of removed roots are dropped."""
+    with _registry_lock:
+        for stale in [known for known in _registry if not os.path.isdir(known)]:
+            del _registry[stale]
+        index = _registry.get(root)
+        if index is None:
+            index = _registry[root] = TrigramIndex(root)
+        return index
+
+
+def _checkout_state(root: str) -> Optional[Tuple[str, str]]:
+    """(shared git directory, HEAD commit) of a clean, full git checkout, or None."""
+    if not os.path.exists(os.path.join(root, ".git")):
+        return None
+    try:
+        common_dir = os.path.realpath(os.path.join(root, git_local(["rev-parse", "--git-common-dir"], root)))
+        head = git_local(["rev-parse", "HEAD"], root)
+        if git_local(["status", "--porcelain"], root) or sparse_patterns(root) is not None:
+            return None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return common_dir, head
+
+
+def _seed_from_sibling(index: TrigramIndex, file_index: FileIndex) -> bool:
+    """Seed an empty index from an indexed checkout of the same repository and commit, if there is one."""
+    state = _checkout_state(index.root)
+    if state is None:
+        return False
+    with _registry_lock:
+        siblings = [other for other in _registry.values() if other is not index and other.files]
+    for other in siblings:
+        if _checkout_state(other.root) == state:
+            index.seed(other, file_index)
+            return True
+    return False
+
+
+def warm_trigram_index(repo_path: str) -> None:
+    """Build or update the file and trigram indexes of a freshly cloned repository."""
+    warm_file_index(repo_path)
+    root = find_repo_root(repo_path)
+    if root is not None:
+        index, file_index = get_trigram_index(root), get_file_index(root)
+        if not index.files:
+            _seed_from_sibling(index, file_index)
+        index.update(file_index, sweep=True)
+
+
+def narrow_search(paths: Iterable[str], pattern: str) -> List[str]:
+    """
+    Drop paths inside indexed repositories that cannot contain `pattern`. Paths outside
+    repositories, or unknown to their index, are kept; the order of `paths` is preserved.
+    """
+    roots: Dict[str, Optional[str]] = {}
+    narrowed: Dict[str, Tuple[TrigramIndex, Optional[Set[str]]]] = {}
+    kept = []
+    for path in paths:
+        real_path = os.path.realpath(path)
+        directory = os.path.dirname(real_path)
+        if directory not in roots:
+            roots[directory] = find_repo_root(directory)
+        root = roots[directory]
+        if root is None:
+            kept.append(path)
+            continue
+        if root not in narrowed:
+            index = get_trigram_index(root)
+            index.update(get_file_index(root))
+            narrowed[root] = (index, index.candidates(pattern))
+        index, candidates = narrowed[root]
+        rel_path = os.path.relpath(real_path, root)
+        if candidates is None or rel_path in candidates or rel_path not in index.files:
+            kept.append(path)
+    return kept
@@ -0,0 +1,100 @@
+import base64
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
+
+import httpx
+
+from integration.resilience import AsyncResilientTransport, ResilientTransport
+
+ATLASSIAN_TIMEOUT = float(os.getenv("ATLASSIAN_TIMEOUT", "30"))
+ATLASSIAN_MAX_CONNECTIONS = int(os.getenv("ATLASSIAN_MAX_CONNECTIONS", "20"))
+
+_lock = threading.Lock()
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 is used when ATLASSIAN_HTTP2 is not disabled and the optional `h2` package is installed."""
+    if os.getenv("ATLASSIAN_HTTP2", "true").lower() != "true":
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def auth_headers() -> Dict[str, str]:
+    """Basic auth and JSON headers for Jira and Confluence, built once per process."""
+    auth_string = f"{os.getenv('ATLASSIAN_EMAIL')}:{os.getenv('ATLASSIAN_API_TOKEN')}"
+    auth_token = base64.b64encode(auth_string.encode()).decode()
+    return {
+        "Authorization": f"Basic {auth_token}",
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+    }
+
+
+def _client_options() -> dict:
+    return {
+        "base_url": os.getenv("JIRA_BASE_URL", ""),
+        "headers": auth_headers(),
+        "timeout": ATLASSIAN_TIMEOUT,
+    }
+
+
+def _transport_options() -> dict:
+    return {
+        "http2": _http2_enabled(),
+        "limits": httpx.Limits(
+            max_connections=ATLASSIAN_MAX_CONNECTIONS,
+            max_keepalive_connections=ATLASSIAN_MAX_CONNECTIONS,
+            keepalive_expiry=60,
+        ),
+    }
+
+
+def get_client() -> httpx.Client:
+    """
+    Process-wide synchronous Atlassian client.
+
+    Strands runs tools in worker threads, so the tools use this client. Connections are kept
+    alive and reused across calls, and requests take paths relative to JIRA_BASE_URL. Every
+    request goes through the circuit breakers and turn budget of `integration.resilience`.
+    """
+    global _client
+    with _lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(
+                transport=ResilientTransport(httpx.HTTPTransport(**_transport_options())),
+                **_client_options(),
+            )
+        return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Process-wide asynchronous Atlassian client for code running on the server event loop."""
+    global _async_client
+    with _lock:
+        if _async_client is None or _async_client.is_closed:
+            _async_client = httpx.AsyncClient(
+                transport=AsyncResilientTransport(httpx.AsyncHTTPTransport(**_transport_options())),
+                **_client_options(),
+            )
+        return _async_client
+
+
+async def aclose() -> None:
+    """Close both clients. Called from the server lifespan on shutdown."""
+    global _client, _async_client
+    with _lock:
+        client, async_client = _client, _async_client
+        _client = _async_client = None
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.aclose()
@@ -0,0 +1,76 @@
+import os
+from functools import lru_cache
+
+import boto3
+from botocore.config import Config
+from botocore.credentials import ReadOnlyCredentials
+from strands.models import BedrockModel
+
+AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+DEFAULT_MODEL_ID = "us.anthropic.claude-haiku-4-5-20251001-v1:0"
+
+
+@lru_cache(maxsize=1)
+def get_boto_session() -> boto3.Session:
+    """
+    Process-wide boto3 session shared by every Strands model, and the source of the voice LLM's
+    credentials (see `voice.bedrock_llm`).
+
+    Static keys from the environment are used when present, otherwise boto3 falls back to
+    its default provider chain (instance role, SSO, ...), whose credentials refresh themselves.
+    Resolved credentials are cached on the session, so lookups happen once per process.
+    """
+    return boto3.Session(
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=AWS_REGION,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_client_config() -> Config:
+    """
+    Bedrock client configuration with a connection pool sized for concurrent sessions.
+
+    Every Strands agent step goes through this pool, so it is sized from
+    BEDROCK_MAX_POOL_CONNECTIONS (default 50) and keeps connections alive between requests.
+    The voice LLM shares the timeouts and retries only: pipecat opens a client per request.
+    """
+    return Config(
+        region_name=AWS_REGION,
+        max_pool_connections=int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "50")),
+        tcp_keepalive=True,
+        connect_timeout=5,
+        read_timeout=120,
+        retries={"max_attempts": 3, "mode": "adaptive"},
+    )
+
+
+def get_aws_credentials() -> ReadOnlyCredentials:
+    """
+    Return the current credentials of the shared session.
+
+    The frozen snapshot is taken from the cached credential object, which refreshes itself when
+    temporary credentials are close to expiry, so this is cheap to call before every request.
+    """
+    credentials = get_boto_session().get_credentials()
+    if credentials is None:
+        raise ValueError("No AWS credentials found in environment or default provider chain")
+    return credentials.get_frozen_credentials()
+
+
+@lru_cache(maxsize=None)
+def get_bedrock_model(model_id: str = DEFAULT_MODEL_ID) -> BedrockModel:
+    """
+    Shared Strands `BedrockModel` for `model_id`, backed by the pooled session and client config.
+
+    The system prompt and tool specs are marked as cacheable, since they are identical on every
+    agent step.
+    """
+    return BedrockModel(
+        model_id=model_id,
+        boto_session=get_boto_session(),
+        boto_client_config=get_client_config(),
+        cache_prompt="default",
+        cache_tools="default",
+    )
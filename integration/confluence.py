@@ -1,17 +1,141 @@
 import os
 import re
-import base64
+from typing import Dict, List, Optional, Tuple
 
 from strands import tool
-import httpx
 import markdownify
 
+from integration.atlassian import get_client
+from integration.confluence_cache import page_cache
+from integration.confluence_sections import (
+    DEFAULT_TOKEN_BUDGET,
+    build_index_from_html,
+    build_index_from_markdown,
+    estimate_tokens,
+    format_outline,
+    load_section_index,
+    plan_page_chunks,
+    read_section,
+    split_into_chunks,
+)
+from integration.confluence_sync import mirrored_page_path
+
 CONFLUENCE_URL_PATTERN = r'https://[a-zA-Z0-9\-_.]+\.atlassian\.net/wiki/[^\s]+'
 
 atlasian_api_token = os.getenv('ATLASSIAN_API_TOKEN')
 atlasian_email = os.getenv('ATLASSIAN_EMAIL')
 jira_base_url = os.getenv('JIRA_BASE_URL')
 
+# Pages larger than this are answered with their outline instead of the full Markdown.
+CONFLUENCE_FULL_PAGE_TOKEN_LIMIT = int(os.getenv("CONFLUENCE_FULL_PAGE_TOKEN_LIMIT", "8000"))
+
+def extract_page_id(confluence_url: str) -> str:
+    """Extract the numeric page id from a Confluence page URL."""
+    match = re.search(r'/pages/(\d+)', confluence_url)
+    if not match:
+        raise ValueError("Cannot extract page ID from URL.")
+    return match.group(1)
+
+
+def fetch_page_version(page_id: str) -> int:
+    """Cheap version-only lookup used to revalidate cached pages."""
+    response = get_client().get(f"/wiki/rest/api/content/{page_id}?expand=version")
+    response.raise_for_status()
+    return response.json()["version"]["number"]
+
+
+def convert_to_markdown(html_content: str) -> str:
+    return markdownify.markdownify(html_content, heading_style=markdownify.ATX)
+
+
+def _check_credentials() -> None:
+    if not atlasian_api_token or not atlasian_email or not jira_base_url:
+        raise ValueError("Missing required Atlassian credentials in environment variables. Ignore the tool call.")
+
+
+def resolve_section_index(page_id: str) -> Tuple[int, List[Dict]]:
+    """
+    Return (version, section index) of a page, building the index if needed.
+
+    Mirrored and cached pages are split from their stored Markdown. Otherwise the storage HTML is
+    downloaded once and converted section by section.
+    """
+    mirrored = mirrored_page_path(page_id, fetch_page_version)
+    if mirrored is not None:
+        page_path, version = mirrored
+        index = load_section_index(page_id, version)
+        if index is None:
+            with open(page_path, encoding="utf-8") as f:
+                index = build_index_from_markdown(page_id, version, f)
+        return version, index
+
+    version = fetch_page_version(page_id)
+    index = load_section_index(page_id, version)
+    if index is not None:
+        return version, index
+
+    cached = page_cache.get(page_id, version)
+    if cached is not None:
+        return version, build_index_from_markdown(page_id, version, cached.splitlines(keepends=True))
+
+    version, html_content = _download_page_html(page_id)
+    return version, build_index_from_html(page_id, version, html_content)
+
+
+def _local_page_markdown(page_id: str) -> Optional[Tuple[int, str]]:
+    """(version, Markdown) of a page from the local mirror or the version-checked page cache."""
+    # Pages of mirrored spaces resolve locally while the mirror has their current version.
+    mirrored = mirrored_page_path(page_id, fetch_page_version)
+    if mirrored is not None:
+        page_path, version = mirrored
+        return version, page_path.read_text(encoding="utf-8")
+
+    # Unchanged pages are served from the local cache without downloading or converting again.
+    if page_cache.cached_version(page_id) is not None:
+        version = fetch_page_version(page_id)
+        cached = page_cache.get(page_id, version)
+        if cached is not None:
+            return version, cached
+    return None
+
+
+def _download_page_html(page_id: str) -> Tuple[int, str]:
+    """(version, storage-format HTML) of a page, downloaded from Confluence."""
+    response = get_client().get(f"/wiki/rest/api/content/{page_id}?expand=body.storage,version")
+    response.raise_for_status()
+    data: dict = response.json()
+
+    html_content = data.get('body', {}).get('storage', {}).get('value', '')
+    if not html_content:
+        raise Exception(
+            f"No content found on the Confluence page. "
+            f"The page {page_id} may be empty or archived."
+        )
+    return data["version"]["number"], html_content
+
+
+def load_page_markdown(page_id: str) -> Tuple[int, str]:
+    """
+    Return (version, Markdown) of a page from the local mirror, the version-checked page cache,
+    or Confluence (storing the result in the cache).
+    """
+    local = _local_page_markdown(page_id)
+    if local is not None:
+        return local
+    version, html_content = _download_page_html(page_id)
+    markdown_text = convert_to_markdown(html_content)
+    page_cache.put(page_id, version, markdown_text)
+    return version, markdown_text
+
+
+def _outline_response(index: List[Dict]) -> str:
+    return (
+        f"{format_outline(index)}\n\n"
+        "Use get_confluence_section with a section id to read one section, "
+        "or without one to read the page in token-budgeted chunks."
+    )
+
+
 @tool(
     name="get_confluence_page",
     description="Fetch the content of a Confluence page given its URL and return it as Markdown."
@@ -26,44 +150,127 @@ def get_confluence_page(confluence_url: str) -> str:
         confluence_url (str): The URL of the Confluence page
         
     Returns:
-        Markdown content of the Confluence page as a string.
+        Markdown content of the Confluence page as a string. Pages larger than
+        CONFLUENCE_FULL_PAGE_TOKEN_LIMIT return their section outline instead.
     """
 
     if not confluence_url or not isinstance(confluence_url, str):
         raise ValueError("Invalid confluence_url: Must be a non-empty string")
     
     try:
-        if not atlasian_api_token or not atlasian_email or not jira_base_url:
-            raise ValueError("Missing required Atlassian credentials in environment variables. Ignore the tool call.")
+        _check_credentials()
         
-        match = re.search(r'/pages/(\d+)', confluence_url)
-        if not match:
-            raise ValueError("Cannot extract page ID from URL.")
-        page_id = match.group(1)
-
-        api_url = f"{jira_base_url}/wiki/rest/api/content/{page_id}?expand=body.storage"
-        auth_string = f"{atlasian_email}:{atlasian_api_token}"
-        auth_token = base64.b64encode(auth_string.encode()).decode()
-        headers = {
-            "Authorization": f"Basic {auth_token}",
-            "Content-Type": "application/json"
-        }
-
-        response = httpx.get(api_url, headers=headers, timeout=30)
-        print(f"Response status code: {response.text}")
-        response.raise_for_status()
-        data: dict = response.json()
-
-        html_content = data.get('body', {}).get('storage', {}).get('value', '')
-        if not html_content:
-            raise Exception(
-                f"No content found on the Confluence page. "
-                f"The page at {confluence_url} may be empty or archived."
-            )
+        page_id = extract_page_id(confluence_url)
+
+        local = _local_page_markdown(page_id)
+        if local is not None:
+            return _limit_page_size(page_id, *local)
 
-        markdown_text = markdownify.markdownify(html_content, heading_style=markdownify.ATX)
+        version, html_content = _download_page_html(page_id)
+        # Markdown is rarely longer than the HTML it comes from, so small pages are converted whole.
+        if estimate_tokens(html_content) <= CONFLUENCE_FULL_PAGE_TOKEN_LIMIT:
+            markdown_text = convert_to_markdown(html_content)
+            page_cache.put(page_id, version, markdown_text)
+            return _limit_page_size(page_id, version, markdown_text)
+
+        # Larger pages are converted section by section, and only joined if the result fits.
+        index = load_section_index(page_id, version) or build_index_from_html(page_id, version, html_content)
+        if sum(section["tokens"] for section in index) > CONFLUENCE_FULL_PAGE_TOKEN_LIMIT:
+            return _outline_response(index)
+        markdown_text = "".join(read_section(page_id, version, section["id"]) for section in index)
+        page_cache.put(page_id, version, markdown_text)
         return markdown_text
     except Exception as e:
         print(f"Error fetching Confluence page: {str(e)}")
         raise e
-        
\ No newline at end of file
+
+
+def ensure_section_index(page_id: str, version: int, markdown_text: str) -> List[Dict]:
+    """Section index of a page version, split from its Markdown if it hasn't been built yet."""
+    index = load_section_index(page_id, version)
+    if index is None:
+        index = build_index_from_markdown(page_id, version, markdown_text.splitlines(keepends=True))
+    return index
+
+
+def _limit_page_size(page_id: str, version: int, markdown_text: str) -> str:
+    if estimate_tokens(markdown_text) <= CONFLUENCE_FULL_PAGE_TOKEN_LIMIT:
+        return markdown_text
+    return _outline_response(ensure_section_index(page_id, version, markdown_text))
+
+
+@tool(
+    name="get_confluence_outline",
+    description="Return the heading outline of a Confluence page with section ids and token estimates."
+)
+def get_confluence_outline(confluence_url: str) -> str:
+    """
+    Args:
+        confluence_url (str): The URL of the Confluence page
+
+    Returns:
+        str: Indented outline, one line per section: [section id] title (~tokens)
+    """
+    if not confluence_url or not isinstance(confluence_url, str):
+        raise ValueError("Invalid confluence_url: Must be a non-empty string")
+
+    try:
+        _check_credentials()
+        _, index = resolve_section_index(extract_page_id(confluence_url))
+        return _outline_response(index)
+    except Exception as e:
+        print(f"Error fetching Confluence outline: {str(e)}")
+        raise e
+
+
+@tool(
+    name="get_confluence_section",
+    description=(
+        "Read one section of a Confluence page by section id (from get_confluence_outline), "
+        "or the whole page in token-budgeted chunks when no section id is given."
+    )
+)
+def get_confluence_section(
+    confluence_url: str, section_id: str = "", chunk: int = 0, token_budget: int = DEFAULT_TOKEN_BUDGET
+) -> str:
+    """
+    Args:
+        confluence_url (str): The URL of the Confluence page
+        section_id (str, optional): Section id such as "s3". Empty to page through the whole document.
+        chunk (int, optional): Zero-based chunk number. Defaults to 0.
+        token_budget (int, optional): Approximate maximum tokens per chunk.
+
+    Returns:
+        str: The requested Markdown, preceded by a line saying which chunk it is out of how many.
+    """
+    if not confluence_url or not isinstance(confluence_url, str):
+        raise ValueError("Invalid confluence_url: Must be a non-empty string")
+
+    try:
+        _check_credentials()
+        page_id = extract_page_id(confluence_url)
+        version, index = resolve_section_index(page_id)
+
+        if section_id:
+            section = next((s for s in index if s["id"] == section_id), None)
+            if section is None:
+                raise ValueError(f"Unknown section id {section_id}. Call get_confluence_outline for valid ids.")
+            parts = split_into_chunks(read_section(page_id, version, section_id), token_budget)
+            if not 0 <= chunk < len(parts):
+                raise ValueError(f"Section {section_id} has {len(parts)} chunks; chunk {chunk} is out of range")
+            return f"[{section['path']}] chunk {chunk + 1} of {len(parts)}\n\n{parts[chunk]}"
+
+        plan = plan_page_chunks(index, token_budget)
+        if not 0 <= chunk < len(plan):
+            raise ValueError(f"Page has {len(plan)} chunks; chunk {chunk} is out of range")
+        text = "".join(read_section(page_id, version, sid) for sid in plan[chunk])
+        if len(plan[chunk]) == 1 and estimate_tokens(text) > token_budget:
+            parts = split_into_chunks(text, token_budget)
+            text = (
+                f"{parts[0]}\n\n[Section {plan[chunk][0]} continues in {len(parts) - 1} more chunks; "
+                f"request them with section_id={plan[chunk][0]} and chunk=1..{len(parts) - 1}]"
+            )
+        return f"Page chunk {chunk + 1} of {len(plan)} (sections {', '.join(plan[chunk])})\n\n{text}"
+    except Exception as e:
+        print(f"Error fetching Confluence section: {str(e)}")
+        raise e
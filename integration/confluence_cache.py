@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+CONFLUENCE_CACHE_DIR = os.getenv("CONFLUENCE_CACHE_DIR", "./tmp/confluence_cache")
+CONFLUENCE_CACHE_MAX_BYTES = int(os.getenv("CONFLUENCE_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+
+class ConfluencePageCache:
+    """
+    On-disk cache of converted Markdown, keyed by page id and Confluence version number.
+
+    Each page is stored as `<page_id>.md` next to an `index.json` holding its version, size and
+    last access time. When the total size exceeds `max_bytes`, least recently used pages are
+    evicted first.
+    """
+
+    def __init__(self, cache_dir: str = CONFLUENCE_CACHE_DIR, max_bytes: int = CONFLUENCE_CACHE_MAX_BYTES) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, dict]] = None
+
+    def _index_path(self) -> Path:
+        return self.cache_dir / "index.json"
+
+    def _load_index(self) -> Dict[str, dict]:
+        if self._index is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                self._index = json.loads(self._index_path().read_text())
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self) -> None:
+        tmp_path = self._index_path().with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._index))
+        os.replace(tmp_path, self._index_path())
+
+    def cached_version(self, page_id: str) -> Optional[int]:
+        """Version number of the cached copy of `page_id`, or None when not cached."""
+        with self._lock:
+            entry = self._load_index().get(page_id)
+            return entry["version"] if entry else None
+
+    def get(self, page_id: str, version: int) -> Optional[str]:
+        """Return the cached Markdown if it was converted from exactly `version`."""
+        with self._lock:
+            index = self._load_index()
+            entry = index.get(page_id)
+            if not entry or entry["version"] != version:
+                return None
+            try:
+                markdown_text = (self.cache_dir / f"{page_id}.md").read_text(encoding="utf-8")
+            except FileNotFoundError:
+                del index[page_id]
+                self._save_index()
+                return None
+            entry["last_access"] = time.time()
+            self._save_index()
+            return markdown_text
+
+    def put(self, page_id: str, version: int, markdown_text: str) -> None:
+        """Store the Markdown for `version` of `page_id`, then evict down to the size cap."""
+        data = markdown_text.encode("utf-8")
+        with self._lock:
+            index = self._load_index()
+            page_path = self.cache_dir / f"{page_id}.md"
+            tmp_path = page_path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, page_path)
+            index[page_id] = {"version": version, "size": len(data), "last_access": time.time()}
+            self._evict(keep=page_id)
+            self._save_index()
+
+    def _evict(self, keep: str) -> None:
+        index = self._index
+        total = sum(entry["size"] for entry in index.values())
+        for page_id, entry in sorted(index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if page_id == keep:
+                continue
+            (self.cache_dir / f"{page_id}.md").unlink(missing_ok=True)
+            total -= entry["size"]
+            del index[page_id]
+
+
+page_cache = ConfluencePageCache()
@@ -0,0 +1,214 @@
+"""
+Heading-based section index for Confluence pages.
+
+Large design pages are split at their headings into sections that are converted and stored
+one at a time under CONFLUENCE_SECTIONS_DIR/<page_id>/v<version>/:
+
+    index.json     section ids, heading levels, titles, heading paths and token estimates
+    <id>.md        Markdown of one section, including its heading line
+
+The HTML path converts each heading's fragment on its own, so the whole page never exists as
+Markdown in memory next to its HTML, and agents can read an outline first and then fetch
+individual sections or token-budgeted chunks.
+"""
+
+import html
+import json
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import markdownify
+
+CONFLUENCE_SECTIONS_DIR = os.getenv("CONFLUENCE_SECTIONS_DIR", "./tmp/confluence_sections")
+DEFAULT_TOKEN_BUDGET = int(os.getenv("CONFLUENCE_SECTION_TOKEN_BUDGET", "2000"))
+
+HTML_HEADING_OPEN_RE = re.compile(r"<h([1-6])\b[^>]*>", re.IGNORECASE)
+HTML_HEADING_CLOSE_RE = re.compile(r"</h([1-6])\s*>", re.IGNORECASE)
+# A heading's closing tag is only looked for this far after its opening tag, so an unclosed
+# heading costs a bounded scan instead of one to the end of the page.
+MAX_HEADING_CHARS = 4096
+MARKDOWN_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+TAG_RE = re.compile(r"<[^>]+>")
+
+_build_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _version_dir(page_id: str, version: int) -> Path:
+    return Path(CONFLUENCE_SECTIONS_DIR) / page_id / f"v{version}"
+
+
+def split_html_sections(html_content: str) -> Iterator[Tuple[int, str, str]]:
+    """
+    Yield (level, title, html_fragment) for the content before the first heading and for
+    each heading up to the next one. Headings nested in layout macros are split on as well;
+    markdownify tolerates the unbalanced fragments this produces.
+    """
+    start, level, title = 0, 0, "Introduction"
+    for match in HTML_HEADING_OPEN_RE.finditer(html_content):
+        close = HTML_HEADING_CLOSE_RE.search(html_content, match.end(), match.end() + MAX_HEADING_CHARS)
+        if close is None or close.group(1) != match.group(1):
+            continue
+        if match.start() > start:
+            yield level, title, html_content[start : match.start()]
+        start = match.start()
+        level = int(match.group(1))
+        title = html.unescape(TAG_RE.sub("", html_content[match.end() : close.start()])).strip() or "Untitled"
+    if start < len(html_content):
+        yield level, title, html_content[start:]
+
+
+def split_markdown_sections(lines: Iterable[str]) -> Iterator[Tuple[int, str, str]]:
+    """Yield (level, title, markdown) per ATX heading, ignoring '#' lines inside fenced code."""
+    level, title, buffer = 0, "Introduction", []
+    in_fence = False
+    for line in lines:
+        if line.lstrip().startswith(("```", "~~~")):
+            in_fence = not in_fence
+        match = None if in_fence else MARKDOWN_HEADING_RE.match(line)
+        if match:
+            if buffer:
+                yield level, title, "".join(buffer)
+            level, title, buffer = len(match.group(1)), match.group(2) or "Untitled", []
+        buffer.append(line if line.endswith("\n") else line + "\n")
+    if buffer:
+        yield level, title, "".join(buffer)
+
+
+class _SectionWriter:
+    """Writes sections to a temporary directory and publishes it atomically with its index."""
+
+    def __init__(self, page_id: str, version: int) -> None:
+        self.page_id = page_id
+        self.version = version
+        self.final_dir = _version_dir(page_id, version)
+        self.tmp_dir = self.final_dir.with_name(f"{self.final_dir.name}.tmp-{threading.get_ident()}")
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        self.tmp_dir.mkdir(parents=True)
+        self.index: List[Dict] = []
+        self._heading_stack: List[Tuple[int, str]] = []
+
+    def add(self, level: int, title: str, markdown_text: str) -> None:
+        if not markdown_text.strip():
+            return
+        while self._heading_stack and self._heading_stack[-1][0] >= level:
+            self._heading_stack.pop()
+        path = " > ".join([t for _, t in self._heading_stack] + [title])
+        # The introduction before the first heading is never a parent of later sections.
+        if level > 0:
+            self._heading_stack.append((level, title))
+
+        section_id = f"s{len(self.index) + 1}"
+        (self.tmp_dir / f"{section_id}.md").write_text(markdown_text, encoding="utf-8")
+        self.index.append(
+            {
+                "id": section_id,
+                "level": level,
+                "title": title,
+                "path": path,
+                "tokens": estimate_tokens(markdown_text),
+            }
+        )
+
+    def finish(self) -> List[Dict]:
+        (self.tmp_dir / "index.json").write_text(json.dumps(self.index, indent=2))
+        with _build_lock:
+            if self.final_dir.exists():
+                shutil.rmtree(self.tmp_dir, ignore_errors=True)
+            else:
+                os.replace(self.tmp_dir, self.final_dir)
+            # Older versions of the page are no longer reachable.
+            for other in self.final_dir.parent.iterdir():
+                if other.name != self.final_dir.name and ".tmp-" not in other.name:
+                    shutil.rmtree(other, ignore_errors=True)
+        return load_section_index(self.page_id, self.version)
+
+
+def load_section_index(page_id: str, version: int) -> Optional[List[Dict]]:
+    """Section index of `version` of a page, or None if it hasn't been built."""
+    try:
+        return json.loads((_version_dir(page_id, version) / "index.json").read_text())
+    except FileNotFoundError:
+        return None
+
+
+def build_index_from_html(page_id: str, version: int, html_content: str) -> List[Dict]:
+    """Convert storage-format HTML section by section and store the resulting index."""
+    writer = _SectionWriter(page_id, version)
+    for level, title, fragment in split_html_sections(html_content):
+        writer.add(level, title, markdownify.markdownify(fragment, heading_style=markdownify.ATX))
+    return writer.finish()
+
+
+def build_index_from_markdown(page_id: str, version: int, lines: Iterable[str]) -> List[Dict]:
+    """Split already converted Markdown (e.g. a mirrored page read line by line) into sections."""
+    writer = _SectionWriter(page_id, version)
+    for level, title, markdown_text in split_markdown_sections(lines):
+        writer.add(level, title, markdown_text)
+    return writer.finish()
+
+
+def read_section(page_id: str, version: int, section_id: str) -> str:
+    """Markdown of one section."""
+    if not re.fullmatch(r"s\d+", section_id):
+        raise ValueError(f"Invalid section id: {section_id}")
+    try:
+        return (_version_dir(page_id, version) / f"{section_id}.md").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        raise ValueError(f"Section {section_id} not found on page {page_id}") from None
+
+
+def format_outline(index: List[Dict]) -> str:
+    """Indented outline with section ids and token estimates."""
+    total = sum(section["tokens"] for section in index)
+    lines = [f"Page outline: {len(index)} sections, ~{total} tokens total."]
+    for section in index:
+        indent = "  " * max(section["level"] - 1, 0)
+        lines.append(f"{indent}- [{section['id']}] {section['title']} (~{section['tokens']} tokens)")
+    return "\n".join(lines)
+
+
+def split_into_chunks(text: str, token_budget: int) -> List[str]:
+    """Split Markdown into chunks of at most `token_budget` tokens on paragraph, then line boundaries."""
+    max_chars = max(token_budget, 1) * 4
+    chunks: List[str] = []
+    current = ""
+    for paragraph in re.split(r"(?<=\n\n)", text):
+        pieces = [paragraph]
+        if len(paragraph) > max_chars:
+            pieces = [line for line in paragraph.splitlines(keepends=True)]
+        for piece in pieces:
+            while len(piece) > max_chars:
+                chunks.append(piece[:max_chars])
+                piece = piece[max_chars:]
+            if len(current) + len(piece) > max_chars and current:
+                chunks.append(current)
+                current = ""
+            current += piece
+    if current:
+        chunks.append(current)
+    return chunks or [""]
+
+
+def plan_page_chunks(index: List[Dict], token_budget: int) -> List[List[str]]:
+    """Greedily pack whole sections, in order, into chunks of about `token_budget` tokens."""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for section in index:
+        if current and current_tokens + section["tokens"] > token_budget:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(section["id"])
+        current_tokens += section["tokens"]
+    if current:
+        chunks.append(current)
+    return chunks
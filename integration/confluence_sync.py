@@ -0,0 +1,277 @@
+"""
+Incremental local mirror of Confluence spaces.
+
+`sync_space` lists the pages of a space through CQL, downloads the ones whose version
+changed since the last run in parallel (rate limited), converts them with the same logic as
+`get_confluence_page`, and stores them under CONFLUENCE_MIRROR_DIR/<SPACE>/:
+
+    manifest.json   page tree, titles, versions and last-modified times
+    pages/<id>.md   converted Markdown bodies
+
+After the first full sync, only pages modified since the previous run are downloaded; the ids
+of every page are still listed, so pages deleted from Confluence are dropped from the mirror.
+A page that fails to download is reported and retried on the next run without stopping the
+others. The server runs `sync_spaces` for CONFLUENCE_SYNC_SPACES every
+CONFLUENCE_SYNC_INTERVAL_SECS.
+
+`get_confluence_page` checks `mirrored_page_path` before going to the network. Pages of a
+space synced longer than CONFLUENCE_MIRROR_MAX_AGE_SECS ago are revalidated with a version
+lookup first, so a stale mirror is never served.
+
+Usage:
+    python -m integration.confluence_sync SPACEKEY [SPACEKEY ...] [--full]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from integration.atlassian import get_client
+
+CONFLUENCE_MIRROR_DIR = os.getenv("CONFLUENCE_MIRROR_DIR", "./tmp/confluence_mirror")
+CONFLUENCE_SYNC_WORKERS = int(os.getenv("CONFLUENCE_SYNC_WORKERS", "4"))
+CONFLUENCE_SYNC_RPS = float(os.getenv("CONFLUENCE_SYNC_RPS", "5"))
+# Comma-separated space keys kept mirrored by the server; empty disables the scheduled sync.
+CONFLUENCE_SYNC_SPACES = [key.strip() for key in os.getenv("CONFLUENCE_SYNC_SPACES", "").split(",") if key.strip()]
+CONFLUENCE_SYNC_INTERVAL_SECS = float(os.getenv("CONFLUENCE_SYNC_INTERVAL_SECS", "900"))
+CONFLUENCE_MIRROR_MAX_AGE_SECS = float(
+    os.getenv("CONFLUENCE_MIRROR_MAX_AGE_SECS", str(CONFLUENCE_SYNC_INTERVAL_SECS))
+)
+SEARCH_PAGE_SIZE = 50
+
+_manifest_lock = threading.Lock()
+_manifest_cache: Dict[str, tuple] = {}
+
+
+class RateLimiter:
+    """Spaces out calls from any number of threads to at most `rate` per second."""
+
+    def __init__(self, rate: float) -> None:
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def space_dir(space_key: str) -> Path:
+    return Path(CONFLUENCE_MIRROR_DIR) / space_key
+
+
+def load_manifest(space_key: str) -> Dict[str, Any]:
+    """Manifest of a mirrored space, or an empty one if the space was never synced."""
+    try:
+        return json.loads((space_dir(space_key) / "manifest.json").read_text())
+    except FileNotFoundError:
+        return {"space": space_key, "last_sync": None, "pages": {}}
+
+
+def _save_manifest(space_key: str, manifest: Dict[str, Any]) -> None:
+    path = space_dir(space_key) / "manifest.json"
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_path, path)
+
+
+def _list_pages(
+    space_key: str, modified_since: Optional[str], limiter: RateLimiter, expand: str = "version,ancestors"
+) -> List[dict]:
+    cql = f'space="{space_key}" and type=page'
+    if modified_since:
+        cql += f' and lastmodified >= "{modified_since}"'
+
+    client = get_client()
+    results: List[dict] = []
+    path = "/wiki/rest/api/content/search"
+    params: Optional[dict] = {"cql": cql, "limit": SEARCH_PAGE_SIZE}
+    if expand:
+        params["expand"] = expand
+    while path:
+        limiter.wait()
+        response = client.get(path, params=params)
+        response.raise_for_status()
+        data = response.json()
+        results.extend(data.get("results", []))
+
+        links = data.get("_links", {})
+        path = f"{links.get('context', '/wiki')}{links['next']}" if links.get("next") else None
+        params = None  # the next link already carries the query
+    return results
+
+
+def _fetch_page(page_id: str, limiter: RateLimiter) -> Dict[str, Any]:
+    """Converted body and version of a page; failures are returned as {"error": ...}."""
+    try:
+        return _download_page(page_id, limiter)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _download_page(page_id: str, limiter: RateLimiter) -> Dict[str, Any]:
+    # Imported here because get_confluence_page itself resolves pages through this module.
+    from integration.confluence import convert_to_markdown
+
+    limiter.wait()
+    response = get_client().get(f"/wiki/rest/api/content/{page_id}?expand=body.storage,version")
+    response.raise_for_status()
+    data = response.json()
+    html_content = data.get("body", {}).get("storage", {}).get("value", "")
+    return {"version": data["version"]["number"], "markdown": convert_to_markdown(html_content)}
+
+
+def sync_space(space_key: str, full: bool = False) -> Dict[str, Any]:
+    """
+    Mirror a Confluence space locally, fetching only pages that changed.
+
+    Args:
+        space_key: Confluence space key (e.g. "houselanni")
+        full: List every page with its version instead of only recently modified ones
+
+    Returns:
+        dict: {"space": str, "listed": int, "updated": int, "removed": int,
+               "failed": {page_id: error}, "duration_secs": float}
+    """
+    started = time.monotonic()
+    limiter = RateLimiter(CONFLUENCE_SYNC_RPS)
+    manifest = load_manifest(space_key)
+    (space_dir(space_key) / "pages").mkdir(parents=True, exist_ok=True)
+
+    sync_started_at = datetime.now(timezone.utc)
+    modified_since = None
+    if manifest["last_sync"] and not full:
+        # CQL dates are evaluated in the API user's timezone, so list a day back; unchanged
+        # versions are skipped below, so the overlap only costs metadata.
+        since = datetime.fromisoformat(manifest["last_sync"]) - timedelta(days=1)
+        modified_since = since.strftime("%Y-%m-%d %H:%M")
+
+    listed = _list_pages(space_key, modified_since, limiter)
+    existing = listed
+    if modified_since:
+        # Deletions don't show up as modifications, so list every id too (without expansions).
+        existing = _list_pages(space_key, None, limiter, expand="")
+    existing_ids = {page["id"] for page in existing}
+    pages = manifest["pages"]
+    stale = [page for page in listed if pages.get(page["id"], {}).get("version") != page["version"]["number"]]
+
+    with ThreadPoolExecutor(max_workers=CONFLUENCE_SYNC_WORKERS) as executor:
+        fetched = list(executor.map(lambda page: _fetch_page(page["id"], limiter), stale))
+
+    failed = {}
+    for page, body in zip(stale, fetched):
+        if "error" in body:
+            failed[page["id"]] = body["error"]
+            continue
+        page_path = space_dir(space_key) / "pages" / f"{page['id']}.md"
+        page_path.write_text(body["markdown"], encoding="utf-8")
+        ancestors = page.get("ancestors") or []
+        pages[page["id"]] = {
+            "title": page["title"],
+            "version": body["version"],
+            "parent_id": ancestors[-1]["id"] if ancestors else None,
+            "last_modified": page["version"].get("when"),
+        }
+
+    removed = [page_id for page_id in pages if page_id not in existing_ids]
+    for page_id in removed:
+        (space_dir(space_key) / "pages" / f"{page_id}.md").unlink(missing_ok=True)
+        del pages[page_id]
+
+    # With failures, the next run lists the same window again so the failed pages are retried.
+    if not failed:
+        manifest["last_sync"] = sync_started_at.isoformat()
+    _save_manifest(space_key, manifest)
+
+    return {
+        "space": space_key,
+        "listed": len(listed),
+        "updated": len(stale) - len(failed),
+        "removed": len(removed),
+        "failed": failed,
+        "duration_secs": round(time.monotonic() - started, 2),
+    }
+
+
+def sync_spaces() -> Dict[str, Any]:
+    """Sync every space of CONFLUENCE_SYNC_SPACES; a failing space is reported without stopping the others."""
+    results: Dict[str, Any] = {}
+    for space_key in CONFLUENCE_SYNC_SPACES:
+        try:
+            results[space_key] = sync_space(space_key)
+        except Exception as e:
+            results[space_key] = {"error": str(e)}
+    return results
+
+
+def page_tree(space_key: str) -> Dict[Optional[str], List[str]]:
+    """Children page ids per parent id (None for top-level pages) of a mirrored space."""
+    tree: Dict[Optional[str], List[str]] = {}
+    for page_id, page in load_manifest(space_key)["pages"].items():
+        tree.setdefault(page["parent_id"], []).append(page_id)
+    return tree
+
+
+def _mirrored_manifests() -> Dict[str, Dict[str, Any]]:
+    """Manifests of all mirrored spaces, reloaded only when a manifest file changes."""
+    root = Path(CONFLUENCE_MIRROR_DIR)
+    if not root.is_dir():
+        return {}
+    manifests = {}
+    with _manifest_lock:
+        for manifest_path in root.glob("*/manifest.json"):
+            space_key = manifest_path.parent.name
+            mtime = manifest_path.stat().st_mtime_ns
+            cached = _manifest_cache.get(str(manifest_path))
+            if not cached or cached[0] != mtime:
+                cached = (mtime, json.loads(manifest_path.read_text()))
+                _manifest_cache[str(manifest_path)] = cached
+            manifests[space_key] = cached[1]
+    return manifests
+
+
+def _sync_age_secs(manifest: Dict[str, Any]) -> float:
+    if not manifest["last_sync"]:
+        return float("inf")
+    return (datetime.now(timezone.utc) - datetime.fromisoformat(manifest["last_sync"])).total_seconds()
+
+
+def mirrored_page_path(page_id: str, current_version: Callable[[str], int]) -> Optional[Tuple[Path, int]]:
+    """
+    Path and version of `page_id` in the local mirror, or None if no mirrored space has it at its
+    current version. `current_version` (a version lookup) is only called when the space was synced
+    more than CONFLUENCE_MIRROR_MAX_AGE_SECS ago.
+    """
+    for space_key, manifest in _mirrored_manifests().items():
+        page = manifest["pages"].get(page_id)
+        if page:
+            page_path = space_dir(space_key) / "pages" / f"{page_id}.md"
+            if not page_path.exists():
+                return None
+            if _sync_age_secs(manifest) > CONFLUENCE_MIRROR_MAX_AGE_SECS and current_version(page_id) != page["version"]:
+                return None
+            return page_path, page["version"]
+    return None
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+    parser = argparse.ArgumentParser(description="Mirror Confluence spaces locally")
+    parser.add_argument("spaces", nargs="+", help="Confluence space keys to mirror")
+    parser.add_argument("--full", action="store_true", help="Relist every page with its version")
+    args = parser.parse_args()
+
+    for space in args.spaces:
+        print(sync_space(space, full=args.full))
@@ -1,29 +1,107 @@
 import os
 import shutil
 import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import List, Tuple
 from urllib.parse import urlparse
 from strands import tool
 
+from custom_tools.utils.trigram_index import warm_trigram_index
+from integration import repo_archive, repo_cache
+from integration.workspace import WORKSPACE_ROOT, WorkspaceQuotaExceeded, check_quota
+from integration.session import get_session_id
+
 GITHUB_PERSONAL_ACCESS_TOKEN = os.getenv('GITHUB_PERSONAL_ACCESS_TOKEN')
+# Defaults for new clones: history depth (0 = full history) and blob-less partial clones.
+GITHUB_CLONE_DEPTH = int(os.getenv('GITHUB_CLONE_DEPTH', '0'))
+GITHUB_PARTIAL_CLONE = os.getenv('GITHUB_PARTIAL_CLONE', 'true').lower() == 'true'
+
+
+def parse_github_url(github_url: str) -> Tuple[str, str, str]:
+    """Split a repository URL into (owner, project_name, clone_url)."""
+    github_url = github_url.rstrip("/")
+    parsed = urlparse(github_url)
+    path_parts = parsed.path.strip("/").split("/")
+    if len(path_parts) != 2:
+        raise ValueError("Invalid GitHub URL format. Expected: https://github.com/user/repo")
+
+    clone_url = f"{github_url}.git" if not github_url.endswith(".git") else github_url
+    return path_parts[0], path_parts[-1], clone_url
+
+
+def authenticated_url(clone_url: str) -> str:
+    return f"https://{GITHUB_PERSONAL_ACCESS_TOKEN}@{clone_url.split('https://')[1]}"
+
+
+def _git_checkout(
+    clone_url: str,
+    remote_url: str,
+    project_name: str,
+    base_branch: str,
+    depth: int,
+    partial: bool,
+    sparse_paths: List[str],
+) -> dict:
+    try:
+        return repo_cache.checkout(
+            clone_url,
+            remote_url,
+            session_id=get_session_id(),
+            project_name=project_name,
+            base_branch=base_branch,
+            depth=depth,
+            partial=partial,
+            sparse_paths=sparse_paths,
+        )
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Git command failed: {e.stderr.strip()}") from e
+    except subprocess.TimeoutExpired as e:
+        raise RuntimeError(f"Git command timed out after {e.timeout:.0f}s: GitHub may be degraded") from e
+
 
 @tool(
     name="clone_github_repo",
     description=(
-        "Parses a GitHub repository URL, clones the repository locally using a personal access token, "
-        "checks out a branch, validates the repo, and returns the local path along with a success message."
+        "Parses a GitHub repository URL, gives this session its own checkout of a branch (backed by a shared "
+        "local copy of the repository that is cloned once with a personal access token and then only fetched), "
+        "validates the repo, and returns the local path along with a success message, the time taken and the bytes downloaded."
     )
 )
-def clone_github_repo(github_url: str, base_branch: str = "main") -> dict:
+def clone_github_repo(
+    github_url: str,
+    base_branch: str = "main",
+    depth: int = GITHUB_CLONE_DEPTH,
+    partial: bool = GITHUB_PARTIAL_CLONE,
+    sparse_paths: List[str] = None,
+    fetch_mode: str = "git",
+) -> dict:
     """
+    Sessions share one bare mirror per repository (see `integration.repo_cache`) and each get
+    their own worktree, so concurrent sessions never download the same repository twice.
+
     Args:
         github_url (str): The GitHub repository URL (e.g., https://github.com/user/repo)
         base_branch (str, optional): Branch to checkout after cloning. Defaults to "main".
+        depth (int, optional): Number of commits of history to download, 0 for full history.
+        partial (bool, optional): Download file contents only for the checked out commit
+            (`--filter=blob:none`); older contents are fetched on demand. Applies to new clones.
+        sparse_paths (list, optional): Only check out these directories (or gitignore-style
+            patterns), e.g. ["services/billing"] in a monorepo. More can be added later with
+            `add_sparse_paths`. With fetch_mode "archive", only these paths are extracted.
+        fetch_mode (str, optional): "git" for a git checkout, or "archive" to download a snapshot of the
+            branch without git or history (read-only use; faster for a one-off look at a repository).
 
     Returns:
         dict: {
-            "repo_path": str,      # Local path where the repo was cloned
-            "project_name": str,   # Name of the repository
-            "message": str         # Human-readable confirmation for agents
+            "repo_path": str,          # This session's checkout of the repo
+            "project_name": str,       # Name of the repository
+            "mode": str,               # "clone", "fetch", "cached" (mirror fetched moments ago) or "archive"
+            "duration_secs": float,    # Time spent cloning or fetching
+            "bytes_transferred": int,  # Growth of the shared mirror, or size of the archive
+            "sparse_paths": list,      # Checked out paths, or None for the whole repository
+            "message": str             # Human-readable confirmation for agents
         }
 
     Raises:
@@ -35,39 +113,88 @@ def clone_github_repo(github_url: str, base_branch: str = "main") -> dict:
     if not GITHUB_PERSONAL_ACCESS_TOKEN:
         raise ValueError("Missing GITHUB_PERSONAL_ACCESS_TOKEN environment variable")
 
-    # Parse GitHub URL
-    github_url = github_url.rstrip("/")
-    parsed = urlparse(github_url)
-    path_parts = parsed.path.strip("/").split("/")
-    if len(path_parts) != 2:
-        raise ValueError("Invalid GitHub URL format. Expected: https://github.com/user/repo")
+    owner, project_name, clone_url = parse_github_url(github_url)
+    remote_url_with_token = authenticated_url(clone_url)
 
-    project_name = path_parts[-1]
-    clone_url = f"{github_url}.git" if not github_url.endswith(".git") else github_url
-    repo_path = f"./tmp/{project_name}"
+    if fetch_mode not in ("git", "archive"):
+        raise ValueError('Invalid fetch_mode. Expected "git" or "archive"')
+    check_quota()
 
-    # Remove old repo if exists
-    if os.path.exists(repo_path):
-        shutil.rmtree(repo_path)
-
-    # Clone repo with token
-    remote_url_with_token = f"https://{GITHUB_PERSONAL_ACCESS_TOKEN}@{clone_url.split('https://')[1]}"
-    try:
-        subprocess.run(["git", "clone", remote_url_with_token, repo_path], check=True, text=True, capture_output=True)
-        subprocess.run(["git", "checkout", base_branch], cwd=repo_path, check=True, text=True, capture_output=True)
-        subprocess.run(["git", "pull", "origin", base_branch], cwd=repo_path, check=True, text=True, capture_output=True)
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Git command failed: {e.stderr.strip()}") from e
+    started = time.monotonic()
+    if fetch_mode == "archive":
+        result = repo_archive.fetch_archive(
+            owner,
+            project_name.removesuffix(".git"),
+            base_branch,
+            str(repo_cache.worktree_path(get_session_id(), project_name)),
+            prefixes=sparse_paths,
+            token=GITHUB_PERSONAL_ACCESS_TOKEN,
+        )
+        result.update(mode="archive", sparse_paths=sparse_paths or None)
+    else:
+        result = _git_checkout(clone_url, remote_url_with_token, project_name, base_branch, depth, partial, sparse_paths)
+    duration = round(time.monotonic() - started, 2)
+    repo_path, mode, bytes_transferred = result["repo_path"], result["mode"], result["bytes_transferred"]
+    sparse_note = f" Only {', '.join(result['sparse_paths'])} is checked out." if result["sparse_paths"] else ""
 
     # Validate repo
     if not os.path.exists(repo_path) or not any(os.scandir(repo_path)):
         raise RuntimeError(f"Repo exists at {repo_path}, but it is empty or missing")
+    try:
+        check_quota(refresh=True)
+    except WorkspaceQuotaExceeded:
+        shutil.rmtree(repo_path, ignore_errors=True)
+        raise
+
+    # Index the checkout in the background so the agent's first find and search are answered from it.
+    threading.Thread(target=warm_trigram_index, args=(repo_path,), name="repo-index", daemon=True).start()
 
     # Success message for agent
-    message = f"✅ Repository '{project_name}' successfully cloned to '{repo_path}' and is ready for use."
+    action = {"clone": "cloned", "fetch": "updated", "cached": "checked out", "archive": "downloaded"}[mode]
+    message = (
+        f"✅ Repository '{project_name}' successfully {action} to '{repo_path}' and is ready for use "
+        f"({duration}s, {bytes_transferred / 1024:.0f} KiB downloaded).{sparse_note}"
+    )
 
     return {
         "repo_path": repo_path,
         "project_name": project_name,
+        "mode": mode,
+        "duration_secs": duration,
+        "bytes_transferred": bytes_transferred,
+        "sparse_paths": result["sparse_paths"],
         "message": message
     }
+
+
+@tool(
+    name="add_sparse_paths",
+    description=(
+        "Adds directories (or gitignore-style patterns) to a repository that was cloned with sparse_paths, "
+        "so that more of a large repository becomes readable. Returns the full list of checked out paths."
+    )
+)
+def add_sparse_paths(repo_path: str, paths: List[str]) -> dict:
+    """
+    Args:
+        repo_path (str): The repo_path returned by clone_github_repo.
+        paths (list): Directories or patterns to add, e.g. ["libs/shared"].
+
+    Returns:
+        dict: {"repo_path": str, "sparse_paths": list, "message": str}
+    """
+    if not paths:
+        raise ValueError("Invalid input: paths must contain at least one path")
+    if Path(WORKSPACE_ROOT).resolve() not in Path(repo_path).resolve().parents:
+        raise ValueError(f"{repo_path} is not a repository checked out by clone_github_repo")
+
+    try:
+        patterns = repo_cache.add_sparse_paths(repo_path, paths)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Git command failed: {e.stderr.strip()}") from e
+
+    return {
+        "repo_path": repo_path,
+        "sparse_paths": patterns,
+        "message": f"Added {', '.join(paths)} to '{repo_path}'.",
+    }
@@ -1,14 +1,139 @@
 import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
 import httpx
-import base64
 from strands import tool
 
+from integration.atlassian import get_client
+
 atlasian_api_token = os.getenv('ATLASSIAN_API_TOKEN')
 atlasian_email = os.getenv('ATLASSIAN_EMAIL')
 jira_base_url = os.getenv('JIRA_BASE_URL')
 board_id = int(os.getenv('JIRA_BOARD_ID'))
 project_key = os.getenv('JIRA_PROJECT_KEY')
 
+# Jira accepts at most 50 issues per bulk create and per add-to-sprint call.
+JIRA_BULK_LIMIT = 50
+
+# Sprints change every couple of weeks and issue types almost never, so both are cached.
+JIRA_SPRINT_CACHE_TTL = int(os.getenv("JIRA_SPRINT_CACHE_TTL", "900"))
+JIRA_METADATA_CACHE_TTL = int(os.getenv("JIRA_METADATA_CACHE_TTL", "86400"))
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+def _cached(key: str, ttl: int, loader: Callable[[], Any]) -> Any:
+    """Return the cached value for `key`, calling `loader` when it is missing or older than `ttl`."""
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+    value = loader()
+    with _cache_lock:
+        _cache[key] = (time.monotonic(), value)
+    return value
+
+
+def invalidate_jira_cache(key: str = None) -> None:
+    """Drop one cached entry ("active_sprint", "story_issue_type") or all of them."""
+    with _cache_lock:
+        if key is None:
+            _cache.clear()
+        else:
+            _cache.pop(key, None)
+
+
+def _load_active_sprint_id() -> int:
+    resp = get_client().get(f"/rest/agile/1.0/board/{board_id}/sprint?state=active")
+    resp.raise_for_status()
+    sprints = resp.json().get("values", [])
+    if not sprints:
+        raise ValueError(f"No active sprint found for board ID {board_id}")
+    return sprints[0]["id"]
+
+
+def _load_story_issue_type() -> Dict[str, str]:
+    resp = get_client().get(f"/rest/api/3/issue/createmeta/{project_key}/issuetypes")
+    resp.raise_for_status()
+    data = resp.json()
+    for issue_type in data.get("issueTypes") or data.get("values", []):
+        if issue_type.get("name") == "Story":
+            return {"id": issue_type["id"]}
+    return {"name": "Story"}
+
+
+def get_active_sprint_id() -> int:
+    """Id of the board's active sprint, cached for JIRA_SPRINT_CACHE_TTL seconds."""
+    return _cached("active_sprint", JIRA_SPRINT_CACHE_TTL, _load_active_sprint_id)
+
+
+def get_story_issue_type() -> Dict[str, str]:
+    """Issue type reference for Stories in the project, cached for JIRA_METADATA_CACHE_TTL seconds."""
+    return _cached("story_issue_type", JIRA_METADATA_CACHE_TTL, _load_story_issue_type)
+
+
+def warm_jira_metadata() -> None:
+    """Load the active sprint and project metadata ahead of the first story. Called at server startup."""
+    get_active_sprint_id()
+    get_story_issue_type()
+
+
+def build_issue_payload(summary: str, description: str, labels: List[str] = None) -> Dict[str, Any]:
+    """Issue create payload for a Story (ADF format for description)."""
+    payload = {
+        "fields": {
+            "project": {"key": project_key},
+            "summary": summary,
+            "issuetype": get_story_issue_type(),
+            "description": {
+                "type": "doc",
+                "version": 1,
+                "content": [
+                    {
+                        "type": "paragraph",
+                        "content": [
+                            {"type": "text", "text": description or ""}
+                        ]
+                    }
+                ]
+            }
+        }
+    }
+    if labels:
+        payload["fields"]["labels"] = labels
+    return payload
+
+
+def add_issues_to_active_sprint(issue_keys: list) -> int:
+    """
+    Move issues into the active sprint and return its id.
+
+    The sprint id comes from the cache. If the call fails (e.g. the cached sprint was closed),
+    the cache is invalidated and the call is retried once with a freshly loaded sprint.
+    """
+    client = get_client()
+    payload = {"issues": issue_keys}
+    sprint_id = get_active_sprint_id()
+    resp = client.post(f"/rest/agile/1.0/sprint/{sprint_id}/issue", json=payload)
+    if resp.is_error:
+        invalidate_jira_cache("active_sprint")
+        sprint_id = get_active_sprint_id()
+        resp = client.post(f"/rest/agile/1.0/sprint/{sprint_id}/issue", json=payload)
+    resp.raise_for_status()
+    return sprint_id
+
+
+def _check_configuration() -> None:
+    if not all([atlasian_email, atlasian_api_token, jira_base_url, board_id, project_key]):
+        raise ValueError(
+            "Missing Jira configuration in environment variables. "
+            "Required: ATLASSIAN_EMAIL, ATLASSIAN_API_TOKEN, JIRA_BASE_URL, JIRA_BOARD_ID, JIRA_PROJECT_KEY"
+        )
+
+
 @tool(
     name="create_jira_story",
     description=(
@@ -31,67 +156,104 @@ def create_jira_story(summary: str, description: str) -> str:
 
     try:
         # Load credentials and Jira configuration from environment
-        if not all([atlasian_email, atlasian_api_token, jira_base_url, board_id, project_key]):
-            raise ValueError(
-                "Missing Jira configuration in environment variables. "
-                "Required: ATLASSIAN_EMAIL, ATLASSIAN_API_TOKEN, JIRA_BASE_URL, JIRA_BOARD_ID, JIRA_PROJECT_KEY"
-            )
-
-        # Prepare authentication header
-        auth_string = f"{atlasian_email}:{atlasian_api_token}"
-        auth_token = base64.b64encode(auth_string.encode()).decode()
-        headers = {
-            "Authorization": f"Basic {auth_token}",
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-
-        # Step 1: Get current active sprint
-        sprints_url = f"{jira_base_url}/rest/agile/1.0/board/{board_id}/sprint?state=active"
-        resp = httpx.get(sprints_url, headers=headers, timeout=30)
-        resp.raise_for_status()
-        sprints = resp.json().get("values", [])
-        if not sprints:
-            raise ValueError(f"No active sprint found for board ID {board_id}")
-        current_sprint_id = sprints[0]["id"]
-
-        # Step 2: Prepare issue payload (ADF format for description)
-        issue_payload = {
-            "fields": {
-                "project": {"key": project_key},
-                "summary": summary,
-                "issuetype": {"name": "Story"},
-                "description": {
-                    "type": "doc",
-                    "version": 1,
-                    "content": [
-                        {
-                            "type": "paragraph",
-                            "content": [
-                                {"type": "text", "text": description or ""}
-                            ]
-                        }
-                    ]
-                }
-            }
-        }
+        _check_configuration()
 
-        # Step 3: Create Jira Story
-        create_url = f"{jira_base_url}/rest/api/3/issue"
-        create_resp = httpx.post(create_url, headers=headers, json=issue_payload, timeout=30)
+        # Step 1: Create Jira Story (sprint and issue type come from the metadata cache)
+        create_resp = get_client().post("/rest/api/3/issue", json=build_issue_payload(summary, description))
         create_resp.raise_for_status()
         issue_key = create_resp.json()["key"]
 
-        # Step 4: Add story to active sprint
-        add_sprint_url = f"{jira_base_url}/rest/agile/1.0/sprint/{current_sprint_id}/issue"
-        add_sprint_payload = {"issues": [issue_key]}
-        add_sprint_resp = httpx.post(add_sprint_url, headers=headers, json=add_sprint_payload, timeout=30)
-        add_sprint_resp.raise_for_status()
+        # Step 2: Add story to active sprint
+        add_issues_to_active_sprint([issue_key])
 
         return issue_key
     except Exception as e:
         print(f"Error creating Jira story: {str(e)}")
         raise e
 
+
+def _failed(story: Dict[str, str], error: str) -> Dict[str, Any]:
+    return {"summary": story.get("summary"), "status": "failed", "issue_key": None, "error": error or "Unknown error"}
+
+
+def _create_batch(client: httpx.Client, batch: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Create up to JIRA_BULK_LIMIT stories with one bulk request; one result per story, in order."""
+    resp = client.post(
+        "/rest/api/3/issue/bulk",
+        json={"issueUpdates": [build_issue_payload(s.get("summary", ""), s.get("description", "")) for s in batch]},
+    )
+    # Partial failures come back with 201; a 400 means every element failed.
+    if resp.status_code not in (200, 201, 400):
+        resp.raise_for_status()
+    data = resp.json()
+
+    # Bulk responses list per-element errors; a plain 400 has request-level messages instead.
+    errors = data.get("errors") or []
+    if isinstance(errors, dict):
+        request_error = "; ".join(data.get("errorMessages", []) + list(errors.values()))
+        errors = []
+    else:
+        request_error = "; ".join(data.get("errorMessages", []))
+    errors = {e["failedElementNumber"]: e for e in errors}
+    created = iter(data.get("issues", []))
+    results = []
+    for i, story in enumerate(batch):
+        issue = None if i in errors else next(created, None)
+        if issue is not None:
+            results.append({"summary": story.get("summary"), "status": "created", "issue_key": issue["key"], "error": None})
+        elif i in errors:
+            element_errors = errors[i].get("elementErrors", {})
+            results.append(_failed(story, "; ".join(element_errors.get("errorMessages", []) + list(element_errors.get("errors", {}).values()))))
+        else:
+            results.append(_failed(story, request_error or f"Jira returned no issue (HTTP {resp.status_code})"))
+    return results
+
+
+@tool(
+    name="create_jira_stories",
+    description=(
+        "Creates several Jira Stories at once and adds all of them to the current active sprint of the board. "
+        "Returns the status and issue key of every story."
+    )
+)
+def create_jira_stories(stories: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Args:
+        stories (list): Stories to create, each a dict with "summary" and "description".
+
+    Returns:
+        list: One entry per input story, in order:
+            {"summary": str, "status": "created" | "failed", "issue_key": str | None, "error": str | None}
+    """
+    try:
+        _check_configuration()
+        if not stories:
+            raise ValueError("stories must contain at least one story")
+
+        results: List[Dict[str, Any]] = []
+        client = get_client()
+        for start in range(0, len(stories), JIRA_BULK_LIMIT):
+            batch = stories[start : start + JIRA_BULK_LIMIT]
+            try:
+                results.extend(_create_batch(client, batch))
+            except Exception as e:
+                # A failed batch doesn't lose the stories already created by earlier ones.
+                results.extend(_failed(story, str(e)) for story in batch)
+
+        created_keys = [r["issue_key"] for r in results if r["issue_key"]]
+        for start in range(0, len(created_keys), JIRA_BULK_LIMIT):
+            try:
+                add_issues_to_active_sprint(created_keys[start : start + JIRA_BULK_LIMIT])
+            except Exception as e:
+                batch_keys = set(created_keys[start : start + JIRA_BULK_LIMIT])
+                for r in results:
+                    if r["issue_key"] in batch_keys:
+                        r["error"] = f"Created but not added to the active sprint: {str(e)}"
+
+        return results
+    except Exception as e:
+        print(f"Error creating Jira stories: {str(e)}")
+        raise e
+
 if __name__ == "__main__":
-    create_jira_story("This story has been created by Nemo AI Voice Planner", "This is a test story.")
\ No newline at end of file
+    create_jira_story("This story has been created by Nemo AI Voice Planner", "This is a test story.")
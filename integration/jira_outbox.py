@@ -0,0 +1,311 @@
+"""
+Durable outbox for Jira writes.
+
+`queue_jira_story` stores the story in a local SQLite queue and returns a handle at once;
+a background worker delivers queued stories to Jira:
+
+- failed deliveries are retried with exponential backoff (with jitter) up to
+  JIRA_OUTBOX_MAX_ATTEMPTS, while 4xx errors other than 408/429 fail immediately
+- `Retry-After` on 429/503 responses pauses every delivery until the given time
+- the issue key is stored as soon as Jira returns it, so later steps never create the story again
+- every story carries an idempotency label `nemo-idem-<handle>`; before re-creating a story
+  whose create request failed or was interrupted, the worker searches for that label. Jira's
+  search index lags behind creates, so such retries wait at least JIRA_OUTBOX_SEARCH_LAG_SECS;
+  that makes duplicates unlikely, but an index lagging longer can still let one through
+- failures adding the story to the sprint are classified (and honour `Retry-After`) like the
+  create request itself
+
+`get_jira_story_status` resolves a handle to its state and, once delivered, its issue key.
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+from strands import tool
+
+from integration.atlassian import get_client
+from integration.jira import _check_configuration, add_issues_to_active_sprint, build_issue_payload
+
+JIRA_OUTBOX_PATH = os.getenv("JIRA_OUTBOX_PATH", "./tmp/jira_outbox.sqlite3")
+JIRA_OUTBOX_MAX_ATTEMPTS = int(os.getenv("JIRA_OUTBOX_MAX_ATTEMPTS", "8"))
+JIRA_OUTBOX_BASE_DELAY = float(os.getenv("JIRA_OUTBOX_BASE_DELAY", "2"))
+JIRA_OUTBOX_MAX_DELAY = float(os.getenv("JIRA_OUTBOX_MAX_DELAY", "300"))
+# Minimum wait before looking up the label of a story whose create request may have succeeded.
+JIRA_OUTBOX_SEARCH_LAG_SECS = float(os.getenv("JIRA_OUTBOX_SEARCH_LAG_SECS", "30"))
+IDEMPOTENCY_LABEL_PREFIX = "nemo-idem-"
+
+# pending -> delivering -> delivered | failed; "delivering" rows left by a crash go back to pending.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    description TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    issue_key TEXT,
+    sprint_added INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_stop = threading.Event()
+_worker: Optional[threading.Thread] = None
+# Deliveries are paused until this time.time() after a 429/503 with Retry-After.
+_not_before = 0.0
+
+
+class PermanentDeliveryError(Exception):
+    """Jira rejected the story in a way a retry cannot fix."""
+
+
+def _connect() -> sqlite3.Connection:
+    Path(JIRA_OUTBOX_PATH).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(JIRA_OUTBOX_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def _update(conn: sqlite3.Connection, handle: str, **fields: Any) -> None:
+    fields["updated_at"] = time.time()
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    conn.execute(f"UPDATE outbox SET {assignments} WHERE id = ?", (*fields.values(), handle))
+
+
+def enqueue_story(summary: str, description: str) -> str:
+    """Store a story in the outbox, wake the worker and return the pending handle."""
+    handle = uuid.uuid4().hex[:16]
+    now = time.time()
+    with closing(_connect()) as conn:
+        conn.execute(
+            "INSERT INTO outbox (id, summary, description, status, next_attempt_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, 'pending', ?, ?, ?)",
+            (handle, summary, description, now, now, now),
+        )
+    start_outbox_worker()
+    _wakeup.set()
+    return handle
+
+
+def story_status(handle: str) -> Optional[Dict[str, Any]]:
+    """State of a queued story, or None for an unknown handle."""
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            "SELECT id, summary, status, attempts, issue_key, last_error, next_attempt_at FROM outbox WHERE id = ?",
+            (handle,),
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _raise_for_status(response: httpx.Response) -> None:
+    """Raise PermanentDeliveryError for non-retryable responses and honour Retry-After."""
+    global _not_before
+    if not response.is_error:
+        return
+    if response.status_code in (429, 503):
+        delay = _retry_after_seconds(response)
+        if delay is not None:
+            with _lock:
+                _not_before = max(_not_before, time.time() + delay)
+    if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+        raise PermanentDeliveryError(f"Jira returned {response.status_code}: {response.text[:500]}")
+    response.raise_for_status()
+
+
+def _find_issue_by_label(label: str) -> Optional[str]:
+    response = get_client().get(
+        "/rest/api/3/search/jql",
+        params={"jql": f'labels = "{label}"', "fields": "key", "maxResults": 1},
+    )
+    _raise_for_status(response)
+    issues = response.json().get("issues", [])
+    return issues[0]["key"] if issues else None
+
+
+def _deliver(conn: sqlite3.Connection, row: sqlite3.Row) -> None:
+    handle = row["id"]
+    label = f"{IDEMPOTENCY_LABEL_PREFIX}{handle}"
+    issue_key = row["issue_key"]
+
+    # A previous attempt may have created the issue before failing or being interrupted.
+    if issue_key is None and row["attempts"] > 0:
+        issue_key = _find_issue_by_label(label)
+
+    if issue_key is None:
+        response = get_client().post(
+            "/rest/api/3/issue",
+            json=build_issue_payload(row["summary"], row["description"], labels=[label]),
+        )
+        _raise_for_status(response)
+        issue_key = response.json()["key"]
+    _update(conn, handle, issue_key=issue_key)
+
+    if not row["sprint_added"]:
+        try:
+            add_issues_to_active_sprint([issue_key])
+        except httpx.HTTPStatusError as e:
+            _raise_for_status(e.response)
+            raise
+        _update(conn, handle, sprint_added=1)
+
+    _update(conn, handle, status="delivered", last_error=None)
+
+
+def _stored_issue_key(conn: sqlite3.Connection, handle: str) -> Optional[str]:
+    return conn.execute("SELECT issue_key FROM outbox WHERE id = ?", (handle,)).fetchone()[0]
+
+
+def _backoff(attempts: int) -> float:
+    delay = min(JIRA_OUTBOX_BASE_DELAY * (2 ** (attempts - 1)), JIRA_OUTBOX_MAX_DELAY)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def deliver_due() -> int:
+    """Deliver every story whose next attempt is due. Returns the number of stories attempted."""
+    attempted = 0
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY created_at",
+            (time.time(),),
+        ).fetchall()
+        for row in rows:
+            with _lock:
+                wait = _not_before - time.time()
+            if wait > 0 or _stop.is_set():
+                break
+            attempts = row["attempts"] + 1
+            # Count the attempt before sending, so a crash mid-request leads to a label lookup.
+            _update(conn, row["id"], status="delivering", attempts=attempts)
+            attempted += 1
+            try:
+                _deliver(conn, row)
+            except PermanentDeliveryError as e:
+                _update(conn, row["id"], status="failed", last_error=str(e))
+            except Exception as e:
+                if attempts >= JIRA_OUTBOX_MAX_ATTEMPTS:
+                    _update(conn, row["id"], status="failed", last_error=str(e))
+                else:
+                    with _lock:
+                        not_before = _not_before
+                    next_attempt_at = max(time.time() + _backoff(attempts), not_before)
+                    if _stored_issue_key(conn, row["id"]) is None:
+                        # The next attempt starts with a label search, which must see this attempt's issue.
+                        next_attempt_at = max(next_attempt_at, time.time() + JIRA_OUTBOX_SEARCH_LAG_SECS)
+                    _update(conn, row["id"], status="pending", last_error=str(e), next_attempt_at=next_attempt_at)
+    return attempted
+
+
+def _next_wakeup() -> float:
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'").fetchone()
+    with _lock:
+        not_before = _not_before
+    if row[0] is None:
+        return 60.0
+    return min(max(row[0], not_before) - time.time(), 60.0)
+
+
+def _run_worker() -> None:
+    with closing(_connect()) as conn:
+        conn.execute("UPDATE outbox SET status = 'pending' WHERE status = 'delivering'")
+    while not _stop.is_set():
+        try:
+            deliver_due()
+            timeout = _next_wakeup()
+        except Exception as e:
+            print(f"Jira outbox worker error: {str(e)}")
+            timeout = JIRA_OUTBOX_BASE_DELAY
+        if timeout > 0:
+            _wakeup.wait(timeout)
+        _wakeup.clear()
+
+
+def start_outbox_worker() -> None:
+    """Start the delivery thread if it isn't running. Also delivers stories left by a previous process."""
+    global _worker
+    with _lock:
+        if _worker is not None and _worker.is_alive():
+            return
+        _stop.clear()
+        _worker = threading.Thread(target=_run_worker, name="jira-outbox", daemon=True)
+        _worker.start()
+
+
+def stop_outbox_worker(timeout: float = 5.0) -> None:
+    """Ask the delivery thread to stop after the current story. Queued stories stay in the outbox."""
+    _stop.set()
+    _wakeup.set()
+    worker = _worker
+    if worker is not None:
+        worker.join(timeout)
+
+
+@tool(
+    name="queue_jira_story",
+    description=(
+        "Queues a Jira Story for creation and returns immediately with a handle. The story is created "
+        "in the background and added to the active sprint; use get_jira_story_status to get its issue key."
+    )
+)
+def queue_jira_story(summary: str, description: str) -> Dict[str, Any]:
+    """
+    Args:
+        summary (str): The summary/title of the Jira Story.
+        description (str): Description of the story.
+
+    Returns:
+        dict: {"handle": str, "status": "pending"}
+    """
+    _check_configuration()
+    return {"handle": enqueue_story(summary, description), "status": "pending"}
+
+
+@tool(
+    name="get_jira_story_status",
+    description=(
+        "Returns the delivery status of a story queued with queue_jira_story: pending, delivering, "
+        "delivered (with its issue key) or failed (with the error)."
+    )
+)
+def get_jira_story_status(handle: str) -> Dict[str, Any]:
+    """
+    Args:
+        handle (str): Handle returned by queue_jira_story.
+
+    Returns:
+        dict: {"handle", "summary", "status", "attempts", "issue_key", "last_error", "next_attempt_at"}
+    """
+    status = story_status(handle)
+    if status is None:
+        raise ValueError(f"Unknown Jira outbox handle: {handle}")
+    status["handle"] = status.pop("id")
+    return status
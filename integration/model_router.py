@@ -0,0 +1,129 @@
+"""
+Complexity-based model routing for Strands analyses.
+
+Most `handle_strands_analysis` calls are simple lookups (read a file, fetch a page, create a
+story) that a small model handles quickly. Deep multi-file analyses benefit from a stronger
+model. `route_query` classifies the query and its expected tool depth and picks the model;
+`model_router_stats` keeps per-class decision counts and latency.
+"""
+
+import os
+import re
+import threading
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from integration.bedrock import DEFAULT_MODEL_ID
+
+FAST_MODEL_ID = os.getenv("STRANDS_FAST_MODEL_ID", DEFAULT_MODEL_ID)
+STRONG_MODEL_ID = os.getenv("STRANDS_STRONG_MODEL_ID", "us.anthropic.claude-sonnet-4-5-20250929-v1:0")
+
+# Queries with this many expected tool steps or more go to the strong model.
+DEEP_TOOL_DEPTH = int(os.getenv("STRANDS_DEEP_TOOL_DEPTH", "5"))
+
+DEEP_KEYWORDS = (
+    "analyze", "analyse", "analysis", "architecture", "design", "refactor", "review", "across",
+    "compare", "impact", "dependencies", "dependency", "flow", "end to end", "end-to-end",
+    "how does", "why does", "plan", "implement", "integrate", "migration", "whole", "entire",
+    "all files", "codebase", "every", "trace",
+)
+LOOKUP_KEYWORDS = (
+    "read", "show", "open", "list", "find", "fetch", "get", "what is in", "look up", "lookup",
+    "journal", "create jira", "create a jira", "create story", "clone",
+)
+
+URL_PATTERN = re.compile(r"https?://\S+")
+PATH_PATTERN = re.compile(r"[\w\-./]+\.[a-zA-Z][a-zA-Z0-9]{0,4}\b")
+
+
+def _keyword_patterns(keywords) -> List["re.Pattern"]:
+    """Whole-word patterns ("get" doesn't match "target"), allowing simple inflections ("reads", "analyzing")."""
+    patterns = []
+    for keyword in keywords:
+        if keyword.endswith("e"):
+            patterns.append(re.compile(rf"\b{re.escape(keyword[:-1])}(?:e|es|ed|ing)\b"))
+        else:
+            patterns.append(re.compile(rf"\b{re.escape(keyword)}(?:s|es|ed|ing)?\b"))
+    return patterns
+
+
+DEEP_PATTERNS = _keyword_patterns(DEEP_KEYWORDS)
+LOOKUP_PATTERNS = _keyword_patterns(LOOKUP_KEYWORDS)
+
+
+def _count(text: str, patterns: List["re.Pattern"]) -> int:
+    """Number of keywords that occur in `text`."""
+    return sum(1 for pattern in patterns if pattern.search(text))
+
+
+def estimate_tool_depth(query: str) -> int:
+    """
+    Rough number of tool calls the query will need.
+
+    Each URL implies a fetch or clone, each named file a read, and deep keywords imply
+    several rounds of find/search/read over the repository.
+    """
+    text = query.lower()
+    urls = URL_PATTERN.findall(query)
+    repo_urls = [url for url in urls if "github.com" in url]
+    files = PATH_PATTERN.findall(URL_PATTERN.sub(" ", query))
+
+    depth = len(urls) + len(files) + 1  # the journal entry the system prompt asks for
+    depth += len(repo_urls)  # a find before any read of a cloned repo
+    depth += 2 * _count(text, DEEP_PATTERNS)
+    return depth
+
+
+def route_query(query: str) -> Dict[str, Any]:
+    """
+    Classify a Strands query as "lookup" or "analysis" and pick the model for it.
+
+    Returns:
+        dict: {"query_class": str, "model_id": str, "tool_depth": int}
+    """
+    text = query.lower()
+    tool_depth = estimate_tool_depth(query)
+    deep_hits = _count(text, DEEP_PATTERNS)
+    lookup_hits = _count(text, LOOKUP_PATTERNS)
+
+    is_deep = tool_depth >= DEEP_TOOL_DEPTH or deep_hits > lookup_hits or len(text.split()) > 60
+    query_class = "analysis" if is_deep else "lookup"
+    return {
+        "query_class": query_class,
+        "model_id": STRONG_MODEL_ID if is_deep else FAST_MODEL_ID,
+        "tool_depth": tool_depth,
+    }
+
+
+class ModelRouterStats:
+    """Thread-safe routing decision counts and latency per query class."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._classes: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, decision: Dict[str, Any], latency_secs: float) -> None:
+        with self._lock:
+            stats = self._classes.setdefault(
+                decision["query_class"],
+                {"calls": 0, "total_latency_secs": 0.0, "max_latency_secs": 0.0, "model_id": decision["model_id"]},
+            )
+            stats["calls"] += 1
+            stats["total_latency_secs"] += latency_secs
+            stats["max_latency_secs"] = max(stats["max_latency_secs"], latency_secs)
+            mean = stats["total_latency_secs"] / stats["calls"]
+        logger.info(
+            f"Strands analysis routed to {decision['query_class']} ({decision['model_id']}, "
+            f"tool depth {decision['tool_depth']}) took {latency_secs:.2f}s, class mean {mean:.2f}s"
+        )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                query_class: {**stats, "mean_latency_secs": stats["total_latency_secs"] / stats["calls"]}
+                for query_class, stats in self._classes.items()
+            }
+
+
+model_router_stats = ModelRouterStats()
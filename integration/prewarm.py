@@ -0,0 +1,63 @@
+"""
+Background pre-warming of the repository and Confluence page most sessions start from.
+
+The server lifespan runs `prewarm_defaults` at startup and every PREWARM_INTERVAL_SECS, so
+the first `clone_github_repo` of a session only adds a worktree to an already fetched mirror
+and the first `get_confluence_page` is answered from the page cache and section index.
+"""
+
+import os
+from typing import Any, Dict
+
+from integration import repo_cache
+from integration.confluence import ensure_section_index, extract_page_id, load_page_markdown
+from integration.github_utils import (
+    GITHUB_CLONE_DEPTH,
+    GITHUB_PARTIAL_CLONE,
+    GITHUB_PERSONAL_ACCESS_TOKEN,
+    authenticated_url,
+    parse_github_url,
+)
+from integration.workspace import open_workspace
+from prompts.prompt import DEFAULT_CONFLUENCE_URL, DEFAULT_GITHUB_REPO
+
+PREWARM_INTERVAL_SECS = float(os.getenv("PREWARM_INTERVAL_SECS", "1800"))
+PREWARM_BRANCH = os.getenv("PREWARM_BRANCH", "main")
+# Worktree kept up to date by the pre-warmer; sessions get their own worktrees of the same mirror.
+PREWARM_SESSION_ID = "prewarm"
+
+
+def prewarm_default_repo() -> Dict[str, Any]:
+    """Clone or fetch DEFAULT_GITHUB_REPO into the shared mirror cache."""
+    if not GITHUB_PERSONAL_ACCESS_TOKEN:
+        raise ValueError("Missing GITHUB_PERSONAL_ACCESS_TOKEN environment variable")
+    _, project_name, clone_url = parse_github_url(DEFAULT_GITHUB_REPO)
+    open_workspace(PREWARM_SESSION_ID, pinned=True)
+    return repo_cache.checkout(
+        clone_url,
+        authenticated_url(clone_url),
+        session_id=PREWARM_SESSION_ID,
+        project_name=project_name,
+        base_branch=PREWARM_BRANCH,
+        depth=GITHUB_CLONE_DEPTH,
+        partial=GITHUB_PARTIAL_CLONE,
+    )
+
+
+def prewarm_default_confluence_page() -> Dict[str, Any]:
+    """Fetch DEFAULT_CONFLUENCE_URL into the page cache and build its section index."""
+    page_id = extract_page_id(DEFAULT_CONFLUENCE_URL)
+    version, markdown_text = load_page_markdown(page_id)
+    index = ensure_section_index(page_id, version, markdown_text)
+    return {"page_id": page_id, "version": version, "sections": len(index)}
+
+
+def prewarm_defaults() -> Dict[str, Any]:
+    """Run every pre-warm step; a failing step is reported without stopping the others."""
+    results: Dict[str, Any] = {}
+    for name, step in (("repo", prewarm_default_repo), ("confluence", prewarm_default_confluence_page)):
+        try:
+            results[name] = step()
+        except Exception as e:
+            results[name] = {"error": str(e)}
+    return results
@@ -0,0 +1,217 @@
+"""
+Clone-free repository access through streamed archive extraction.
+
+`fetch_archive` downloads the tarball of one ref from the GitHub API and extracts it while it
+streams (`tarfile` mode "r|gz"), so no temporary tarball is written and neither `git` nor
+any history is needed. `prefixes` limits extraction to some directories, although the full
+archive is still transferred. Files land in a temporary directory next to the destination,
+which then replaces the destination in one step.
+
+Members that would land outside the destination (absolute paths, "..", links pointing out of
+the tree) and special files are skipped with a warning instead of aborting the fetch. Python's
+"data" extraction filter does the checking where it exists (3.11.4+); older versions use an
+equivalent check here.
+
+GITHUB_API_URL can point at GitHub Enterprise or at a local HTTP server serving a fixture
+tarball under /repos/<owner>/<repo>/tarball/<ref>.
+
+Usage (compares the archive path with a git clone into a scratch directory):
+    python -m integration.repo_archive OWNER/REPO [--ref main] [--prefix src ...]
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import tarfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+from loguru import logger
+
+from integration.resilience import ResilientTransport, call_timeout
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_ARCHIVE_TIMEOUT = float(os.getenv("GITHUB_ARCHIVE_TIMEOUT", "60"))
+# Extraction filters (PEP 706) were added in Python 3.11.4.
+HAS_EXTRACTION_FILTERS = hasattr(tarfile, "data_filter")
+
+_lock = threading.Lock()
+_client: Optional[httpx.Client] = None
+
+
+def get_client() -> httpx.Client:
+    """Process-wide GitHub client, behind the GitHub circuit breaker and the turn budget."""
+    global _client
+    with _lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(
+                base_url=GITHUB_API_URL,
+                transport=ResilientTransport(httpx.HTTPTransport(), endpoint="GitHub"),
+                timeout=httpx.Timeout(GITHUB_ARCHIVE_TIMEOUT, connect=10),
+                follow_redirects=True,
+            )
+        return _client
+
+
+class _ResponseStream(io.RawIOBase):
+    """Read-only file object over a streaming response, checking the turn budget between chunks."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._buffer = b""
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            call_timeout(GITHUB_ARCHIVE_TIMEOUT)
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = chunk
+            self.bytes_read += len(chunk)
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def _normalise_prefixes(prefixes: Optional[List[str]]) -> List[str]:
+    return [prefix.strip("/") for prefix in prefixes or [] if prefix.strip("/")]
+
+
+def _wanted(path: str, prefixes: List[str]) -> bool:
+    return not prefixes or any(path == prefix or path.startswith(prefix + "/") for prefix in prefixes)
+
+
+def _unsafe_member(member: tarfile.TarInfo, dest: str) -> Optional[str]:
+    """Why extracting `member` under `dest` would be unsafe, or None. For Pythons without filters."""
+    root = os.path.realpath(dest)
+
+    def outside(path: str) -> bool:
+        return os.path.commonpath([root, os.path.realpath(path)]) != root
+
+    target = os.path.join(root, member.name)
+    if os.path.isabs(member.name) or outside(target):
+        return "path outside the destination"
+    if member.issym() or member.islnk():
+        # Symlinks resolve from their own directory, hard links from the archive root.
+        base = os.path.dirname(target) if member.issym() else root
+        if os.path.isabs(member.linkname) or outside(os.path.join(base, member.linkname)):
+            return f"link to {member.linkname} outside the destination"
+    if not (member.isfile() or member.isdir() or member.issym() or member.islnk()):
+        return "special file"
+    return None
+
+
+def _extract_member(archive: tarfile.TarFile, member: tarfile.TarInfo, dest: Path) -> bool:
+    """Extract one member, or skip it with a warning if it is unsafe. Returns whether it was extracted."""
+    if HAS_EXTRACTION_FILTERS:
+        try:
+            archive.extract(member, dest, filter="data")
+            return True
+        except tarfile.FilterError as e:
+            reason = str(e)
+    else:
+        reason = _unsafe_member(member, str(dest))
+        if reason is None:
+            archive.extract(member, dest)
+            return True
+    logger.warning(f"Skipping archive member {member.name}: {reason}")
+    return False
+
+
+def fetch_archive(
+    owner: str,
+    repo: str,
+    ref: str,
+    dest: str,
+    prefixes: Optional[List[str]] = None,
+    token: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Stream the tarball of `owner/repo` at `ref` into `dest`, replacing what is there.
+
+    Returns:
+        dict: {"repo_path": str, "files": int, "skipped": int, "bytes_transferred": int, "duration_secs": float}
+    """
+    started = time.monotonic()
+    prefixes = _normalise_prefixes(prefixes)
+    dest_path = Path(dest)
+    tmp_path = dest_path.with_name(f"{dest_path.name}.tmp-{threading.get_ident()}")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+
+    headers = {"Accept": "application/vnd.github+json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    files = skipped = 0
+    try:
+        with get_client().stream("GET", f"/repos/{owner}/{repo}/tarball/{ref}", headers=headers) as response:
+            response.raise_for_status()
+            stream = _ResponseStream(response.iter_bytes())
+            with tarfile.open(fileobj=stream, mode="r|gz") as archive:
+                for member in archive:
+                    # GitHub wraps everything in a single "<owner>-<repo>-<sha>/" directory.
+                    _, _, relative = member.name.partition("/")
+                    if not relative or not _wanted(relative, prefixes):
+                        continue
+                    member.name = relative
+                    if member.islnk():
+                        member.linkname = member.linkname.partition("/")[2]
+                    if _extract_member(archive, member, tmp_path):
+                        files += member.isfile()
+                    else:
+                        skipped += 1
+        # Marks the snapshot as a repository root for file_read's indexes.
+        (tmp_path / ".nemo-snapshot").write_text(json.dumps({"repo": f"{owner}/{repo}", "ref": ref}))
+        shutil.rmtree(dest_path, ignore_errors=True)
+        os.replace(tmp_path, dest_path)
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+    return {
+        "repo_path": str(dest_path),
+        "files": files,
+        "skipped": skipped,
+        "bytes_transferred": stream.bytes_read,
+        "duration_secs": round(time.monotonic() - started, 2),
+    }
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+
+    from integration import repo_cache, workspace
+
+    parser = argparse.ArgumentParser(description="Compare archive extraction with a git clone")
+    parser.add_argument("repo", help="owner/repo")
+    parser.add_argument("--ref", default="main")
+    parser.add_argument("--prefix", action="append", help="Only extract this directory (repeatable)")
+    args = parser.parse_args()
+
+    owner, repo = args.repo.split("/")
+    token = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")
+    with tempfile.TemporaryDirectory() as scratch:
+        archive = fetch_archive(owner, repo, args.ref, f"{scratch}/archive", args.prefix, token)
+        print(f"archive: {archive['duration_secs']}s, {archive['bytes_transferred']} bytes, {archive['files']} files")
+
+        repo_cache.REPO_CACHE_DIR = f"{scratch}/mirrors"
+        workspace.WORKSPACE_ROOT = f"{scratch}/sessions"
+        clone_url = f"https://github.com/{owner}/{repo}.git"
+        remote_url = f"https://{token}@github.com/{owner}/{repo}.git" if token else clone_url
+        started = time.monotonic()
+        clone = repo_cache.checkout(clone_url, remote_url, "benchmark", repo, args.ref, sparse_paths=args.prefix)
+        print(f"clone:   {round(time.monotonic() - started, 2)}s, {clone['bytes_transferred']} bytes")
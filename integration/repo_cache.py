@@ -0,0 +1,257 @@
+"""
+Process-wide cache of bare repository mirrors with per-session worktrees.
+
+Each repository URL is downloaded once into a bare mirror under REPO_CACHE_DIR. Sessions get
+their own detached `git worktree` of the mirror in their workspace (`repos/<project>`, see
+`integration.workspace`),
+so N sessions on one repo cost one download and N light checkouts, and they never write into
+each other's files.
+
+- A lock per mirror serialises fetches and worktree changes; the fetch itself is skipped when
+  the mirror was fetched less than REPO_CACHE_FETCH_TTL seconds ago.
+- `index.json` records size and last use per mirror. When the total exceeds
+  REPO_CACHE_MAX_BYTES, least recently used mirrors without live worktrees are evicted.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from integration.resilience import DeadlineExceeded, call_timeout, guard
+from integration.workspace import workspace_dir
+
+REPO_CACHE_DIR = os.getenv("REPO_CACHE_DIR", "./tmp/repo_cache")
+REPO_CACHE_MAX_BYTES = int(os.getenv("REPO_CACHE_MAX_BYTES", str(5 * 1024 * 1024 * 1024)))
+REPO_CACHE_FETCH_TTL = float(os.getenv("REPO_CACHE_FETCH_TTL", "30"))
+GITHUB_GIT_TIMEOUT = float(os.getenv("GITHUB_GIT_TIMEOUT", "120"))
+
+_index_lock = threading.Lock()
+_mirror_locks: Dict[str, threading.Lock] = {}
+
+
+def run_git(args: list, cwd: str = None) -> subprocess.CompletedProcess:
+    """Run a git command against GitHub, bounded by the turn budget and the GitHub circuit breaker."""
+    timeout = call_timeout(GITHUB_GIT_TIMEOUT)
+    # Only hangs count against the breaker; a failing git command (bad branch, auth) is not an outage.
+    with guard("GitHub", is_failure=lambda e: isinstance(e, subprocess.TimeoutExpired)):
+        try:
+            return subprocess.run(["git", *args], cwd=cwd, check=True, text=True, capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            if timeout < GITHUB_GIT_TIMEOUT:
+                raise DeadlineExceeded(f"git {args[0]} did not finish within the time left for this request.") from e
+            raise
+
+
+def git_local(args: list, cwd: str) -> str:
+    """Run a git command that doesn't touch the network and return its stdout."""
+    return subprocess.run(["git", *args], cwd=cwd, check=True, text=True, capture_output=True).stdout.strip()
+
+
+def dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def mirror_path(clone_url: str) -> Path:
+    """Bare mirror location for a repository URL (without credentials)."""
+    digest = hashlib.sha1(clone_url.encode()).hexdigest()[:12]
+    name = clone_url.rstrip("/").split("/")[-1].removesuffix(".git")
+    return Path(REPO_CACHE_DIR) / f"{name}-{digest}.git"
+
+
+def worktree_path(session_id: str, project_name: str) -> Path:
+    return workspace_dir("repos", session_id) / project_name
+
+
+def _mirror_lock(key: str) -> threading.Lock:
+    with _index_lock:
+        return _mirror_locks.setdefault(key, threading.Lock())
+
+
+def _load_index() -> Dict[str, Dict[str, Any]]:
+    try:
+        return json.loads((Path(REPO_CACHE_DIR) / "index.json").read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_index(index: Dict[str, Dict[str, Any]]) -> None:
+    path = Path(REPO_CACHE_DIR) / "index.json"
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(index, indent=2))
+    os.replace(tmp_path, path)
+
+
+def _fetch_args(depth: int) -> List[str]:
+    return [f"--depth={depth}"] if depth > 0 else []
+
+
+def _ensure_mirror(mirror: Path, remote_url: str, base_branch: str, depth: int, partial: bool) -> str:
+    """Create or refresh the bare mirror. Returns "clone", "fetch" or "cached"."""
+    if (mirror / "HEAD").exists():
+        with _index_lock:
+            entry = _load_index().get(mirror.name, {})
+        fetched = entry.get("fetched", {}).get(base_branch, 0)
+        if time.time() - fetched < REPO_CACHE_FETCH_TTL:
+            return "cached"
+        # The token may have been rotated since the clone.
+        git_local(["remote", "set-url", "origin", remote_url], str(mirror))
+        mode = "fetch"
+    else:
+        shutil.rmtree(mirror, ignore_errors=True)
+        mirror.parent.mkdir(parents=True, exist_ok=True)
+        args = ["clone", "--bare", "--branch", base_branch, *_fetch_args(depth)]
+        if partial:
+            args.append("--filter=blob:none")
+        run_git([*args, remote_url, str(mirror)])
+        mode = "clone"
+    run_git(
+        ["fetch", *_fetch_args(depth), "origin", f"+refs/heads/{base_branch}:refs/remotes/origin/{base_branch}"],
+        cwd=str(mirror),
+    )
+    return mode
+
+
+def _sparse_checkout_args(patterns: List[str]) -> List[str]:
+    # Plain directory paths use the faster cone mode; anything with wildcards needs full patterns.
+    cone = not any(char in pattern for pattern in patterns for char in "*?[!")
+    return ["--cone" if cone else "--no-cone", *patterns]
+
+
+def _checkout_worktree(mirror: Path, worktree: Path, base_branch: str, sparse_paths: Optional[List[str]]) -> None:
+    """
+    Point the session's worktree at the tip of `base_branch`, creating it if needed. With
+    `sparse_paths`, only those paths are materialised; in a partial clone, only their file
+    contents are downloaded. Checkouts may fetch blobs, so they run through `run_git`.
+    """
+    target = f"origin/{base_branch}"
+    if (worktree / ".git").is_file():
+        if sparse_paths:
+            run_git(["sparse-checkout", "set", *_sparse_checkout_args(sparse_paths)], cwd=str(worktree))
+        run_git(["checkout", "-f", "--detach", target], cwd=str(worktree))
+        git_local(["clean", "-fd"], str(worktree))
+        return
+    shutil.rmtree(worktree, ignore_errors=True)
+    git_local(["worktree", "prune"], str(mirror))
+    worktree.parent.mkdir(parents=True, exist_ok=True)
+    if not sparse_paths:
+        run_git(["worktree", "add", "--force", "--detach", str(worktree.resolve()), target], cwd=str(mirror))
+        return
+    git_local(["worktree", "add", "--force", "--no-checkout", "--detach", str(worktree.resolve()), target], str(mirror))
+    git_local(["sparse-checkout", "set", *_sparse_checkout_args(sparse_paths)], str(worktree))
+    run_git(["checkout", "-f", "--detach", target], cwd=str(worktree))
+
+
+def _git_config_true(worktree: str, key: str) -> bool:
+    try:
+        return git_local(["config", "--bool", key], worktree) == "true"
+    except subprocess.CalledProcessError:
+        return False
+
+
+def sparse_patterns(worktree: str) -> Optional[List[str]]:
+    """Sparse-checkout patterns of a worktree, or None when it has the full tree."""
+    if not _git_config_true(worktree, "core.sparseCheckout"):
+        return None
+    return git_local(["sparse-checkout", "list"], worktree).splitlines()
+
+
+def add_sparse_paths(worktree: str, paths: List[str]) -> List[str]:
+    """Materialise more paths in a sparse worktree. Returns the full list of patterns."""
+    current = sparse_patterns(worktree)
+    if current is None:
+        raise ValueError(f"{worktree} is not a sparse checkout; it already contains the whole repository")
+    if _git_config_true(worktree, "core.sparseCheckoutCone") and _sparse_checkout_args(paths)[0] == "--no-cone":
+        # Cone mode only takes directories; switch to the equivalent full patterns to add wildcards
+        # (top-level files plus the listed directories).
+        cone_patterns = ["/*", "!/*/", *[f"/{directory}/" for directory in current]]
+        run_git(["sparse-checkout", "set", "--no-cone", *cone_patterns, *paths], cwd=worktree)
+    else:
+        run_git(["sparse-checkout", "add", *paths], cwd=worktree)
+    return sparse_patterns(worktree)
+
+
+def checkout(
+    clone_url: str,
+    remote_url: str,
+    session_id: str,
+    project_name: str,
+    base_branch: str,
+    depth: int = 0,
+    partial: bool = True,
+    sparse_paths: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Give `session_id` a worktree of `base_branch`, backed by the shared mirror of `clone_url`.
+    `sparse_paths` limits the worktree to those paths; without it an existing worktree keeps
+    whatever sparse patterns it already has.
+
+    Returns:
+        dict: {"repo_path": str, "mode": "clone" | "fetch" | "cached", "bytes_transferred": int,
+               "sparse_paths": list | None}
+    """
+    mirror = mirror_path(clone_url)
+    worktree = worktree_path(session_id, project_name)
+    with _mirror_lock(mirror.name):
+        size_before = dir_size(str(mirror))
+        mode = _ensure_mirror(mirror, remote_url, base_branch, depth, partial)
+        _checkout_worktree(mirror, worktree, base_branch, sparse_paths)
+        size = dir_size(str(mirror))
+
+        with _index_lock:
+            index = _load_index()
+            entry = index.setdefault(mirror.name, {"worktrees": []})
+            entry.update(url=clone_url, size=size, last_used=time.time())
+            if mode != "cached":
+                entry.setdefault("fetched", {})[base_branch] = time.time()
+            if str(worktree) not in entry["worktrees"]:
+                entry["worktrees"].append(str(worktree))
+            _save_index(index)
+
+    evict(keep=mirror.name)
+    return {
+        "repo_path": str(worktree),
+        "mode": mode,
+        "bytes_transferred": max(size - size_before, 0),
+        "sparse_paths": sparse_patterns(str(worktree)),
+    }
+
+
+def evict(keep: str = None) -> List[str]:
+    """Remove least recently used mirrors until the cache fits REPO_CACHE_MAX_BYTES. Returns the evicted names."""
+    evicted = []
+    with _index_lock:
+        index = _load_index()
+        total = sum(entry.get("size", 0) for entry in index.values())
+        for name, entry in sorted(index.items(), key=lambda item: item[1].get("last_used", 0)):
+            if total <= REPO_CACHE_MAX_BYTES:
+                break
+            # Mirrors still backing a session's worktree stay until the worktree is gone.
+            entry["worktrees"] = [path for path in entry.get("worktrees", []) if Path(path).exists()]
+            if name == keep or entry["worktrees"]:
+                continue
+            lock = _mirror_locks.setdefault(name, threading.Lock())
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                shutil.rmtree(Path(REPO_CACHE_DIR) / name, ignore_errors=True)
+            finally:
+                lock.release()
+            total -= entry.get("size", 0)
+            del index[name]
+            evicted.append(name)
+        if Path(REPO_CACHE_DIR).is_dir():
+            _save_index(index)
+    return evicted
@@ -0,0 +1,266 @@
+"""
+Circuit breakers and latency budgets for calls to Atlassian and GitHub.
+
+- Every endpoint (Jira, Jira Agile, Confluence, GitHub) has a `CircuitBreaker`. After
+  RESILIENCE_FAILURE_THRESHOLD consecutive failures (transport errors, timeouts, 429 and 5xx
+  responses) it opens, and calls fail at once with `DependencyUnavailable` for
+  RESILIENCE_RESET_TIMEOUT seconds. After that a single trial call decides whether it closes again.
+- Each voice turn has a deadline (`turn_deadline`). It reaches the tools through the agent's
+  invocation state and is bound to each tool call's context with `bind_deadline` (see
+  `integration.turn_context`), so every outgoing call is bounded by what is left of it instead
+  of by the full client timeout.
+
+Both failures raise `DependencyUnavailable`. Its message is meant to be relayed to the user.
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import httpx
+
+RESILIENCE_FAILURE_THRESHOLD = int(os.getenv("RESILIENCE_FAILURE_THRESHOLD", "5"))
+RESILIENCE_RESET_TIMEOUT = float(os.getenv("RESILIENCE_RESET_TIMEOUT", "30"))
+# Seconds the Strands agent gets per voice turn, and the least a call needs to be worth starting.
+STRANDS_TURN_BUDGET_SECS = float(os.getenv("STRANDS_TURN_BUDGET_SECS", "60"))
+MIN_CALL_BUDGET_SECS = 0.5
+
+_deadline: ContextVar[Optional[float]] = ContextVar("integration_deadline", default=None)
+
+
+class DependencyUnavailable(Exception):
+    """An integration call was skipped or abandoned because the dependency is degraded."""
+
+
+class DeadlineExceeded(DependencyUnavailable):
+    """The caller's turn budget ran out before or during the call."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker: closed -> open -> half_open -> closed | open."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = RESILIENCE_FAILURE_THRESHOLD,
+        reset_timeout: float = RESILIENCE_RESET_TIMEOUT,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._rejected = 0
+
+    def before_call(self) -> None:
+        """Raise DependencyUnavailable while the breaker is open; let one trial call through after the reset timeout."""
+        with self._lock:
+            if self._state == "closed":
+                return
+            retry_in = self._opened_at + self.reset_timeout - time.monotonic()
+            if self._state == "open" and retry_in <= 0:
+                self._state = "half_open"
+            if self._state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self._rejected += 1
+        raise DependencyUnavailable(
+            f"{self.name} is currently unavailable after {self._failures} consecutive failures; "
+            f"not retrying for another {max(math.ceil(retry_in), 1)}s. Tell the user and continue without it."
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self._state, "consecutive_failures": self._failures, "rejected_calls": self._rejected}
+
+
+_breakers_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """State of every circuit breaker, for the /api/resilience-stats endpoint."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left before the current turn's deadline, or None when no deadline is set."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def turn_deadline(seconds: float) -> float:
+    """Deadline `seconds` from now, in the clock `remaining_budget` uses."""
+    return time.monotonic() + seconds
+
+
+def bind_deadline(deadline: Optional[float]) -> None:
+    """Bound every integration call made from the current context (e.g. a tool call) by `deadline`."""
+    _deadline.set(deadline)
+
+
+def call_timeout(default: float) -> float:
+    """Timeout for the next call: `default`, shortened to the remaining budget. Raises DeadlineExceeded when it is spent."""
+    remaining = remaining_budget()
+    if remaining is None:
+        return default
+    if remaining < MIN_CALL_BUDGET_SECS:
+        raise DeadlineExceeded(
+            "The time budget for this request is used up, so the remaining lookups were skipped. "
+            "Answer with what you have so far."
+        )
+    return min(default, remaining)
+
+
+@contextmanager
+def guard(endpoint: str, is_failure: Callable[[BaseException], bool] = lambda e: True) -> Iterator[None]:
+    """
+    Run a block against `endpoint`'s circuit breaker. Exceptions for which `is_failure` is
+    true count against the breaker; others (e.g. a 404) mean the dependency is healthy.
+    """
+    breaker = get_breaker(endpoint)
+    breaker.before_call()
+    try:
+        yield
+    except BaseException as e:
+        if is_failure(e):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        raise
+    breaker.record_success()
+
+
+def endpoint_for(request: httpx.Request) -> str:
+    """Breaker name for an Atlassian request, by API family."""
+    path = request.url.path
+    if path.startswith("/wiki/"):
+        return "Confluence"
+    if path.startswith("/rest/agile/"):
+        return "Jira Agile"
+    return "Jira"
+
+
+def _apply_budget(request: httpx.Request) -> bool:
+    """Shorten the request's timeouts to the remaining budget. Returns True if they were shortened."""
+    remaining = remaining_budget()
+    if remaining is None:
+        return False
+    limit = call_timeout(remaining)
+    timeouts = dict(request.extensions.get("timeout", {}))
+    shortened = False
+    for key in ("connect", "read", "write", "pool"):
+        if timeouts.get(key) is None or timeouts[key] > limit:
+            timeouts[key] = limit
+            shortened = True
+    request.extensions["timeout"] = timeouts
+    return shortened
+
+
+def _is_failure_response(response: httpx.Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def _timeout_error(endpoint: str, e: Exception) -> DeadlineExceeded:
+    return DeadlineExceeded(f"{endpoint} did not answer within the time left for this request ({e}).")
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """
+    Applies the turn budget and the per-endpoint circuit breakers to every request of a client.
+    Atlassian requests are assigned to an endpoint by path; other clients pass a fixed `endpoint`.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, endpoint: Optional[str] = None) -> None:
+        self._transport = transport
+        self._endpoint = endpoint
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = self._endpoint or endpoint_for(request)
+        shortened = _apply_budget(request)
+        breaker = get_breaker(endpoint)
+        breaker.before_call()
+        try:
+            response = self._transport.handle_request(request)
+        except httpx.TimeoutException as e:
+            # A timeout caused by our own budget says nothing about the dependency's health.
+            if shortened:
+                breaker.record_success()
+                raise _timeout_error(endpoint, e) from e
+            breaker.record_failure()
+            raise
+        except httpx.TransportError:
+            breaker.record_failure()
+            raise
+        if _is_failure_response(response):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncResilientTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of `ResilientTransport`."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, endpoint: Optional[str] = None) -> None:
+        self._transport = transport
+        self._endpoint = endpoint
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = self._endpoint or endpoint_for(request)
+        shortened = _apply_budget(request)
+        breaker = get_breaker(endpoint)
+        breaker.before_call()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TimeoutException as e:
+            if shortened:
+                breaker.record_success()
+                raise _timeout_error(endpoint, e) from e
+            breaker.record_failure()
+            raise
+        except httpx.TransportError:
+            breaker.record_failure()
+            raise
+        if _is_failure_response(response):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
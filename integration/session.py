@@ -0,0 +1,28 @@
+"""
+Identity of the voice session a piece of work belongs to.
+
+`run_bot` passes the session id with each Strands turn and `integration.turn_context` binds it
+to every tool call, so clones, journals and quota checks made by a tool land in that session's
+workspace. Outside a tool call it is DEFAULT_SESSION_ID.
+"""
+
+import re
+from contextvars import ContextVar
+
+DEFAULT_SESSION_ID = "default"
+
+_session_id: ContextVar[str] = ContextVar("session_id", default=DEFAULT_SESSION_ID)
+
+
+def normalize_session_id(session_id: str) -> str:
+    """Session id made safe for use as a directory name."""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", session_id).strip(".") or DEFAULT_SESSION_ID
+
+
+def set_session_id(session_id: str) -> None:
+    """Bind the current context to `session_id` (sanitised for use in paths)."""
+    _session_id.set(normalize_session_id(session_id))
+
+
+def get_session_id() -> str:
+    return _session_id.get()
@@ -0,0 +1,42 @@
+"""
+Per-turn state handed from the voice pipeline to Strands tools.
+
+Strands runs every agent invocation on a fresh thread and event loop without copying the
+caller's context, so context variables set in `run_bot` never reach the tools. Instead, the
+turn's state travels in the agent's `invocation_state`, and `TurnContextHooks` binds it to the
+context of each tool call right before the tool runs; Strands copies that context into the
+thread the tool function runs on, and from there into everything the tool calls.
+"""
+
+from typing import Any, Dict
+
+from strands import Agent
+from strands.agent import AgentResult
+from strands.hooks import BeforeToolCallEvent, HookProvider, HookRegistry
+
+from integration.resilience import bind_deadline, turn_deadline
+from integration.session import DEFAULT_SESSION_ID, set_session_id
+
+TURN_DEADLINE_KEY = "turn_deadline"
+SESSION_ID_KEY = "session_id"
+
+
+class TurnContextHooks(HookProvider):
+    """Binds the turn's deadline and session id from the invocation state to every tool call."""
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeToolCallEvent, self.bind_turn_state)
+
+    def bind_turn_state(self, event: BeforeToolCallEvent) -> None:
+        bind_deadline(event.invocation_state.get(TURN_DEADLINE_KEY))
+        set_session_id(event.invocation_state.get(SESSION_ID_KEY) or DEFAULT_SESSION_ID)
+
+
+def turn_state(session_id: str, budget_secs: float) -> Dict[str, Any]:
+    """Invocation state for one turn of `session_id` whose integration calls must finish within `budget_secs`."""
+    return {SESSION_ID_KEY: session_id, TURN_DEADLINE_KEY: turn_deadline(budget_secs)}
+
+
+def run_turn(agent: Agent, query: str, session_id: str, budget_secs: float) -> AgentResult:
+    """Run one agent turn (blocking). The agent must have been created with `TurnContextHooks`."""
+    return agent(query, invocation_state=turn_state(session_id, budget_secs))
@@ -0,0 +1,180 @@
+"""
+Per-session workspaces with disk quotas and garbage collection.
+
+Every voice session works in its own root, WORKSPACE_ROOT/<session_id>/:
+
+    repos/<project>/    worktrees and archive snapshots from clone_github_repo
+    journal/            the session's journal entries
+    .workspace.json     creation time, last use, release time and measured disk usage
+
+Writes check the session's usage against WORKSPACE_QUOTA_BYTES first. `release_workspace` is
+called when a client disconnects, and `collect_garbage` (run on a schedule by the server)
+removes released workspaces after WORKSPACE_RELEASE_GRACE_SECS and idle ones after
+WORKSPACE_MAX_AGE_SECS, so disk use and directory scans stay bounded on a long-running node.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from integration.session import get_session_id
+
+WORKSPACE_ROOT = os.getenv("WORKSPACE_ROOT", "./tmp/sessions")
+WORKSPACE_QUOTA_BYTES = int(os.getenv("WORKSPACE_QUOTA_BYTES", str(2 * 1024 * 1024 * 1024)))
+WORKSPACE_MAX_AGE_SECS = float(os.getenv("WORKSPACE_MAX_AGE_SECS", str(24 * 3600)))
+WORKSPACE_RELEASE_GRACE_SECS = float(os.getenv("WORKSPACE_RELEASE_GRACE_SECS", "600"))
+WORKSPACE_GC_INTERVAL_SECS = float(os.getenv("WORKSPACE_GC_INTERVAL_SECS", "600"))
+# Measured usage is reused for this long before the tree is walked again.
+USAGE_TTL_SECS = 30
+
+_lock = threading.Lock()
+_active: Set[str] = set()
+# Workspaces that are never garbage-collected (e.g. the pre-warmer's).
+_pinned: Set[str] = set()
+
+
+class WorkspaceQuotaExceeded(Exception):
+    """A session's workspace is over its disk quota."""
+
+
+def workspace_root(session_id: Optional[str] = None) -> Path:
+    return Path(WORKSPACE_ROOT) / (session_id or get_session_id())
+
+
+def workspace_dir(name: str, session_id: Optional[str] = None) -> Path:
+    """A named directory (e.g. "repos", "journal") inside the session's workspace, created on demand."""
+    path = workspace_root(session_id) / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _meta_path(root: Path) -> Path:
+    return root / ".workspace.json"
+
+
+def _load_meta(root: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(_meta_path(root).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_meta(root: Path, meta: Dict[str, Any]) -> None:
+    root.mkdir(parents=True, exist_ok=True)
+    tmp_path = _meta_path(root).with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(meta))
+    os.replace(tmp_path, _meta_path(root))
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for dirpath, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def open_workspace(session_id: str, pinned: bool = False) -> Path:
+    """Create (or reuse) the session's workspace and protect it from garbage collection while active."""
+    root = workspace_root(session_id)
+    with _lock:
+        _active.add(session_id)
+        if pinned:
+            _pinned.add(session_id)
+        meta = _load_meta(root)
+        now = time.time()
+        meta.setdefault("created", now)
+        meta.update(last_used=now, released=None)
+        _save_meta(root, meta)
+    return root
+
+
+def release_workspace(session_id: str) -> None:
+    """Mark the session's workspace as abandoned; it is removed after the grace period."""
+    root = workspace_root(session_id)
+    with _lock:
+        _active.discard(session_id)
+        if not root.exists():
+            return
+        meta = _load_meta(root)
+        meta["released"] = time.time()
+        _save_meta(root, meta)
+    if WORKSPACE_RELEASE_GRACE_SECS <= 0:
+        collect_garbage()
+
+
+def workspace_usage(session_id: Optional[str] = None, refresh: bool = False) -> int:
+    """Bytes used by the session's workspace, measured at most every USAGE_TTL_SECS unless `refresh`."""
+    root = workspace_root(session_id)
+    with _lock:
+        meta = _load_meta(root)
+        if not refresh and time.time() - meta.get("measured", 0) < USAGE_TTL_SECS:
+            return meta.get("usage_bytes", 0)
+    usage = _dir_size(root) if root.exists() else 0
+    with _lock:
+        meta = _load_meta(root)
+        meta.update(usage_bytes=usage, measured=time.time(), last_used=time.time())
+        _save_meta(root, meta)
+    return usage
+
+
+def check_quota(session_id: Optional[str] = None, refresh: bool = False) -> int:
+    """Raise WorkspaceQuotaExceeded if the session is over its quota; otherwise return its usage."""
+    usage = workspace_usage(session_id, refresh=refresh)
+    if usage > WORKSPACE_QUOTA_BYTES:
+        raise WorkspaceQuotaExceeded(
+            f"This session's workspace uses {usage / 2**20:.0f} MiB of its {WORKSPACE_QUOTA_BYTES / 2**20:.0f} MiB quota. "
+            "Use sparse_paths or fetch_mode='archive' for large repositories."
+        )
+    return usage
+
+
+def collect_garbage(now: Optional[float] = None) -> List[str]:
+    """Remove released workspaces past the grace period and idle ones past the maximum age. Returns their ids."""
+    now = now or time.time()
+    root = Path(WORKSPACE_ROOT)
+    if not root.is_dir():
+        return []
+    removed = []
+    for session_root in root.iterdir():
+        session_id = session_root.name
+        if not session_root.is_dir() or session_id in _pinned:
+            continue
+        with _lock:
+            if session_id in _active:
+                continue
+            meta = _load_meta(session_root)
+            released = meta.get("released")
+            last_used = meta.get("last_used") or session_root.stat().st_mtime
+            expired = (released is not None and now - released >= WORKSPACE_RELEASE_GRACE_SECS) or (
+                now - last_used >= WORKSPACE_MAX_AGE_SECS
+            )
+            if expired:
+                shutil.rmtree(session_root, ignore_errors=True)
+                removed.append(session_id)
+    return removed
+
+
+def workspace_stats() -> Dict[str, Dict[str, Any]]:
+    """Recorded usage and state of every workspace, for the /api/workspaces endpoint."""
+    root = Path(WORKSPACE_ROOT)
+    if not root.is_dir():
+        return {}
+    stats = {}
+    for session_root in root.iterdir():
+        if session_root.is_dir():
+            meta = _load_meta(session_root)
+            stats[session_root.name] = {
+                "active": session_root.name in _active,
+                "usage_bytes": meta.get("usage_bytes"),
+                "last_used": meta.get("last_used"),
+                "released": meta.get("released"),
+            }
+    return stats
@@ -1,5 +1,6 @@
 import asyncio
 import os
+import time
 import argparse
 import aiohttp
 from datetime import datetime
@@ -9,7 +10,6 @@ import random
 import json
 
 from loguru import logger
-import boto3
 from pipecat.frames.frames import LLMRunFrame
 from pipecat.adapters.schemas.function_schema import FunctionSchema
 from pipecat.adapters.schemas.tools_schema import ToolsSchema
@@ -29,13 +29,24 @@ from pipecat.transports.smallwebrtc.transport import SmallWebRTCTransport
 from pipecat.transports.base_transport import TransportParams
 from pipecat.frames.frames import EndFrame, TTSSpeakFrame
 from strands import Agent
-from strands.models import BedrockModel
 
 from prompts.prompt import base_prompt, strands_system_prompt
-from integration.confluence import get_confluence_page
-from integration.github_utils import clone_github_repo
-from integration.jira import create_jira_story
+from prompts.caching import PromptCacheHooks
+from integration.bedrock import DEFAULT_MODEL_ID, get_bedrock_model
+from integration.confluence import get_confluence_outline, get_confluence_page, get_confluence_section
+from integration.github_utils import add_sparse_paths, clone_github_repo
+from integration.jira import create_jira_stories, create_jira_story
+from integration.jira_outbox import get_jira_story_status, queue_jira_story
+from integration.model_router import model_router_stats, route_query
+from integration.resilience import STRANDS_TURN_BUDGET_SECS
+from integration.session import normalize_session_id
+from integration.turn_context import TurnContextHooks, run_turn
+from integration.workspace import open_workspace, release_workspace
 from custom_tools import file_read, journal, shell
+from custom_tools.utils.compact_schema import apply_schema_mode
+from voice.bedrock_llm import SharedCredentialsBedrockLLMService
+from voice.cache_metrics import PromptCacheMetricsProcessor
+from voice.jitter_buffer import AdaptiveJitterBuffer, initial_audio_out_chunks
 
 load_dotenv(override=True)
 
@@ -72,20 +83,33 @@ load_dotenv(override=True)
 # # Create tools schema
 # tools = ToolsSchema(standard_tools=[weather_function])
 
-session = boto3.Session(region_name="us-east-1")
-bedrock_model = BedrockModel(
-    model_id="us.anthropic.claude-haiku-4-5-20251001-v1:0", 
-    boto_session=session,
-)
-
 async def run_bot(webrtc_connection):
     """Main bot entry point compatible with Pipecat Cloud."""
+    # Clones and journals of this session live in its own workspace until it disconnects.
+    session_id = normalize_session_id(webrtc_connection.pc_id)
+    open_workspace(session_id)
 
     strands_agent = Agent(
         name="StrandAgent",
         system_prompt=strands_system_prompt.format(project_name='nemo-ai'),
-        model=bedrock_model,
-        tools=[file_read, journal, shell, get_confluence_page, create_jira_story, clone_github_repo],
+        model=get_bedrock_model(),
+        tools=apply_schema_mode(
+            [
+                file_read,
+                journal,
+                shell,
+                get_confluence_page,
+                get_confluence_outline,
+                get_confluence_section,
+                create_jira_story,
+                create_jira_stories,
+                queue_jira_story,
+                get_jira_story_status,
+                clone_github_repo,
+                add_sparse_paths,
+            ]
+        ),
+        hooks=[TurnContextHooks(), PromptCacheHooks()],
     )
 
     async def handle_strands_analysis(params: FunctionCallParams, query: str):
@@ -99,25 +123,31 @@ async def run_bot(webrtc_connection):
             query (str): The user's request or question, e.g., "Check if our API supports OAuth."
         """
         loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(None, strands_agent, query)
+        decision = route_query(query)
+        strands_agent.model = get_bedrock_model(decision["model_id"])
+
+        started = time.monotonic()
+        # Every Confluence, Jira and GitHub call the agent makes is bounded by what's left of the turn budget,
+        # and repositories are checked out into this session's own worktree.
+        result = await loop.run_in_executor(
+            None, run_turn, strands_agent, query, session_id, STRANDS_TURN_BUDGET_SECS
+        )
+        model_router_stats.record(decision, time.monotonic() - started)
         await params.result_callback(result.message)
 
 
+    # The transport's chunk size is fixed for the connection; only the jitter buffer adapts later.
+    audio_out_chunks = await initial_audio_out_chunks()
     pipecat_transport = SmallWebRTCTransport(
         webrtc_connection=webrtc_connection,
         params=TransportParams(
             audio_in_enabled=True,
             audio_out_enabled=True,
             vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=0.5)),
-            audio_out_10ms_chunks=2,
+            audio_out_10ms_chunks=audio_out_chunks,
         ),
     )
-
-    session = boto3.Session(
-        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-        region_name='us-east-1'
-    )
+    jitter_buffer = AdaptiveJitterBuffer(session_id=session_id, initial_chunks=audio_out_chunks)
 
     stt = DeepgramSTTService(api_key=os.getenv('DEEPGRAM_API_KEY'))
     tts = CartesiaTTSService(
@@ -125,17 +155,15 @@ async def run_bot(webrtc_connection):
         voice_id="6ccbfb76-1fc6-48f7-b71d-91ac6298247b",
     )
 
-    llm = AWSBedrockLLMService(
-        aws_region="us-east-1",
-        model="us.anthropic.claude-haiku-4-5-20251001-v1:0",
-        aws_access_key=session.get_credentials().access_key,
-        aws_secret_key=session.get_credentials().secret_key,
+    # base_prompt and the tool schema are the same on every turn; let Bedrock cache them.
+    llm = SharedCredentialsBedrockLLMService(
+        settings=AWSBedrockLLMService.Settings(model=DEFAULT_MODEL_ID, enable_prompt_caching=True)
     )
     
     # Initialize LLM service
     # llm = AWSNovaSonicLLMService(
-    #     access_key_id=session.get_credentials().access_key,
-    #     secret_access_key=session.get_credentials().secret_key,
+    #     access_key_id=credentials.access_key,
+    #     secret_access_key=credentials.secret_key,
     #     region='us-east-1',
     #     voice_id="tiffany",  # matthew, tiffany, amy
     # )
@@ -191,7 +219,9 @@ async def run_bot(webrtc_connection):
             stt,
             context_aggregator.user(),
             llm,
+            PromptCacheMetricsProcessor(),
             tts,
+            jitter_buffer,
             pipecat_transport.output(),
             context_aggregator.assistant(),
         ]
@@ -217,6 +247,7 @@ async def run_bot(webrtc_connection):
     async def on_client_disconnected(transport, client):
         logger.info("Pipecat Client disconnected")
         await task.cancel()
+        await asyncio.to_thread(release_workspace, session_id)
 
     runner = PipelineRunner(handle_sigint=False)
     await runner.run(task)
@@ -0,0 +1,103 @@
+"""
+Prompt-prefix caching for Bedrock Converse requests.
+
+`base_prompt`, `strands_system_prompt` and the tool specs are identical on every request,
+so they are marked with Bedrock `cachePoint` blocks and only the conversation after them
+is processed again: the Strands models set `cache_prompt`/`cache_tools` (see
+`integration.bedrock`) and the voice LLM enables pipecat's `enable_prompt_caching`.
+Per-request cache hits, misses and reused tokens are tracked in `prompt_cache_stats`, from
+pipecat's usage metrics for the voice LLM and from `PromptCacheHooks` for Strands agents.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Mapping, Optional
+
+from loguru import logger
+from strands.hooks import AfterInvocationEvent, BeforeModelCallEvent, HookProvider, HookRegistry
+
+class PromptCacheStats:
+    """Thread-safe per-request record of prompt cache usage, kept per source ("voice", "strands")."""
+
+    def __init__(self, history: int = 100) -> None:
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, int]] = {}
+        self._recent: deque = deque(maxlen=history)
+
+    def record(self, source: str, input_tokens: int, cache_read_tokens: int, cache_write_tokens: int) -> None:
+        """Record the usage of one request. A request that read anything from the cache is a hit."""
+        hit = cache_read_tokens > 0
+        with self._lock:
+            totals = self._totals.setdefault(
+                source, {"requests": 0, "hits": 0, "misses": 0, "tokens_saved": 0, "cache_write_tokens": 0}
+            )
+            totals["requests"] += 1
+            totals["hits" if hit else "misses"] += 1
+            totals["tokens_saved"] += cache_read_tokens
+            totals["cache_write_tokens"] += cache_write_tokens
+            self._recent.append(
+                {
+                    "source": source,
+                    "timestamp": time.time(),
+                    "hit": hit,
+                    "input_tokens": input_tokens,
+                    "cache_read_tokens": cache_read_tokens,
+                    "cache_write_tokens": cache_write_tokens,
+                }
+            )
+        logger.debug(
+            f"Prompt cache {'hit' if hit else 'miss'} ({source}): "
+            f"read={cache_read_tokens} write={cache_write_tokens} input={input_tokens}"
+        )
+
+    def record_usage_delta(self, source: str, before: Mapping[str, int], after: Mapping[str, int]) -> None:
+        """Record one request from two snapshots of Bedrock-style accumulated usage counters."""
+
+        def delta(key: str) -> int:
+            return after.get(key, 0) - before.get(key, 0)
+
+        self.record(source, delta("inputTokens"), delta("cacheReadInputTokens"), delta("cacheWriteInputTokens"))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Totals per source plus the most recent requests."""
+        with self._lock:
+            return {
+                "totals": {source: dict(totals) for source, totals in self._totals.items()},
+                "recent": list(self._recent),
+            }
+
+
+prompt_cache_stats = PromptCacheStats()
+
+
+class PromptCacheHooks(HookProvider):
+    """
+    Records the cache usage of every model request a Strands agent makes in `prompt_cache_stats`.
+
+    Strands only exposes usage accumulated over the agent's lifetime, so the counters are
+    snapshotted before each model request and the difference is recorded when the next request
+    starts or the invocation ends. Attempts that used no tokens (e.g. throttled and retried)
+    are not recorded.
+    """
+
+    def __init__(self, source: str = "strands") -> None:
+        self.source = source
+        self._before: Optional[Dict[str, int]] = None
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeModelCallEvent, self.before_model_call)
+        registry.add_callback(AfterInvocationEvent, self.after_invocation)
+
+    def _record_pending(self, usage: Mapping[str, int]) -> None:
+        if self._before is not None and usage.get("inputTokens", 0) > self._before.get("inputTokens", 0):
+            prompt_cache_stats.record_usage_delta(self.source, self._before, usage)
+        self._before = None
+
+    def before_model_call(self, event: BeforeModelCallEvent) -> None:
+        usage = event.agent.event_loop_metrics.accumulated_usage
+        self._record_pending(usage)
+        self._before = dict(usage)
+
+    def after_invocation(self, event: AfterInvocationEvent) -> None:
+        self._record_pending(event.agent.event_loop_metrics.accumulated_usage)
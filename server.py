@@ -1,9 +1,20 @@
 import argparse
+import asyncio
 import sys
 from contextlib import asynccontextmanager
 
 import uvicorn
 from main import run_bot
+from integration import atlassian
+from integration.confluence_sync import CONFLUENCE_SYNC_INTERVAL_SECS, CONFLUENCE_SYNC_SPACES, sync_spaces
+from integration.jira import warm_jira_metadata
+from integration.jira_outbox import start_outbox_worker, stop_outbox_worker
+from integration.prewarm import PREWARM_INTERVAL_SECS, prewarm_defaults
+from integration.model_router import model_router_stats
+from integration.resilience import breaker_stats
+from integration.workspace import WORKSPACE_GC_INTERVAL_SECS, collect_garbage, workspace_stats
+from prompts.caching import prompt_cache_stats
+from voice.jitter_buffer import buffer_stats
 from dotenv import load_dotenv
 from fastapi import BackgroundTasks, FastAPI, Request
 from fastapi.responses import FileResponse
@@ -21,10 +32,60 @@ load_dotenv(override=True)
 # Initialize the SmallWebRTC request handler
 small_webrtc_handler: SmallWebRTCRequestHandler = SmallWebRTCRequestHandler()
 
+async def warm_caches():
+    try:
+        await asyncio.to_thread(warm_jira_metadata)
+    except Exception as e:
+        logger.warning(f"Could not warm Jira metadata cache: {e}")
+
+    # Keep the default repo and Confluence page fresh so a session's first analysis is cheap.
+    while True:
+        results = await asyncio.to_thread(prewarm_defaults)
+        for name, result in results.items():
+            if "error" in result:
+                logger.warning(f"Could not pre-warm {name}: {result['error']}")
+            else:
+                logger.info(f"Pre-warmed {name}: {result}")
+        if PREWARM_INTERVAL_SECS <= 0:
+            break
+        await asyncio.sleep(PREWARM_INTERVAL_SECS)
+
+async def collect_workspaces():
+    while True:
+        try:
+            removed = await asyncio.to_thread(collect_garbage)
+            if removed:
+                logger.info(f"Removed {len(removed)} abandoned session workspaces")
+        except Exception as e:
+            logger.warning(f"Workspace garbage collection failed: {e}")
+        await asyncio.sleep(WORKSPACE_GC_INTERVAL_SECS)
+
+async def mirror_confluence():
+    while CONFLUENCE_SYNC_SPACES:
+        results = await asyncio.to_thread(sync_spaces)
+        for space_key, result in results.items():
+            if "error" in result:
+                logger.warning(f"Could not sync Confluence space {space_key}: {result['error']}")
+            else:
+                for page_id, error in result["failed"].items():
+                    logger.warning(f"Could not sync Confluence page {page_id} of {space_key}: {error}")
+                logger.info(f"Synced Confluence space {space_key}: {result}")
+        await asyncio.sleep(CONFLUENCE_SYNC_INTERVAL_SECS)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    warm_task = asyncio.create_task(warm_caches())
+    gc_task = asyncio.create_task(collect_workspaces())
+    mirror_task = asyncio.create_task(mirror_confluence())
+    # Deliver stories queued before the last shutdown.
+    start_outbox_worker()
     yield
+    warm_task.cancel()
+    gc_task.cancel()
+    mirror_task.cancel()
+    await asyncio.to_thread(stop_outbox_worker)
     await small_webrtc_handler.close()
+    await atlassian.aclose()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -57,6 +118,31 @@ async def ice_candidate(request: SmallWebRTCPatchRequest):
     await small_webrtc_handler.handle_patch_request(request)
     return {"status": "success"}
 
+@app.get("/api/audio-stats")
+async def audio_stats():
+    """Playout buffer counters (adaptive and transport chunk size, jitter, underruns, overruns) per active session."""
+    return buffer_stats()
+
+@app.get("/api/cache-stats")
+async def cache_stats():
+    """Prompt cache hits, misses and reused tokens for the voice LLM and the Strands agent."""
+    return prompt_cache_stats.snapshot()
+
+@app.get("/api/routing-stats")
+async def routing_stats():
+    """Strands analysis routing decisions and latency per query class."""
+    return model_router_stats.snapshot()
+
+@app.get("/api/resilience-stats")
+async def resilience_stats():
+    """Circuit breaker state and rejected calls per integration endpoint."""
+    return breaker_stats()
+
+@app.get("/api/workspaces")
+async def workspaces():
+    """Disk usage and state of every session workspace."""
+    return workspace_stats()
+
 @app.get("/")
 async def serve_index():
     return FileResponse("index.html")
@@ -0,0 +1,55 @@
+import json
+import os
+import sys
+from typing import Any, AsyncIterable, Dict, List, Optional
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# integration.jira reads its configuration at import time.
+for name, value in {
+    "ATLASSIAN_EMAIL": "bot@example.com",
+    "ATLASSIAN_API_TOKEN": "token",
+    "JIRA_BASE_URL": "https://example.atlassian.net",
+    "JIRA_BOARD_ID": "7",
+    "JIRA_PROJECT_KEY": "NEMO",
+}.items():
+    os.environ.setdefault(name, value)
+
+from strands.models import Model  # noqa: E402
+
+
+class ScriptedModel(Model):
+    """Strands model that calls one tool with the given input, then answers "done"."""
+
+    def __init__(self, tool_name: str, tool_input: Optional[Dict[str, Any]] = None) -> None:
+        self.tool_name = tool_name
+        self.tool_input = tool_input or {}
+
+    def update_config(self, **model_config: Any) -> None:
+        pass
+
+    def get_config(self) -> Any:
+        return {}
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs) -> AsyncIterable[Dict]:
+        called = any("toolResult" in block for block in messages[-1]["content"])
+        yield {"messageStart": {"role": "assistant"}}
+        if called:
+            yield {"contentBlockDelta": {"delta": {"text": "done"}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+            return
+        yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": "t1", "name": self.tool_name}}}}
+        yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(self.tool_input)}}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "tool_use"}}
+
+
+@pytest.fixture
+def scripted_model():
+    return ScriptedModel
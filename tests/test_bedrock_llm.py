@@ -0,0 +1,19 @@
+from botocore.credentials import ReadOnlyCredentials
+
+from voice import bedrock_llm
+from voice.bedrock_llm import SharedCredentialsBedrockLLMService
+
+
+def test_clients_use_the_current_shared_credentials(monkeypatch):
+    credentials = [ReadOnlyCredentials("AKIA1", "secret1", "token1")]
+    monkeypatch.setattr(bedrock_llm, "get_aws_credentials", lambda: credentials[-1])
+
+    llm = SharedCredentialsBedrockLLMService(model="us.anthropic.claude-haiku-4-5-20251001-v1:0")
+    assert llm._aws_params["aws_session_token"] == "token1"
+
+    # The shared session refreshed its temporary credentials mid-session
+    credentials.append(ReadOnlyCredentials("AKIA2", "secret2", "token2"))
+    params = llm._aws_params
+    assert (params["aws_access_key_id"], params["aws_session_token"]) == ("AKIA2", "token2")
+    assert params["region_name"] == bedrock_llm.AWS_REGION
+    assert params["config"] is bedrock_llm.get_client_config()
@@ -0,0 +1,63 @@
+import httpx
+import pytest
+
+from integration import confluence, confluence_sections
+from integration.confluence_cache import ConfluencePageCache
+from integration.confluence_sections import split_html_sections
+
+URL = "https://example.atlassian.net/wiki/spaces/DOC/pages/42/Design"
+
+
+@pytest.fixture
+def page(tmp_path, monkeypatch):
+    served = {}
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"version": {"number": 3}, "body": {"storage": {"value": served["html"]}}})
+
+    client = httpx.Client(base_url="https://example.atlassian.net", transport=httpx.MockTransport(handle))
+    monkeypatch.setattr(confluence, "get_client", lambda: client)
+    monkeypatch.setattr(confluence, "mirrored_page_path", lambda page_id, fetch_version: None)
+    monkeypatch.setattr(confluence, "page_cache", ConfluencePageCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(confluence_sections, "CONFLUENCE_SECTIONS_DIR", str(tmp_path / "sections"))
+    monkeypatch.setattr(confluence, "CONFLUENCE_FULL_PAGE_TOKEN_LIMIT", 100)
+    conversions = []
+    convert = confluence.convert_to_markdown
+    monkeypatch.setattr(confluence, "convert_to_markdown", lambda html: conversions.append(html) or convert(html))
+
+    def serve(html):
+        served["html"] = html
+        return conversions
+
+    return serve
+
+
+def test_large_pages_are_never_converted_whole(page):
+    conversions = page("".join(f"<h2>Part {i}</h2><p>{'word ' * 40}</p>" for i in range(5)))
+
+    result = confluence.get_confluence_page(URL)
+
+    assert result.startswith("Page outline: 5 sections")
+    assert conversions == []
+
+
+def test_markup_heavy_pages_that_fit_are_joined_from_sections(page):
+    conversions = page("".join(f'<h2 class="{"x" * 60}">Part {i}</h2><p>text</p>' for i in range(5)))
+
+    result = confluence.get_confluence_page(URL)
+
+    assert result.startswith("## Part 0") and "## Part 4" in result
+    assert conversions == []
+
+
+def test_small_pages_are_converted_in_one_go(page):
+    conversions = page("<h2>Only</h2><p>short</p>")
+
+    assert confluence.get_confluence_page(URL).startswith("## Only")
+    assert len(conversions) == 1
+
+
+def test_unclosed_headings_are_not_split_on():
+    html = "<p>intro</p><h2>Title</h2><p>body</p><h3 broken<p>" + "x" * 10000 + "</h3>"
+
+    assert [(level, title) for level, title, _ in split_html_sections(html)] == [(0, "Introduction"), (2, "Title")]
@@ -0,0 +1,94 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from integration import confluence_sync
+
+
+class FakeConfluence:
+    """Confluence REST stand-in serving a space from a dict of page id -> (version, html)."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.failing = set()
+        self.requests = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.url.path.endswith("/content/search"):
+            expand = request.url.params.get("expand")
+            results = [
+                {"id": page_id, "title": f"Page {page_id}", "version": {"number": version}, "ancestors": []}
+                if expand
+                else {"id": page_id, "title": f"Page {page_id}"}
+                for page_id, (version, _) in self.pages.items()
+            ]
+            return httpx.Response(200, json={"results": results, "_links": {}})
+        page_id = request.url.path.rsplit("/", 1)[-1]
+        if page_id in self.failing:
+            return httpx.Response(500, json={"message": "boom"})
+        version, html = self.pages[page_id]
+        return httpx.Response(200, json={"version": {"number": version}, "body": {"storage": {"value": html}}})
+
+
+@pytest.fixture
+def confluence(tmp_path, monkeypatch):
+    fake = FakeConfluence({"1": (1, "<p>one</p>"), "2": (1, "<p>two</p>"), "3": (1, "<p>three</p>")})
+    client = httpx.Client(base_url="https://example.atlassian.net", transport=httpx.MockTransport(fake.handle))
+    monkeypatch.setattr(confluence_sync, "get_client", lambda: client)
+    monkeypatch.setattr(confluence_sync, "CONFLUENCE_MIRROR_DIR", str(tmp_path))
+    monkeypatch.setattr(confluence_sync, "CONFLUENCE_SYNC_RPS", 0)
+    return fake
+
+
+def test_failing_page_is_reported_without_aborting_the_sync(confluence):
+    confluence.failing.add("2")
+
+    result = confluence_sync.sync_space("DOC")
+
+    assert result["updated"] == 2
+    assert list(result["failed"]) == ["2"]
+    manifest = confluence_sync.load_manifest("DOC")
+    assert sorted(manifest["pages"]) == ["1", "3"]
+    # The window is listed again next time, so the failed page is retried
+    assert manifest["last_sync"] is None
+
+    confluence.failing.clear()
+    assert confluence_sync.sync_space("DOC")["updated"] == 1
+    assert sorted(confluence_sync.load_manifest("DOC")["pages"]) == ["1", "2", "3"]
+
+
+def test_incremental_sync_drops_deleted_pages(confluence):
+    confluence_sync.sync_space("DOC")
+    del confluence.pages["3"]
+
+    result = confluence_sync.sync_space("DOC")
+
+    assert result["removed"] == 1
+    assert sorted(confluence_sync.load_manifest("DOC")["pages"]) == ["1", "2"]
+    assert not (confluence_sync.space_dir("DOC") / "pages" / "3.md").exists()
+
+
+def test_stale_mirror_is_revalidated(confluence, monkeypatch):
+    confluence_sync.sync_space("DOC")
+    lookups = []
+
+    def current_version(page_id):
+        lookups.append(page_id)
+        return confluence.pages[page_id][0]
+
+    # Recently synced: served without a lookup
+    assert confluence_sync.mirrored_page_path("1", current_version)[1] == 1
+    assert lookups == []
+
+    manifest_path = confluence_sync.space_dir("DOC") / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["last_sync"] = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    manifest_path.write_text(json.dumps(manifest))
+    confluence.pages["1"] = (2, "<p>one, edited</p>")
+
+    assert confluence_sync.mirrored_page_path("1", current_version) is None
+    assert confluence_sync.mirrored_page_path("2", current_version)[1] == 1
+    assert lookups == ["1", "2"]
@@ -0,0 +1,110 @@
+import glob
+import os
+import random
+
+import pytest
+
+from custom_tools.utils import file_index
+from custom_tools.utils.file_index import find_indexed, find_unindexed, get_file_index
+from custom_tools.utils.ignore_rules import filter_paths
+
+NAMES = ["a", "b", "ab", ".h", "x.py", "y.txt", "[l].py", "m-n.py", "K.PY"]
+SEGMENTS = ["*", "**", "?", "*.py", "[ab]*", "[!a]*", ".*", "a", "x.py", "[[]l].py", "*-*", "[]a]*", "*.[Pp][Yy]"]
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    workspace = tmp_path / "sessions"
+    root = workspace / "pc-1" / "repos" / "project"
+    root.mkdir(parents=True)
+    (root / ".nemo-snapshot").write_text("")
+    monkeypatch.setattr(file_index, "WORKSPACE_ROOT", str(workspace))
+    monkeypatch.setattr(file_index, "FILE_INDEX_DIR", str(tmp_path / "file_index"))
+    return root
+
+
+def make_tree(rng, directory, depth):
+    for name in rng.sample(NAMES, rng.randint(1, len(NAMES))):
+        path = directory / name
+        if depth and rng.random() < 0.4:
+            path.mkdir()
+            make_tree(rng, path, depth - 1)
+        else:
+            path.write_text(name)
+
+
+def test_glob_patterns_match_glob_glob(repo):
+    rng = random.Random(45)
+    make_tree(rng, repo, 3)
+
+    for _ in range(400):
+        segments = rng.choices(SEGMENTS, k=rng.randint(1, 3))
+        if "**/**" in "/".join(segments):
+            continue  # glob.glob returns such directories both with and without a trailing "/"
+        pattern = os.path.join(str(repo), *segments) + ("/" if rng.random() < 0.1 else "")
+        if not glob.has_magic(pattern):
+            continue  # find_files resolves existing paths directly
+        recursive = rng.random() < 0.8
+        # glob.glob repeats paths reachable through several "**" expansions; find_files dedupes them.
+        expected = sorted(set(filter_paths(glob.glob(pattern, recursive=recursive), file_index._static_prefix(pattern))))
+
+        indexed = find_indexed(pattern, recursive)
+        assert (find_unindexed(pattern, recursive) if indexed is None else indexed) == expected, pattern
+        assert find_unindexed(pattern, recursive) == expected, pattern
+
+
+def test_in_place_edits_refresh_metadata(repo):
+    (repo / "a.py").write_text("one")
+    index = get_file_index(file_index.find_repo_root(str(repo)))
+    assert index.metadata("a.py")["size"] == 3
+
+    # Appending doesn't change the directory's mtime
+    with open(repo / "a.py", "a") as f:
+        f.write(" two")
+    os.utime(repo / "a.py", ns=(0, 10**18))
+
+    assert index.metadata("a.py")["size"] == 7
+    assert index.metadata("a.py")["mtime"] == 10**9
+
+
+def test_directory_listing_can_include_hidden_files(repo):
+    (repo / "src").mkdir()
+    (repo / "src" / ".env").write_text("")
+    (repo / "src" / "app.py").write_text("")
+
+    assert find_indexed(str(repo / "src")) == [str(repo / "src" / "app.py")]
+    assert find_indexed(str(repo / "src"), include_hidden=True) == [
+        str(repo / "src" / ".env"),
+        str(repo / "src" / "app.py"),
+    ]
+
+
+def test_worktree_of_same_commit_starts_from_sibling_trigrams(tmp_path, monkeypatch):
+    from custom_tools.utils import trigram_index
+
+    workspace = tmp_path / "sessions"
+    prewarmed = workspace / "prewarm" / "repos" / "project"
+    prewarmed.mkdir(parents=True)
+    monkeypatch.setattr(file_index, "WORKSPACE_ROOT", str(workspace))
+    monkeypatch.setattr(file_index, "FILE_INDEX_DIR", str(tmp_path / "file_index"))
+
+    def git(*args, cwd=prewarmed):
+        trigram_index.git_local(["-c", "user.name=t", "-c", "user.email=t@t", *args], str(cwd))
+
+    git("init", "-q")
+    (prewarmed / "a.py").write_text("needle = 1\n")
+    (prewarmed / "b.py").write_text("haystack = 2\n")
+    git("add", "-A")
+    git("commit", "-q", "-m", "init")
+    session = workspace / "pc-1" / "repos" / "project"
+    git("worktree", "add", "-q", "--detach", str(session))
+
+    trigram_index.warm_trigram_index(str(prewarmed))
+    reads = []
+    original = trigram_index._file_trigrams
+    monkeypatch.setattr(trigram_index, "_file_trigrams", lambda path: reads.append(path) or original(path))
+    trigram_index.warm_trigram_index(str(session))
+
+    assert reads == []
+    paths = [str(session / "a.py"), str(session / "b.py")]
+    assert trigram_index.narrow_search(paths, "needle") == [str(session / "a.py")]
@@ -0,0 +1,122 @@
+import io
+import random
+import re
+
+import pytest
+from rich.console import Console
+
+from custom_tools import file_read
+from custom_tools.file_read import compile_search_pattern, find_matches
+
+
+def reference_matches(path, matcher, context_lines):
+    """Matches as found by reading the whole file in text mode, line by line."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    results = []
+    for i, line in enumerate(lines):
+        if not matcher.search(line):
+            continue
+        context = []
+        for j in range(max(0, i - context_lines), min(len(lines), i + context_lines + 1)):
+            line_text = lines[j].rstrip()
+            if j == i:
+                match = matcher.search(line_text)
+                if match and match.end() > match.start():
+                    line_text = (
+                        line_text[: match.start()] + f"[bold yellow]{match.group()}[/bold yellow]" + line_text[match.end() :]
+                    )
+            context.append(f"{'→ ' if j == i else '  '}{j + 1}: {line_text}")
+        results.append({"line_number": i + 1, "context": "\n".join(context)})
+    return results
+
+
+@pytest.mark.parametrize(
+    "content, pattern, expected",
+    [
+        (b"foo\r\nbar\r\nfoo\r\n", "foo$", [1, 3]),
+        (b"foo\rbar\r", "bar", [2]),
+        (b"foo\nbar\nfoo\n", r"foo(?!\nbar)", [1, 3]),
+    ],
+)
+def test_newlines_and_lookaheads(tmp_path, content, pattern, expected):
+    path = tmp_path / "sample.txt"
+    path.write_bytes(content)
+
+    matches = find_matches(str(path), compile_search_pattern(pattern, regex=True), context_lines=0)
+
+    assert [match["line_number"] for match in matches] == expected
+
+
+PATTERNS = [
+    ("foo", False, False),
+    ("foo", False, True),
+    ("bar baz", False, False),
+    ("foo$", True, False),
+    ("^bar", True, False),
+    (r"foo(?!\nbar)", True, False),
+    (r"(?<=a)b", True, False),
+    (r"\bqu+x\b", True, False),
+    (r"ba[rz]\s*$", True, False),
+    (r"(?>\s*)$", True, False),
+]
+WORDS = ["foo", "bar", "baz", "qux", "quux", "a", "b", "é", " ", "\t"]
+NEWLINES = ["\n", "\r\n", "\r"]
+
+
+def test_streaming_search_matches_whole_file_search(tmp_path, monkeypatch):
+    rng = random.Random(49)
+    path = tmp_path / "random.txt"
+    for _ in range(300):
+        lines = ["".join(rng.choices(WORDS, k=rng.randint(0, 6))) for _ in range(rng.randint(0, 40))]
+        newlines = NEWLINES if rng.random() < 0.5 else ["\n"]
+        text = "".join(line + rng.choice(newlines) for line in lines)
+        if text and rng.random() < 0.3:
+            text = text.rstrip("\r\n")
+        path.write_bytes(text.encode("utf-8"))
+        pattern, regex, whole_word = rng.choice(PATTERNS)
+        matcher = compile_search_pattern(pattern, regex, whole_word)
+        context_lines = rng.randint(0, 3)
+        monkeypatch.setattr(file_read, "SEARCH_BLOCK_BYTES", rng.choice([1, 2, 3, 7, 16, 64, 4096]))
+
+        assert find_matches(str(path), matcher, context_lines) == reference_matches(path, matcher, context_lines), (
+            text,
+            pattern,
+        )
+
+
+def test_block_skip_is_disabled_for_lookarounds():
+    assert file_read._block_matcher(compile_search_pattern("foo", whole_word=True)) is not None
+    for pattern in (r"foo(?!\nbar)", r"foo(?=\n)", r"(?<=a)b", r"\Afoo", r"(?>\s*)$", r"a*+"):
+        assert file_read._block_matcher(re.compile(pattern)) is None
+
+
+def search(tmp_path, contents, **limits):
+    paths = []
+    for i, text in enumerate(contents):
+        path = tmp_path / f"f{i}.txt"
+        path.write_text(text)
+        paths.append(str(path))
+    matcher = compile_search_pattern("hit", False, False)
+    texts = [entry["text"] for entry in file_read.search_files(Console(file=io.StringIO()), paths, matcher, 0, **limits)]
+    notes = [text for text in texts if "stopped at" in text]
+    return [text for text in texts if text not in notes], bool(notes)
+
+
+def test_limit_note_only_when_matches_were_left_out(tmp_path):
+    # The limit is reached exactly, and the files after it don't match.
+    texts, noted = search(tmp_path, ["hit\n", "hit\n", "miss\n", "miss\n"], max_matches=2)
+    assert len(texts) == 2 and not noted
+
+    texts, noted = search(tmp_path, ["hit\n", "miss\n", "hit\n"], max_files=1)
+    assert len(texts) == 1 and noted
+
+    texts, noted = search(tmp_path, ["hit\nhit\nhit\n"], max_matches=2)
+    assert len(texts) == 2 and noted
+
+
+def test_missing_limits_fall_back_to_the_defaults(tmp_path, monkeypatch):
+    monkeypatch.setenv("FILE_READ_MAX_MATCHES_DEFAULT", "1")
+
+    texts, noted = search(tmp_path, ["hit\nhit\n"], max_matches=None, max_files=None)
+    assert len(texts) == 1 and noted
@@ -0,0 +1,72 @@
+import json
+
+import httpx
+import pytest
+
+from integration import jira
+
+
+class FakeJira:
+    """Jira stand-in answering bulk creates with the queued responses, in order."""
+
+    def __init__(self, bulk_responses):
+        self.bulk_responses = list(bulk_responses)
+        self.sprint_adds = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/issuetypes"):
+            return httpx.Response(200, json={"issueTypes": [{"id": "10001", "name": "Story"}]})
+        if path.endswith("/sprint"):
+            return httpx.Response(200, json={"values": [{"id": 3}]})
+        if path.endswith("/sprint/3/issue"):
+            self.sprint_adds.append(json.loads(request.content)["issues"])
+            return httpx.Response(204)
+        status, body = self.bulk_responses.pop(0)
+        return httpx.Response(status, json=body)
+
+
+@pytest.fixture
+def fake_jira(monkeypatch):
+    def install(*bulk_responses):
+        fake = FakeJira(bulk_responses)
+        client = httpx.Client(base_url="https://example.atlassian.net", transport=httpx.MockTransport(fake.handle))
+        monkeypatch.setattr(jira, "get_client", lambda: client)
+        monkeypatch.setattr(jira, "JIRA_BULK_LIMIT", 2)
+        jira.invalidate_jira_cache()
+        return fake
+
+    return install
+
+
+def stories(count):
+    return [{"summary": f"Story {i}", "description": ""} for i in range(count)]
+
+
+def test_each_batch_fails_on_its_own(fake_jira):
+    fake = fake_jira(
+        (201, {"issues": [{"key": "NEMO-1"}], "errors": [
+            {"failedElementNumber": 1, "elementErrors": {"errors": {"summary": "too long"}}},
+        ]}),
+        (400, {"errorMessages": ["Project is archived"], "errors": {}}),
+        (500, {"errorMessages": ["boom"]}),
+    )
+
+    results = jira.create_jira_stories(stories(6))
+
+    assert [r["status"] for r in results] == ["created", "failed", "failed", "failed", "failed", "failed"]
+    assert results[0]["issue_key"] == "NEMO-1"
+    assert results[1]["error"] == "too long"
+    assert results[2]["error"] == results[3]["error"] == "Project is archived"
+    assert "500" in results[4]["error"]
+    assert fake.sprint_adds == [["NEMO-1"]]
+
+
+def test_missing_issues_are_reported_as_failures(fake_jira):
+    fake_jira((201, {"issues": [{"key": "NEMO-1"}]}))
+
+    results = jira.create_jira_stories(stories(2))
+
+    assert results[0]["issue_key"] == "NEMO-1"
+    assert results[1]["status"] == "failed"
+    assert results[1]["error"] == "Jira returned no issue (HTTP 201)"
@@ -0,0 +1,55 @@
+import time
+
+import httpx
+import pytest
+
+from integration import jira, jira_outbox
+
+
+@pytest.fixture
+def outbox(tmp_path, monkeypatch):
+    monkeypatch.setattr(jira_outbox, "JIRA_OUTBOX_PATH", str(tmp_path / "outbox.sqlite3"))
+    monkeypatch.setattr(jira_outbox, "start_outbox_worker", lambda: None)
+    monkeypatch.setattr(jira_outbox, "_not_before", 0.0)
+    jira.invalidate_jira_cache()
+
+    def install(sprint_response):
+        def handle(request: httpx.Request) -> httpx.Response:
+            path = request.url.path
+            if path.endswith("/issuetypes"):
+                return httpx.Response(200, json={"issueTypes": [{"id": "10001", "name": "Story"}]})
+            if path.endswith("/sprint"):
+                return httpx.Response(200, json={"values": [{"id": 3}]})
+            if path.endswith("/sprint/3/issue"):
+                return sprint_response
+            return httpx.Response(201, json={"key": "NEMO-9"})
+
+        client = httpx.Client(base_url="https://example.atlassian.net", transport=httpx.MockTransport(handle))
+        monkeypatch.setattr(jira, "get_client", lambda: client)
+        monkeypatch.setattr(jira_outbox, "get_client", lambda: client)
+
+    return install
+
+
+def test_sprint_add_honours_retry_after(outbox):
+    outbox(httpx.Response(429, headers={"Retry-After": "120"}))
+    handle = jira_outbox.enqueue_story("Story", "")
+
+    jira_outbox.deliver_due()
+
+    status = jira_outbox.story_status(handle)
+    assert status["status"] == "pending"
+    assert status["issue_key"] == "NEMO-9"
+    assert jira_outbox._not_before > time.time() + 100
+
+
+def test_sprint_add_rejections_are_permanent(outbox):
+    outbox(httpx.Response(400, json={"errorMessages": ["Sprint is closed"]}))
+    handle = jira_outbox.enqueue_story("Story", "")
+
+    jira_outbox.deliver_due()
+
+    status = jira_outbox.story_status(handle)
+    assert status["status"] == "failed"
+    assert status["issue_key"] == "NEMO-9"
+    assert "Sprint is closed" in status["last_error"]
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from pipecat.frames.frames import InterruptionFrame, TTSAudioRawFrame, TTSStoppedFrame
+from pipecat.tests.utils import SleepFrame, run_test
+
+from voice import jitter_buffer
+from voice.jitter_buffer import AdaptiveJitterBuffer, choose_audio_out_chunks
+
+RATE = 16000
+BYTES_10MS = RATE // 100 * 2
+
+
+def audio(ms, context_id="ctx-1", pts=None):
+    frame = TTSAudioRawFrame(audio=b"\x01\x00" * (RATE // 1000 * ms), sample_rate=RATE, num_channels=1, context_id=context_id)
+    frame.pts = pts
+    frame.metadata = {"utterance": context_id}
+    return frame
+
+
+def run(buffer, frames):
+    down, _ = asyncio.run(run_test(buffer, frames_to_send=frames, expected_down_frames=None))
+    return down
+
+
+@pytest.mark.parametrize(
+    "jitter_ms, lag_ms, expected",
+    [(0, 0, 1), (4, 3, 2), (10, 0, 2), (100, 50, 8)],
+)
+def test_choose_audio_out_chunks(jitter_ms, lag_ms, expected):
+    assert choose_audio_out_chunks(jitter_ms, lag_ms) == expected
+
+
+def test_chunks_keep_the_fields_of_their_source_frames():
+    buffer = AdaptiveJitterBuffer(session_id="jb-fields", initial_chunks=2)
+
+    down = run(buffer, [audio(30, pts=1_000_000_000), audio(25, pts=2_000_000_000), TTSStoppedFrame()])
+
+    chunks = [frame for frame in down if isinstance(frame, TTSAudioRawFrame)]
+    assert [len(chunk.audio) for chunk in chunks] == [2 * BYTES_10MS, 2 * BYTES_10MS, BYTES_10MS + BYTES_10MS // 2]
+    assert {chunk.context_id for chunk in chunks} == {"ctx-1"}
+    assert [chunk.pts for chunk in chunks] == [1_000_000_000, 1_020_000_000, 2_010_000_000]
+    assert chunks[0].metadata == {"utterance": "ctx-1"}
+    # Flushed on TTSStoppedFrame, before it is passed on.
+    assert isinstance(down[-1], TTSStoppedFrame)
+    assert sum(len(chunk.audio) for chunk in chunks) == 55 * RATE // 1000 * 2
+
+
+def test_contexts_are_never_mixed_in_one_chunk():
+    buffer = AdaptiveJitterBuffer(session_id="jb-contexts", initial_chunks=4)
+
+    down = run(buffer, [audio(30, "a"), audio(30, "b"), TTSStoppedFrame()])
+
+    chunks = [frame for frame in down if isinstance(frame, TTSAudioRawFrame)]
+    assert [(chunk.context_id, len(chunk.audio)) for chunk in chunks] == [("a", 3 * BYTES_10MS), ("b", 3 * BYTES_10MS)]
+
+
+def test_interruption_drops_buffered_audio():
+    buffer = AdaptiveJitterBuffer(session_id="jb-interrupt", initial_chunks=8)
+
+    # Interruptions are system frames and overtake queued frames; the sleeps keep the order.
+    down = run(buffer, [audio(30), SleepFrame(0.05), InterruptionFrame(), SleepFrame(0.05), TTSStoppedFrame()])
+
+    assert not [frame for frame in down if isinstance(frame, TTSAudioRawFrame)]
+    assert [type(frame) for frame in down] == [InterruptionFrame, TTSStoppedFrame]
+
+
+def test_underruns_and_overruns_are_counted_once_per_episode(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(jitter_buffer.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(jitter_buffer, "AUDIO_OUT_MAX_BUFFER_MS", 50)
+    buffer = AdaptiveJitterBuffer(session_id="jb-counters", initial_chunks=1)
+
+    # 120ms of audio at once: more than 50ms ahead of playout on every later frame.
+    frames = [audio(10) for _ in range(12)]
+    # Then nothing for a second: the client ran dry.
+    frames.append(audio(10))
+
+    async def scenario():
+        from pipecat.tests.utils import run_test as run_pipeline
+
+        async def tick_late(*_):
+            clock[0] += 1.0
+
+        return await run_pipeline(buffer, frames_to_send=frames[:12], expected_down_frames=None)
+
+    asyncio.run(scenario())
+    assert buffer.stats()["overruns"] == 1
+    assert buffer.stats()["underruns"] == 0
+
+    clock[0] += 1.0
+    asyncio.run(run_test(buffer, frames_to_send=[audio(10)], expected_down_frames=None))
+    stats = buffer.stats()
+    assert stats["underruns"] == 1
+    assert stats["chunk_ms"] == 20
@@ -0,0 +1,22 @@
+import os
+
+from custom_tools.utils import line_index
+from custom_tools.utils.line_index import get_line_index
+
+
+def test_unindexable_files_are_scanned_once_per_version(tmp_path, monkeypatch):
+    path = tmp_path / "old_mac.txt"
+    path.write_bytes(b"one\rtwo\rthree\r")
+    scans = []
+    scan = line_index._scan
+    monkeypatch.setattr(line_index, "_scan", lambda *args: scans.append(args) or scan(*args))
+
+    assert get_line_index(str(path)) is None
+    assert get_line_index(str(path)) is None
+    assert len(scans) == 1
+
+    path.write_bytes(b"one\ntwo\nthree\n")
+    os.utime(path, ns=(1, 1))
+    index = get_line_index(str(path))
+    assert index.read_lines(1, 3) == ["two\n", "three\n"]
+    assert len(scans) == 2
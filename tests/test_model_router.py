@@ -0,0 +1,42 @@
+import pytest
+
+from integration.model_router import FAST_MODEL_ID, STRONG_MODEL_ID, estimate_tool_depth, route_query
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "Read the README",
+        "Show me the target branch",
+        "Is the build already green?",
+        "Open the workflow file",
+        "List everything in the docs folder",
+        "Fetch the Confluence page about onboarding",
+        "Create a Jira story for the login bug",
+    ],
+)
+def test_lookups_use_the_fast_model(query):
+    decision = route_query(query)
+    assert decision["query_class"] == "lookup"
+    assert decision["model_id"] == FAST_MODEL_ID
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "Analyze the architecture of the payment service",
+        "How does the request flow end to end through the gateway?",
+        "Review the refactoring plan and its impact across the codebase",
+        "Trace every caller of the session cache",
+    ],
+)
+def test_analyses_use_the_strong_model(query):
+    decision = route_query(query)
+    assert decision["query_class"] == "analysis"
+    assert decision["model_id"] == STRONG_MODEL_ID
+
+
+def test_keywords_inside_other_words_add_no_depth():
+    # "target", "already", "workflow" and "everything" contain "get", "read", "flow" and "every".
+    assert estimate_tool_depth("the target is already in the workflow for everything") == 1
+    assert estimate_tool_depth("analyzing the flows") == 5
@@ -0,0 +1,88 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from strands import Agent, tool
+
+from integration import bedrock
+from prompts import caching
+from prompts.caching import PromptCacheHooks, PromptCacheStats
+
+
+class BedrockStandIn(BaseHTTPRequestHandler):
+    """Local Converse endpoint: asks for the `probe` tool once, then answers."""
+
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append(body)
+        if len(self.requests) % 2:
+            content = [{"toolUse": {"toolUseId": "t1", "name": "probe", "input": {}}}]
+            stop_reason, usage = "tool_use", {"inputTokens": 100, "cacheReadInputTokens": 0, "cacheWriteInputTokens": 900}
+        else:
+            content = [{"text": "done"}]
+            stop_reason, usage = "end_turn", {"inputTokens": 120, "cacheReadInputTokens": 900, "cacheWriteInputTokens": 0}
+        usage.update(outputTokens=10, totalTokens=usage["inputTokens"] + 10)
+        payload = json.dumps(
+            {
+                "output": {"message": {"role": "assistant", "content": content}},
+                "stopReason": stop_reason,
+                "usage": usage,
+                "metrics": {"latencyMs": 1},
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def bedrock_stand_in(monkeypatch):
+    server = HTTPServer(("127.0.0.1", 0), BedrockStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    BedrockStandIn.requests = []
+    monkeypatch.setenv("AWS_ENDPOINT_URL_BEDROCK_RUNTIME", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIATEST")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "secret")
+    bedrock.get_boto_session.cache_clear()
+    bedrock.get_bedrock_model.cache_clear()
+    yield BedrockStandIn.requests
+    server.shutdown()
+    bedrock.get_boto_session.cache_clear()
+    bedrock.get_bedrock_model.cache_clear()
+
+
+def test_strands_requests_carry_cache_points_and_are_recorded_per_request(bedrock_stand_in, monkeypatch):
+    stats = PromptCacheStats()
+    monkeypatch.setattr(caching, "prompt_cache_stats", stats)
+
+    @tool
+    def probe() -> str:
+        """Return a fixed answer."""
+        return "ok"
+
+    model = bedrock.get_bedrock_model()
+    model.update_config(streaming=False)
+    agent = Agent(
+        model=model,
+        system_prompt="You explore repositories.",
+        tools=[probe],
+        hooks=[PromptCacheHooks()],
+        callback_handler=None,
+    )
+    agent("look around")
+
+    assert len(bedrock_stand_in) == 2
+    for request in bedrock_stand_in:
+        assert request["system"][-1] == {"cachePoint": {"type": "default"}}
+        assert request["toolConfig"]["tools"][-1] == {"cachePoint": {"type": "default"}}
+
+    totals = stats.snapshot()["totals"]["strands"]
+    assert totals == {"requests": 2, "hits": 1, "misses": 1, "tokens_saved": 900, "cache_write_tokens": 900}
@@ -0,0 +1,82 @@
+import io
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from integration import repo_archive
+
+
+def make_tarball():
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        def add(name, data=None, **fields):
+            info = tarfile.TarInfo(f"octo-demo-abc123/{name}" if name else "octo-demo-abc123")
+            for key, value in fields.items():
+                setattr(info, key, value)
+            if data is not None:
+                info.size = len(data)
+            archive.addfile(info, io.BytesIO(data) if data is not None else None)
+
+        add("", type=tarfile.DIRTYPE, mode=0o755)
+        add("src", type=tarfile.DIRTYPE, mode=0o755)
+        add("src/app.py", b"print('hi')\n", mode=0o644)
+        add("docs", type=tarfile.DIRTYPE, mode=0o755)
+        add("docs/readme.md", b"# demo\n", mode=0o644)
+        add("src/link.py", type=tarfile.SYMTYPE, linkname="app.py")
+        add("src/passwd", type=tarfile.SYMTYPE, linkname="../../../../etc/passwd")
+        add("src/escape", type=tarfile.SYMTYPE, linkname="/etc")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def github(monkeypatch):
+    tarball = make_tarball()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/repos/octo/demo/tarball/main":
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(tarball)))
+            self.end_headers()
+            self.wfile.write(tarball)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(repo_archive, "GITHUB_API_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(repo_archive, "_client", None)
+    yield
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("filters", [True, False])
+def test_links_out_of_the_tree_are_skipped(github, tmp_path, monkeypatch, filters):
+    monkeypatch.setattr(repo_archive, "HAS_EXTRACTION_FILTERS", filters and repo_archive.HAS_EXTRACTION_FILTERS)
+    dest = tmp_path / "demo"
+
+    result = repo_archive.fetch_archive("octo", "demo", "main", str(dest))
+
+    assert result["files"] == 2
+    assert result["skipped"] == 2
+    assert (dest / "src" / "app.py").read_text() == "print('hi')\n"
+    assert (dest / "src" / "link.py").read_text() == "print('hi')\n"
+    assert not (dest / "src" / "passwd").is_symlink()
+    assert not (dest / "src" / "escape").is_symlink()
+    assert (dest / ".nemo-snapshot").exists()
+
+
+def test_prefixes_limit_extraction(github, tmp_path):
+    dest = tmp_path / "demo"
+
+    result = repo_archive.fetch_archive("octo", "demo", "main", str(dest), prefixes=["docs/"])
+
+    assert result["files"] == 1
+    assert (dest / "docs" / "readme.md").exists()
+    assert not (dest / "src").exists()
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from custom_tools.utils import file_index, trigram_index
+from custom_tools.utils.file_index import get_file_index
+from custom_tools.utils.trigram_index import get_trigram_index, narrow_search
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    workspace = tmp_path / "sessions"
+    root = workspace / "pc-1" / "repos" / "project"
+    root.mkdir(parents=True)
+    (root / ".nemo-snapshot").write_text("")
+    (root / "a.py").write_text("needle = 1\n")
+    (root / "b.py").write_text("haystack = 2\n")
+    monkeypatch.setattr(file_index, "WORKSPACE_ROOT", str(workspace))
+    monkeypatch.setattr(file_index, "FILE_INDEX_DIR", str(tmp_path / "file_index"))
+    monkeypatch.setattr(file_index, "FILE_INDEX_REFRESH_SECS", 0)
+    return root
+
+
+def test_files_keep_only_trigram_ids(repo):
+    trigram_index.warm_trigram_index(str(repo))
+    index = get_trigram_index(str(repo))
+
+    ids = index.files["a.py"][2]
+    names = {gram_id: gram for gram, gram_id in index.gram_ids.items()}
+    assert ids.typecode == "i"
+    assert {names[gram_id] for gram_id in ids} == trigram_index.trigrams("needle = 1\n")
+    assert narrow_search([str(repo / "a.py"), str(repo / "b.py")], "NEEDLE") == [str(repo / "a.py")]
+
+
+def test_queries_skip_the_stat_sweep_until_it_is_due(repo, monkeypatch):
+    trigram_index.warm_trigram_index(str(repo))
+    restats = []
+    original = file_index.FileIndex.restat
+    monkeypatch.setattr(file_index.FileIndex, "restat", lambda self, path: restats.append(path) or original(self, path))
+    paths = [str(repo / "a.py"), str(repo / "b.py")]
+
+    # Same size, new mtime: only the sweep can notice this edit in place.
+    (repo / "b.py").write_text("needle = 22\n")
+    os.utime(repo / "b.py", ns=(1, 1))
+    assert narrow_search(paths, "needle") == [str(repo / "a.py")]
+    assert restats == []
+
+    monkeypatch.setattr(trigram_index, "TRIGRAM_STAT_SWEEP_SECS", 0)
+    assert narrow_search(paths, "needle") == paths
+    assert {"a.py", "b.py"} <= set(restats)
+    assert get_file_index(str(repo)).metadata("b.py")["mtime"] == 1e-9
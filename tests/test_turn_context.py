@@ -0,0 +1,52 @@
+from strands import Agent, tool
+
+from integration.resilience import remaining_budget
+from integration.session import get_session_id
+from integration.turn_context import TurnContextHooks, run_turn
+
+
+def test_tools_see_the_turn_budget(scripted_model):
+    seen = []
+
+    @tool
+    def probe() -> str:
+        """Record the budget left for integration calls."""
+        seen.append(remaining_budget())
+        return "ok"
+
+    agent = Agent(model=scripted_model("probe"), tools=[probe], hooks=[TurnContextHooks()], callback_handler=None)
+    run_turn(agent, "check", "pc-1", 30)
+
+    assert len(seen) == 1
+    assert seen[0] is not None and 0 < seen[0] <= 30
+
+
+def test_tools_outside_a_turn_have_no_budget(scripted_model):
+    seen = []
+
+    @tool
+    def probe() -> str:
+        """Record the budget left for integration calls."""
+        seen.append(remaining_budget())
+        return "ok"
+
+    agent = Agent(model=scripted_model("probe"), tools=[probe], hooks=[TurnContextHooks()], callback_handler=None)
+    agent("check")
+
+    assert seen == [None]
+
+
+def test_tools_see_the_turn_session(scripted_model):
+    seen = []
+
+    @tool
+    def probe() -> str:
+        """Record the session the call belongs to."""
+        seen.append(get_session_id())
+        return "ok"
+
+    agent = Agent(model=scripted_model("probe"), tools=[probe], hooks=[TurnContextHooks()], callback_handler=None)
+    run_turn(agent, "check", "pc-1", 30)
+    run_turn(agent, "check", "pc-2", 30)
+
+    assert seen == ["pc-1", "pc-2"]
@@ -0,0 +1,34 @@
+from strands import Agent
+
+from custom_tools import journal
+from integration import workspace
+from integration.turn_context import TurnContextHooks, run_turn
+
+
+def test_sessions_write_to_separate_workspaces(tmp_path, monkeypatch, scripted_model):
+    monkeypatch.setattr(workspace, "WORKSPACE_ROOT", str(tmp_path))
+
+    for session_id in ("pc-1", "pc-2"):
+        model = scripted_model("journal", {"action": "write", "content": f"note from {session_id}"})
+        agent = Agent(model=model, tools=[journal], hooks=[TurnContextHooks()], callback_handler=None)
+        run_turn(agent, "take a note", session_id, 30)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["pc-1", "pc-2"]
+    for session_id in ("pc-1", "pc-2"):
+        root = tmp_path / session_id
+        (entry,) = (root / "journal").iterdir()
+        assert f"note from {session_id}" in entry.read_text()
+        # check_quota measured this session's own workspace.
+        assert (root / ".workspace.json").exists()
+
+
+def test_release_collects_only_the_released_session(tmp_path, monkeypatch):
+    monkeypatch.setattr(workspace, "WORKSPACE_ROOT", str(tmp_path))
+    monkeypatch.setattr(workspace, "WORKSPACE_RELEASE_GRACE_SECS", 0)
+
+    workspace.open_workspace("pc-1")
+    workspace.open_workspace("pc-2")
+    workspace.release_workspace("pc-1")
+
+    assert [path.name for path in tmp_path.iterdir()] == ["pc-2"]
+    workspace.release_workspace("pc-2")
@@ -0,0 +1,54 @@
+"""
+Voice LLM service signed with the process-wide AWS credentials.
+
+pipecat's `AWSBedrockLLMService` resolves credentials once, in its constructor, and opens a new
+Bedrock client from them for every request. A voice session that outlives temporary (STS)
+credentials would then fail mid-conversation. `SharedCredentialsBedrockLLMService` re-reads the
+credentials of the shared boto3 session (`integration.bedrock.get_boto_session`), which refresh
+themselves before they expire, each time pipecat opens a client.
+
+Connections are not pooled across voice requests: pipecat opens and closes a client per request
+on its own aiobotocore session. Only the client configuration (timeouts, retries) is shared.
+"""
+
+from typing import Any, Dict
+
+from pipecat.services.aws.llm import AWSBedrockLLMService
+
+from integration.bedrock import AWS_REGION, get_aws_credentials, get_client_config
+
+
+class SharedCredentialsBedrockLLMService(AWSBedrockLLMService):
+    """`AWSBedrockLLMService` whose clients always use the shared session's current credentials."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        self._client_params: Dict[str, Any] = {}
+        credentials = get_aws_credentials()
+        super().__init__(
+            aws_access_key=credentials.access_key,
+            aws_secret_key=credentials.secret_key,
+            aws_session_token=credentials.token,
+            aws_region=AWS_REGION,
+            client_config=get_client_config(),
+            **kwargs,
+        )
+        if not self._client_params:
+            # pipecat no longer keeps its client arguments in `_aws_params`, so they can't be refreshed
+            raise RuntimeError(
+                f"{AWSBedrockLLMService.__name__} changed how it creates Bedrock clients; "
+                "update SharedCredentialsBedrockLLMService"
+            )
+
+    @property
+    def _aws_params(self) -> Dict[str, Any]:
+        credentials = get_aws_credentials()
+        return {
+            **self._client_params,
+            "aws_access_key_id": credentials.access_key,
+            "aws_secret_access_key": credentials.secret_key,
+            "aws_session_token": credentials.token,
+        }
+
+    @_aws_params.setter
+    def _aws_params(self, params: Dict[str, Any]) -> None:
+        self._client_params = dict(params)
@@ -0,0 +1,25 @@
+from pipecat.frames.frames import Frame, MetricsFrame
+from pipecat.metrics.metrics import LLMUsageMetricsData
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from prompts.caching import prompt_cache_stats
+
+
+class PromptCacheMetricsProcessor(FrameProcessor):
+    """Feeds the LLM usage metrics of every voice turn into `prompt_cache_stats`."""
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, MetricsFrame):
+            for data in frame.data:
+                if isinstance(data, LLMUsageMetricsData):
+                    usage = data.value
+                    prompt_cache_stats.record(
+                        "voice",
+                        usage.prompt_tokens,
+                        usage.cache_read_input_tokens or 0,
+                        usage.cache_creation_input_tokens or 0,
+                    )
+
+        await self.push_frame(frame, direction)
@@ -0,0 +1,298 @@
+"""
+Adaptive playout buffer for the voice output transport.
+
+TTS services deliver audio in bursts: a sentence can arrive in a few hundred
+milliseconds, followed by a pause while the next one is synthesized. This module
+sits between the TTS service and the output transport and:
+
+- picks the size of the chunks it releases from measured TTS arrival jitter and
+  event-loop lag,
+- holds back that much audio at the start of every utterance so a late burst
+  doesn't cause an audible gap,
+- keeps underrun / overrun counters per client and adapts the buffer depth so
+  each client runs at the lowest playout latency that stays glitch free.
+
+Released chunks keep the TTS context id, metadata and (offset) presentation
+timestamp of the frame their audio came from, so output and interruption
+handling downstream see the same frames they would without the buffer.
+
+Only this processor adapts during a session. The output transport's own
+`audio_out_10ms_chunks` is read once when the transport is created, so it is set
+from `initial_audio_out_chunks()` (loop lag plus the jitter of earlier sessions)
+and stays fixed; the transport re-chunks whatever it receives to that size. The
+adaptive depth therefore changes how much audio is held back per utterance, not
+the size of the writes to the client.
+
+Counters for every live session are available through `buffer_stats()`.
+"""
+
+import asyncio
+import math
+import os
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from loguru import logger
+from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
+    Frame,
+    InterruptionFrame,
+    StartFrame,
+    TTSAudioRawFrame,
+    TTSStoppedFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+AUDIO_OUT_MIN_CHUNKS = int(os.getenv("AUDIO_OUT_MIN_CHUNKS", "1"))
+AUDIO_OUT_MAX_CHUNKS = int(os.getenv("AUDIO_OUT_MAX_CHUNKS", "8"))
+# Audio queued ahead of real time beyond this is counted as an overrun.
+AUDIO_OUT_MAX_BUFFER_MS = int(os.getenv("AUDIO_OUT_MAX_BUFFER_MS", "8000"))
+
+# Utterances without an underrun before the buffer depth is lowered again.
+CLEAN_UTTERANCES_BEFORE_SHRINK = 3
+LOOP_LAG_PROBE_INTERVAL = 0.5
+
+# Process-wide jitter estimate, seeded by finished sessions so new clients start
+# from a sensible depth instead of the minimum.
+_jitter_estimate_ms = 0.0
+_active_buffers: "weakref.WeakValueDictionary[str, AdaptiveJitterBuffer]" = weakref.WeakValueDictionary()
+
+
+def choose_audio_out_chunks(jitter_ms: float, loop_lag_ms: float) -> int:
+    """
+    Pick the number of 10ms chunks needed to absorb the given jitter and lag.
+
+    Two jitter deviations plus the event-loop lag covers the large majority of
+    late arrivals, rounded up to whole 10ms chunks and clamped to the configured range.
+    """
+    needed_ms = 2 * jitter_ms + loop_lag_ms
+    return max(AUDIO_OUT_MIN_CHUNKS, min(AUDIO_OUT_MAX_CHUNKS, math.ceil(needed_ms / 10)))
+
+
+async def measure_event_loop_lag(samples: int = 5, interval: float = 0.01) -> float:
+    """Return the worst observed event-loop scheduling delay in milliseconds."""
+    worst = 0.0
+    for _ in range(samples):
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        worst = max(worst, (time.monotonic() - started - interval) * 1000)
+    return worst
+
+
+async def initial_audio_out_chunks() -> int:
+    """
+    Chunk count for a new output transport, based on current loop lag and past jitter. The
+    transport keeps it for its whole lifetime; pass the same value to `AdaptiveJitterBuffer`.
+    """
+    loop_lag_ms = await measure_event_loop_lag()
+    return choose_audio_out_chunks(_jitter_estimate_ms, loop_lag_ms)
+
+
+def buffer_stats() -> Dict[str, Dict[str, Any]]:
+    """Return playout statistics for every active session, keyed by session id."""
+    return {session_id: buf.stats() for session_id, buf in list(_active_buffers.items())}
+
+
+class AdaptiveJitterBuffer(FrameProcessor):
+    """
+    Re-chunks TTS audio to an adaptive size and pre-buffers each utterance.
+
+    The buffer keeps a virtual playout clock for the audio it has released. When new
+    audio arrives after that clock ran out mid-utterance the client heard a gap
+    (underrun) and the depth grows by one chunk; when more than
+    `AUDIO_OUT_MAX_BUFFER_MS` is queued ahead of playout it counts an overrun.
+    After a few clean utterances the depth shrinks back towards the floor given by
+    the measured jitter and loop lag.
+    """
+
+    def __init__(self, session_id: str, initial_chunks: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._session_id = session_id
+        self._target_chunks = initial_chunks or choose_audio_out_chunks(_jitter_estimate_ms, 0.0)
+        # What the transport was created with; it doesn't follow later changes.
+        self._transport_chunks = self._target_chunks
+
+        self._sample_rate = 0
+        self._num_channels = 1
+        self._buffer = bytearray()
+        # [source frame, bytes of it still buffered, bytes of it already released], oldest first
+        self._sources: Deque[List[Any]] = deque()
+        self._overrunning = False
+        self._primed = False
+        self._playout_start = 0.0
+        self._released_secs = 0.0
+        self._last_arrival: Optional[float] = None
+        self._last_duration = 0.0
+
+        self._jitter_ms = _jitter_estimate_ms
+        self._loop_lag_ms = 0.0
+        self._clean_utterances = 0
+        self._underruns = 0
+        self._overruns = 0
+        self._utterances = 0
+        self._lag_task: Optional[asyncio.Task] = None
+
+        _active_buffers[session_id] = self
+
+    def stats(self) -> Dict[str, Any]:
+        """Current counters and buffer settings for this session."""
+        return {
+            "chunk_ms": self._target_chunks * 10,
+            "transport_chunk_ms": self._transport_chunks * 10,
+            "jitter_ms": round(self._jitter_ms, 2),
+            "loop_lag_ms": round(self._loop_lag_ms, 2),
+            "underruns": self._underruns,
+            "overruns": self._overruns,
+            "utterances": self._utterances,
+        }
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, StartFrame):
+            self._sample_rate = frame.audio_out_sample_rate
+            self._lag_task = self.create_task(self._monitor_loop_lag())
+            await self.push_frame(frame, direction)
+        elif isinstance(frame, TTSAudioRawFrame):
+            await self._handle_audio(frame)
+        elif isinstance(frame, TTSStoppedFrame):
+            await self._flush()
+            self._finish_utterance()
+            await self.push_frame(frame, direction)
+        elif isinstance(frame, InterruptionFrame):
+            self._reset_utterance()
+            await self.push_frame(frame, direction)
+        elif isinstance(frame, (EndFrame, CancelFrame)):
+            await self._flush()
+            await self._stop()
+            await self.push_frame(frame, direction)
+        else:
+            await self.push_frame(frame, direction)
+
+    def _chunk_bytes(self) -> int:
+        bytes_10ms = int(self._sample_rate / 100) * self._num_channels * 2
+        return bytes_10ms * self._target_chunks
+
+    def _bytes_to_secs(self, num_bytes: int) -> float:
+        return num_bytes / (self._sample_rate * self._num_channels * 2)
+
+    async def _handle_audio(self, frame: TTSAudioRawFrame):
+        now = time.monotonic()
+        self._sample_rate = frame.sample_rate
+        self._num_channels = frame.num_channels
+        self._update_jitter(now, self._bytes_to_secs(len(frame.audio)))
+
+        if self._sources and self._sources[-1][0].context_id != frame.context_id:
+            # Never mix audio of two TTS contexts in one chunk.
+            await self._flush()
+
+        if self._primed:
+            ahead = self._released_secs - (now - self._playout_start)
+            if ahead < 0:
+                # The client already played everything we released: audible gap.
+                self._underruns += 1
+                self._clean_utterances = -1
+                self._target_chunks = min(AUDIO_OUT_MAX_CHUNKS, self._target_chunks + 1)
+                self._primed = False
+            elif ahead * 1000 > AUDIO_OUT_MAX_BUFFER_MS:
+                # One overrun per episode: TTS running ahead stays ahead for a while.
+                if not self._overrunning:
+                    self._overruns += 1
+                self._overrunning = True
+            else:
+                self._overrunning = False
+
+        self._buffer.extend(frame.audio)
+        self._sources.append([frame, len(frame.audio), 0])
+
+        if not self._primed:
+            if len(self._buffer) < self._chunk_bytes():
+                return
+            self._primed = True
+            self._playout_start = now
+            self._released_secs = 0.0
+
+        await self._release(whole_chunks_only=True)
+
+    def _update_jitter(self, now: float, duration: float):
+        # Only lateness matters: TTS routinely runs ahead of real time.
+        if self._last_arrival is not None:
+            lateness_ms = max(0.0, (now - self._last_arrival - self._last_duration) * 1000)
+            self._jitter_ms += (lateness_ms - self._jitter_ms) / 16
+        self._last_arrival = now
+        self._last_duration = duration
+
+    async def _release(self, whole_chunks_only: bool):
+        chunk_bytes = self._chunk_bytes()
+        while len(self._buffer) >= chunk_bytes or (not whole_chunks_only and self._buffer):
+            audio = bytes(self._buffer[:chunk_bytes])
+            del self._buffer[:chunk_bytes]
+            self._released_secs += self._bytes_to_secs(len(audio))
+            await self.push_frame(self._chunk_frame(audio))
+
+    def _chunk_frame(self, audio: bytes) -> TTSAudioRawFrame:
+        """Frame for the next released chunk, carrying the fields of the frame it starts in."""
+        source, _, released = self._sources[0]
+        chunk = TTSAudioRawFrame(
+            audio=audio, sample_rate=self._sample_rate, num_channels=self._num_channels, context_id=source.context_id
+        )
+        if source.pts is not None:
+            chunk.pts = source.pts + int(self._bytes_to_secs(released) * 1_000_000_000)
+        chunk.metadata = dict(source.metadata)
+        chunk.transport_source = source.transport_source
+        chunk.transport_destination = source.transport_destination
+        chunk.interruptible = source.interruptible
+
+        remaining = len(audio)
+        while remaining and self._sources:
+            entry = self._sources[0]
+            taken = min(remaining, entry[1])
+            entry[1] -= taken
+            entry[2] += taken
+            remaining -= taken
+            if not entry[1]:
+                self._sources.popleft()
+        return chunk
+
+    async def _flush(self):
+        if self._buffer and self._sample_rate:
+            await self._release(whole_chunks_only=False)
+
+    def _finish_utterance(self):
+        global _jitter_estimate_ms
+
+        self._utterances += 1
+        self._clean_utterances += 1
+        floor = choose_audio_out_chunks(self._jitter_ms, self._loop_lag_ms)
+        if self._clean_utterances >= CLEAN_UTTERANCES_BEFORE_SHRINK:
+            self._clean_utterances = 0
+            self._target_chunks = max(floor, self._target_chunks - 1)
+        else:
+            self._target_chunks = max(floor, self._target_chunks)
+
+        _jitter_estimate_ms += (self._jitter_ms - _jitter_estimate_ms) / 4
+        self._reset_utterance()
+
+    def _reset_utterance(self):
+        self._buffer.clear()
+        self._sources.clear()
+        self._primed = False
+        self._overrunning = False
+        self._last_arrival = None
+        self._last_duration = 0.0
+
+    async def _monitor_loop_lag(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(LOOP_LAG_PROBE_INTERVAL)
+            lag_ms = max(0.0, (time.monotonic() - started - LOOP_LAG_PROBE_INTERVAL) * 1000)
+            self._loop_lag_ms += (lag_ms - self._loop_lag_ms) / 8
+
+    async def _stop(self):
+        if self._lag_task:
+            await self.cancel_task(self._lag_task)
+            self._lag_task = None
+        logger.info(f"Audio playout stats for {self._session_id}: {self.stats()}")